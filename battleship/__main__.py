@@ -1,4 +1,101 @@
-from battleship.game import run
+import sys
 
-if __name__ == "__main__":
+# subcommands and the module whose main(argv) runs them, only the module of
+# the command being run gets imported
+COMMANDS = {
+    'batch': 'battleship.batch',
+    'bench': 'battleship.bench',
+    'cluster': 'battleship.cluster',
+    'ffa': 'battleship.ffa',
+    'ladder': 'battleship.ladder',
+    'load': 'battleship.load',
+    'results': 'battleship.results',
+    'serve': 'battleship.server',
+    'stats': 'battleship.stats',
+    'tune': 'battleship.adversarial',
+}
+
+# written out rather than built by argparse, which alone takes longer to
+# import than the rest of `bship --help`
+USAGE = """usage: bship [-h] [--curses] [--salvo]
+             [--no-touch | --no-diagonal-touch] [COMMAND ...]
+
+Battleships from the commandline.
+
+options:
+  -h, --help  show this help message and exit
+  --curses    play full screen, redrawing only what changes
+  --salvo     one shot per ship still afloat each turn
+  --no-touch  ships may not be hidden side by side
+  --no-diagonal-touch
+              ships may not touch, not even at a corner
+
+commands:
+  batch       play without prompts, reading placements and shots from a
+              file or stdin, one per line
+  bench       benchmark targeting strategies and bship startup time
+  cluster     run a tournament over workers on many machines
+  ffa         a free-for-all between 3 to 16 Computer players
+  ladder      rate Computer players against each other
+  load        load test a game server with many scripted clients at once
+  results     play a tournament into a SQLite database, show win rates
+  serve       serve games against the Computer over TCP, as JSON lines
+  stats       play many Computer v Computer games and summarise them
+  tune        tune an adversarial placement against a targeting strategy
+
+run `bship COMMAND --help` for the options of a command."""
+
+
+def main(argv=None):
+    """Command line entry point of bship: the prompt game by default, the
+    full screen game with --curses, or one of the COMMANDS.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv and argv[0] in COMMANDS:
+        from importlib import import_module
+        return import_module(COMMANDS[argv[0]]).main(argv[1:])
+
+    if '-h' in argv or '--help' in argv:
+        print(USAGE)
+        return 0
+
+    unknown = [arg for arg in argv if arg not in (
+        '--curses', '--salvo', '--no-touch', '--no-diagonal-touch')]
+    if unknown:
+        return _error(f"unrecognized arguments: {' '.join(unknown)}")
+
+    if '--no-touch' in argv and '--no-diagonal-touch' in argv:
+        return _error('argument --no-diagonal-touch: not allowed with '
+                      'argument --no-touch')
+
+    rules = 'salvo' if '--salvo' in argv else 'classic'
+    adjacency = 'touch'
+    for flag in ('--no-touch', '--no-diagonal-touch'):
+        if flag in argv:
+            adjacency = flag[2:]
+    if '--curses' in argv:
+        from battleship.screen import run
+    else:
+        from battleship.game import run
+    run(rules=rules, adjacency=adjacency)
+
+
+def _error(message):
+    """Prints the usage and message the way argparse would, returning its
+    exit status.
+    """
+    print(USAGE.split('\n\n')[0], file=sys.stderr)
+    print(f'bship: error: {message}', file=sys.stderr)
+    return 2
+
+
+def run():
+    """Kept for scripts using the old battleship.__main__:run entry point.
+    """
+    from battleship.game import run
     run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
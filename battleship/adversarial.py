@@ -0,0 +1,202 @@
+"""Placement tuned against a known targeting strategy.
+
+Tuning is slow and done offline; it anneals a pool of layouts towards the ones
+the targeting strategy needs the most shots to sink and caches the final pool
+per board geometry and fleet. During play AdversarialPlacement only samples
+from the cached pool.
+
+    python -m battleship.adversarial --against density --iterations 200
+"""
+import argparse
+import json
+import math
+import os
+import random
+from multiprocessing import Pool
+from battleship.bench import play_solo
+from battleship.board import Board
+from battleship.cache import CACHE_DIR, fleet_key
+from battleship.geometry import geometry
+from battleship.strategies import (PlacementStrategy, RandomPlacement, obeys,
+                                   register)
+
+_distributions = {}  # in process memo of the cache files
+
+
+@register('placement', 'fixed')
+class FixedPlacement(PlacementStrategy):
+    """Always hides the fleet in the same layout, used to evaluate one layout
+    over many games.
+    """
+
+    def __init__(self, layout=None, rng=None):
+        super().__init__(rng)
+        self.layout = layout or {}
+
+    def place(self, rows, cols, ships):
+        return {sign: list(pos) for sign, pos in self.layout.items()}
+
+
+@register('placement', 'adversarial')
+class AdversarialPlacement(PlacementStrategy):
+    """Hides the fleet in a layout sampled from the distribution tuned
+    against the `against` targeting strategy, or randomly if no distribution
+    has been tuned for this board and fleet. Distributions are tuned with
+    ships touching, under other rules only the layouts obeying them count.
+    """
+    against = 'density'
+
+    def __init__(self, against=None, rng=None):
+        super().__init__(rng)
+        self.against = against or self.against
+
+    def place(self, rows, cols, ships):
+        pool = load_distribution(self.against, rows, cols, ships)
+        if pool and self.adjacency != 'touch':
+            pool = [layout for layout in pool if
+                    obeys(layout, rows, cols, self.adjacency)]
+        if pool:
+            layout = self.rng.choice(pool)
+            return {sign: list(pos) for sign, pos in layout.items()}
+        hider = RandomPlacement(self.rng)
+        hider.adjacency = self.adjacency
+        return hider.place(rows, cols, ships)
+
+
+def cache_path(against, rows, cols, ships):
+    return os.path.join(CACHE_DIR, f'placement-{against}-{rows}x{cols}-'
+                                   f'{fleet_key(ships)}.json')
+
+
+def load_distribution(against, rows, cols, ships):
+    """Returns the cached list of layouts for the geometry and fleet, or None.
+    Each file is read once per process.
+    """
+    path = cache_path(against, rows, cols, ships)
+    if path not in _distributions:
+        try:
+            with open(path) as f:
+                pool = json.load(f)['layouts']
+            _distributions[path] = [
+                {sign: [tuple(coord) for coord in pos]
+                 for sign, pos in layout.items()} for layout in pool]
+        except (OSError, ValueError, KeyError):
+            _distributions[path] = None
+    return _distributions[path]
+
+
+def save_distribution(against, rows, cols, ships, pool, scores):
+    """Writes the tuned pool of layouts to the cache.
+    """
+    path = cache_path(against, rows, cols, ships)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'against': against, 'rows': rows, 'cols': cols,
+                   'layouts': pool, 'shots': scores}, f)
+    os.replace(tmp, path)
+    _distributions.pop(path, None)
+    return path
+
+
+def evaluate(job):
+    """Mean shots the targeting strategy needs to sink a layout, averaged
+    over games seeded from seed so competing layouts face the same shooter.
+    """
+    layout, against, rows, cols, games, seed = job
+    rng = random.Random(seed)
+    hider = FixedPlacement(layout)
+    total = 0
+    for game in range(games):
+        total += play_solo(against, hider, rows, cols, rng)[0]
+    return total / games
+
+
+def mutate(layout, rows, cols, sizes, rng):
+    """Returns a copy of layout with one ship moved to a random free
+    position.
+    """
+    layout = dict(layout)
+    sign = rng.choice(sorted(layout))
+    geo = geometry(rows, cols)
+    occupied = geo.mask(coord for other, pos in layout.items() if
+                        other != sign for coord in pos)
+    free = [mask for mask, idx in geo.placements(sizes[sign]) if
+            not mask & occupied]
+    layout[sign] = geo.coords(rng.choice(free))
+    return layout
+
+
+def tune(against='density', rows=10, cols=10, ships=None, pool_size=24,
+         iterations=100, games=8, temperature=2.0, processes=None,
+         seed=None):
+    """Simulated annealing of a pool of layouts: each round every layout gets
+    a one ship mutation, both are evaluated on the same seeded games (in
+    parallel across processes) and the mutation is kept if it needs more
+    shots, or by chance while the temperature is high. Returns the final
+    pool and its mean shots.
+    """
+    ships = ships or list(Board(rows, cols).fleet.values())
+    sizes = {ship.sign: ship.size for ship in ships}
+    rng = random.Random(seed)
+    hider = RandomPlacement(rng)
+
+    pool = [hider.place(rows, cols, ships) for n in range(pool_size)]
+    scores = None
+
+    workers = Pool(processes) if processes != 1 else None
+    run = workers.map if workers else map
+
+    try:
+        for step in range(iterations):
+            heat = temperature * (1 - step / iterations)
+            seeds = [rng.random() for layout in pool]
+            proposals = [mutate(layout, rows, cols, sizes, rng)
+                         for layout in pool]
+
+            jobs = [(layout, against, rows, cols, games, s) for layout, s in
+                    zip(pool + proposals, seeds + seeds)]
+            results = list(run(evaluate, jobs))
+            scores, proposed = results[:pool_size], results[pool_size:]
+
+            for n in range(pool_size):
+                gain = proposed[n] - scores[n]
+                if gain >= 0 or (heat > 0 and
+                                 rng.random() < math.exp(gain / heat)):
+                    pool[n] = proposals[n]
+                    scores[n] = proposed[n]
+    finally:
+        if workers:
+            workers.close()
+            workers.join()
+
+    return pool, scores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m battleship.adversarial',
+        description='Tune and cache a placement distribution against a '
+                    'targeting strategy.')
+    parser.add_argument('--against', default='density')
+    parser.add_argument('--rows', type=int, default=10)
+    parser.add_argument('--cols', type=int, default=10)
+    parser.add_argument('--pool', type=int, default=24)
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--games', type=int, default=8)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    ships = list(Board(args.rows, args.cols).fleet.values())
+
+    pool, scores = tune(args.against, args.rows, args.cols, ships, args.pool,
+                        args.iterations, args.games, processes=args.processes,
+                        seed=args.seed)
+    path = save_distribution(args.against, args.rows, args.cols, ships, pool,
+                             scores)
+    print(f'mean shots {sum(scores) / len(scores):.2f} -> {path}')
+
+
+if __name__ == "__main__":
+    main()
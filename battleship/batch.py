@@ -0,0 +1,362 @@
+"""Non-interactive play against the Computer for bots: placements and shots
+are read one per line, from a file or stdin, and each is answered with one or
+more result lines, without any prompts.
+
+Plain lines:            JSON lines (--json):
+    K A0 A4                 {"place": "K", "head": "A0", "tail": "A4"}
+    auto                    {"auto": true}
+    B3                      {"shoot": "B3"}
+    salvo B3 C4 D5          {"salvo": ["B3", "C4", "D5"]}   (--salvo)
+    new                     {"new": true}
+
+Answers, one per line:  placed K A0 A1 A2 A3 A4 | ready | shot B3 hit S |
+reply D5 miss | over won 41 | error <why>. With --json the same fields come as
+JSON objects, eg. {"shot": "B3", "result": "hit", "ship": "S"}.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import stat
+import sys
+import time
+from battleship import metrics
+from battleship.board import Board
+from battleship.geometry import geometry
+from battleship.strategies import BoardView, make_placement, make_targeting
+from battleship.ui import clean, convert
+
+_games = itertools.count(1)  # keys of the games played in this process
+
+
+class Batch(object):
+
+    def __init__(self, targeting='density', placement='adversarial',
+                 rng=None, rules='classic'):
+        """A batch session plays any number of games in a row against the
+        Computer's targeting and placement strategies.
+        """
+        self.rules = rules
+        self.targeting = targeting
+        self.placement = placement
+        self.rng = rng or random.Random()
+        self.games = 0
+        self.playing = False  # counted in the metrics as in progress
+        self.new_game()
+
+    def new_game(self):
+        """The Computer hides its fleet, the client then hides theirs.
+        """
+        self.close()
+        metrics.GAMES.inc()
+        metrics.PLAYING.inc()
+        self.playing = True
+        self.games += 1
+        self.key = next(_games)  # tells this game apart from any other
+        self.enemy = Board()
+        self.home = Board()
+        self.shots = 0
+        self.over = False
+
+        hider = make_placement(self.placement, rng=self.rng)
+        layout = hider.place(self.enemy.rows, self.enemy.cols,
+                             list(self.enemy.fleet.values()))
+        for sign in layout:
+            self.enemy.place_ship(self.enemy.fleet[sign], layout[sign])
+
+        self.shooter = make_targeting(self.targeting, rng=self.rng)
+        self.view = BoardView(self.home)
+
+        return [{'new': self.games}]
+
+    def close(self):
+        """Stops counting the game as in progress, once it is over or the
+        client has gone.
+        """
+        if self.playing:
+            metrics.PLAYING.dec()
+            self.playing = False
+
+    def handle(self, line, json_lines=False):
+        """Takes one input line and returns the list of answers to it.
+        """
+        try:
+            msg = self.request(line, json_lines)
+        except ValueError as error:
+            return [{'error': str(error)}]
+        if msg is None:
+            return []
+
+        texts = shots_in(msg)
+        if texts is not None:
+            return self.shoot(texts)
+        if 'place' in msg:
+            return self.place(msg['place'], msg.get('head'), msg.get('tail'))
+        if msg.get('auto'):
+            return self.auto()
+        if msg.get('new'):
+            return self.new_game()
+        return [{'error': f'unknown request: {line.strip()}'}]
+
+    def request(self, line, json_lines=False):
+        """Returns the request dict of an input line, None if it is blank or
+        a comment. Raises ValueError if it is not one.
+        """
+        line = line.strip()
+        if not line or line.startswith('#'):
+            return None
+
+        if not json_lines:
+            return self._parse(line.split())
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            raise ValueError(f'not json: {line}')
+        if not isinstance(msg, dict):
+            raise ValueError(f'not an object: {line}')
+        return msg
+
+    def place(self, sign, head, tail):
+        """Hides the ship with sign between the head and tail coordinates.
+        """
+        ship = self.home.fleet.get(str(sign).upper())
+        if ship is None:
+            return [{'error': f'no ship {sign}'}]
+        if self.shots:
+            return [{'error': 'the battle has started'}]
+
+        ends = {_coord(head), _coord(tail)}
+        if None in ends:
+            return [{'error': f'bad coordinates {head} {tail}'}]
+
+        geo = geometry(self.home.rows, self.home.cols)
+        ends = {geo.index(coord) for coord in ends}
+        # a ship already hidden stays where it is unless the new pos is good
+        occupied = geo.mask(coord for other in self.home.fleet.values() if
+                            other is not ship for coord in other.pos)
+
+        for mask, idx in geo.placements(ship.size):
+            if {idx[0], idx[-1]} == ends:
+                if mask & occupied:
+                    return [{'error': f'{ship.sign} overlaps another ship'}]
+                if ship.pos:
+                    self.home.remove_ship(ship)
+                self.home.place_ship(ship, geo.coords(mask))
+                return self._placed(ship)
+
+        return [{'error': f'{ship.sign} is {ship.size} long, it does not fit '
+                          f'{head} {tail}'}]
+
+    def auto(self):
+        """Hides the ships the client has not hidden yet.
+        """
+        if self.shots:
+            return [{'error': 'the battle has started'}]
+        answers = []
+
+        geo = geometry(self.home.rows, self.home.cols)
+        for ship in self.home.fleet.values():
+            if ship.pos:
+                continue
+            occupied = geo.mask(coord for other in self.home.fleet.values()
+                                for coord in other.pos)
+            free = [mask for mask, idx in geo.placements(ship.size) if
+                    not mask & occupied]
+            if not free:
+                return answers + [{'error': f'no room left for {ship.sign}'}]
+            self.home.place_ship(ship, geo.coords(self.rng.choice(free)))
+            answers.extend(self._placed(ship))
+
+        return answers
+
+    def shoot(self, texts):
+        """Fires the client's shots, one or a whole salvo, then the Computer's
+        reply unless the game is over.
+        """
+        answers, shots = self.fire(texts)
+        if shots:
+            answers.extend(self.reply(self.aim(shots)))
+        return answers
+
+    def fire(self, texts):
+        """Fires the client's shots only. Returns their answers and how many
+        shots the Computer replies with, 0 if it does not.
+        """
+        if self.over:
+            return [{'error': 'the game is over, send new'}], 0
+        if not all(ship.pos for ship in self.home.fleet.values()):
+            return [{'error': 'hide the whole fleet first'}], 0
+
+        shots = self._shots(self.home)
+        if len(texts) != shots:
+            return [{'error': f'this turn is {shots} shots'}], 0
+
+        coords = [_coord(text) for text in texts]
+        for text, coord in zip(texts, coords):
+            if coord not in self.enemy.board:
+                return [{'error': f'bad coordinate {text}'}], 0
+
+        self.shots += 1
+        answers = []
+        for coord, result, ship in self.enemy.volley(coords):
+            metrics.SHOTS.child(result).inc()
+            answers.append(_result('shot', coord, result, ship))
+
+        if not self.enemy.afloat():
+            self.over = True
+            self.close()
+            return answers + [{'over': 'won', 'shots': self.shots}], 0
+
+        return answers, self._shots(self.enemy)
+
+    def aim(self, shots):
+        """Returns the Computer's reply of shots coords.
+        """
+        start = time.perf_counter()
+        if shots == 1:
+            coords = [self.shooter.pick(self.view)]
+        else:
+            coords = self.shooter.pick_many(self.view, shots)
+        metrics.moved(self.targeting, time.perf_counter() - start)
+        return coords
+
+    def reply(self, coords):
+        """Fires the Computer's reply, worked out by aim() or elsewhere.
+        """
+        answers = []
+        for coord, result, ship in self.home.volley(coords):
+            metrics.SHOTS.child(result).inc()
+            self.shooter.observe(coord, result)
+            answers.append(_result('reply', coord, result, ship))
+
+        if not self.home.afloat():
+            self.over = True
+            self.close()
+            answers.append({'over': 'lost', 'shots': self.shots})
+
+        return answers
+
+    def _shots(self, brd):
+        """Shots in a turn for the owner of brd.
+        """
+        return len(brd.afloat()) if self.rules == 'salvo' else 1
+
+    def _placed(self, ship):
+        answers = [{'placed': ship.sign,
+                    'pos': [convert(coord) for coord in ship.pos]}]
+        if all(other.pos for other in self.home.fleet.values()):
+            answers.append({'ready': True})
+        return answers
+
+    def _parse(self, words):
+        """Turns the words of a plain line into the same dict as a JSON line.
+        """
+        if words[0].lower() == 'shoot' and len(words) == 2:
+            return {'shoot': words[1]}
+        if words[0].lower() == 'salvo':
+            return {'salvo': words[1:]}
+        if words[0].lower() == 'place' and len(words) == 4:
+            return {'place': words[1], 'head': words[2], 'tail': words[3]}
+        if len(words) == 3:
+            return {'place': words[0], 'head': words[1], 'tail': words[2]}
+        if len(words) == 1 and words[0].lower() in ('auto', 'new'):
+            return {words[0].lower(): True}
+        if len(words) == 1:
+            return {'shoot': words[0]}
+        return {}
+
+
+def shots_in(msg):
+    """Returns the coordinates a shoot or salvo request fires, None if it is
+    some other request.
+    """
+    if 'shoot' in msg:
+        return [msg['shoot']]
+    if 'salvo' in msg and isinstance(msg['salvo'], list):
+        return msg['salvo']
+    return None
+
+
+def _coord(text):
+    """Converts a typed coordinate to a coord tuple, None if it is not one.
+    Unlike pick_coord() it never prompts.
+    """
+    if not isinstance(text, str) or text.lower() in ('q', 'r'):
+        return None
+    entry = clean(text)
+    return convert(entry) if entry else None
+
+
+def _result(key, coord, result, ship):
+    answer = {key: convert(coord), 'result': result}
+    if ship is not None:
+        answer['ship'] = ship.sign
+    return answer
+
+
+def format_answer(answer, json_lines=False):
+    """Formats an answer dict as a line of output.
+    """
+    if json_lines:
+        return json.dumps(answer, separators=(',', ':'))
+    if 'placed' in answer:
+        return ' '.join(['placed', answer['placed']] + answer['pos'])
+    if 'shot' in answer or 'reply' in answer:
+        key = 'shot' if 'shot' in answer else 'reply'
+        return ' '.join(filter(None, (key, answer[key], answer['result'],
+                                      answer.get('ship'))))
+    if 'over' in answer:
+        return f"over {answer['over']} {answer['shots']}"
+    if 'ready' in answer:
+        return 'ready'
+    if 'new' in answer:
+        return f"new {answer['new']}"
+    return f"error {answer['error']}"
+
+
+def run(lines, out, json_lines=False, flush=True, **kwargs):
+    """Plays the requests in lines, writing the answers to out. Flushing
+    after each line lets a bot on the other end of a pipe wait for answers.
+    """
+    batch = Batch(**kwargs)
+    for line in lines:
+        for answer in batch.handle(line, json_lines):
+            out.write(format_answer(answer, json_lines) + '\n')
+        if flush:
+            out.flush()
+    batch.close()
+    return batch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='bship batch',
+        description='Play against the Computer without prompts, reading '
+                    'placements and shots one per line.')
+    parser.add_argument('file', nargs='?', default='-',
+                        help='file of requests (default: stdin)')
+    parser.add_argument('--json', action='store_true',
+                        help='requests and answers are JSON lines')
+    parser.add_argument('--salvo', action='store_true',
+                        help='one shot per ship still afloat each turn')
+    parser.add_argument('--targeting', default='density')
+    parser.add_argument('--placement', default='adversarial')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    options = dict(json_lines=args.json, targeting=args.targeting,
+                   placement=args.placement, rng=random.Random(args.seed),
+                   rules='salvo' if args.salvo else 'classic')
+
+    if args.file == '-':
+        # only a pipe or terminal needs an answer before the next request
+        piped = not stat.S_ISREG(os.fstat(sys.stdin.fileno()).st_mode)
+        run(sys.stdin, sys.stdout, flush=piped, **options)
+    else:
+        with open(args.file) as lines:
+            run(lines, sys.stdout, flush=False, **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""Benchmarks registered targeting strategies without the interactive game:
+latency per move and shots needed to sink a whole fleet; and the startup time
+of the bship command.
+
+    python -m battleship.bench random --games 500 --seed 1
+    python -m battleship.bench --startup
+"""
+import argparse
+import random
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+from battleship.board import Board
+from battleship.config import ADJACENCY, SHIPS
+from battleship.strategies import (BoardView, available, make_placement,
+                                   make_targeting)
+
+# how much longer than a bare `python -c pass` a `bship --help` may take
+STARTUP_TARGET_MS = 20
+
+
+def play_solo(targeting, placement='random', rows=10, cols=10, rng=None,
+              ships=SHIPS, adjacency='touch'):
+    """Hides a fleet with the placement strategy and lets the targeting
+    strategy shoot at it until every ship is sunk. Returns the number of shots
+    and the list of seconds each move took to pick.
+    """
+    rng = rng or random.Random()
+    brd = Board(rows, cols, ships, adjacency)
+
+    hider = make_placement(placement, rng=random.Random(rng.random()))
+    hider.adjacency = adjacency
+    layout = hider.place(rows, cols, list(brd.fleet.values()))
+    for sign in layout:
+        brd.place_ship(brd.fleet[sign], layout[sign])
+
+    shooter = make_targeting(targeting, rng=random.Random(rng.random()))
+    view = BoardView(brd)
+    latencies = []
+
+    while brd.afloat():
+        start = perf_counter()
+        coord = shooter.pick(view)
+        latencies.append(perf_counter() - start)
+        shooter.observe(coord, brd.shoot(coord)[0])
+
+        if len(latencies) > rows * cols * 2:
+            raise RuntimeError(f'{targeting} keeps shooting the same coords')
+
+    return len(latencies), latencies
+
+
+def duel(targeting=('density', 'density'), placement=('random', 'random'),
+         rows=10, cols=10, seed=None, ships=SHIPS):
+    """Plays a silent Computer v Computer game, each side a targeting and a
+    placement strategy name. A coin decides who shoots first. Returns the
+    outcome: the winner (0 or 1), who went first, and per side its
+    strategies, layout, shots fired, the shot at which each enemy ship sank
+    and the coords it hit.
+    """
+    rng = random.Random(seed)
+    boards = [Board(rows, cols, ships), Board(rows, cols, ships)]
+    sides = []
+
+    for n, brd in enumerate(boards):
+        hider = make_placement(placement[n], rng=random.Random(rng.random()))
+        layout = hider.place(rows, cols, list(brd.fleet.values()))
+        for sign in layout:
+            brd.place_ship(brd.fleet[sign], layout[sign])
+        sides.append({
+            'targeting': targeting[n],
+            'placement': placement[n],
+            'layout': {sign: list(layout[sign]) for sign in layout},
+            'shots': 0,
+            'sunk_at': {},
+            'hits': [],
+        })
+
+    shooters = [make_targeting(name, rng=random.Random(rng.random()))
+                for name in targeting]
+    views = [BoardView(boards[1]), BoardView(boards[0])]
+    first = turn = rng.randrange(2)
+
+    while True:
+        side, enemy = sides[turn], boards[1 - turn]
+        coord = shooters[turn].pick(views[turn])
+        result, ship = enemy.shoot(coord)
+        shooters[turn].observe(coord, result)
+
+        side['shots'] += 1
+        if result in ('hit', 'sunk'):
+            side['hits'].append(coord)
+        if result == 'sunk':
+            side['sunk_at'][ship.sign] = side['shots']
+            if not enemy.afloat():
+                return {'winner': turn, 'first': first, 'sides': sides}
+        if side['shots'] > rows * cols * 2:
+            raise RuntimeError(f'{targeting[turn]} keeps shooting the same '
+                               f'coords')
+
+        turn = 1 - turn
+
+
+def _percentile(ordered, pct):
+    """Nearest rank percentile of an already sorted list.
+    """
+    rank = int(round(pct / 100 * len(ordered))) - 1
+    return ordered[max(0, min(len(ordered) - 1, rank))]
+
+
+def benchmark(targeting, games=100, placement='random', rows=10, cols=10,
+              seed=None, adjacency='touch'):
+    """Plays games solo games with the targeting strategy and summarises the
+    latency per move (in milliseconds) and shots-to-win.
+    """
+    rng = random.Random(seed)
+    shots = []
+    latencies = []
+
+    for game in range(games):
+        n, moves = play_solo(targeting, placement, rows, cols, rng,
+                             adjacency=adjacency)
+        shots.append(n)
+        latencies.extend(moves)
+
+    latencies = sorted(ms * 1000 for ms in latencies)
+
+    return {
+        'targeting': targeting,
+        'placement': placement,
+        'games': games,
+        'moves': len(latencies),
+        'latency_ms': {
+            'mean': statistics.mean(latencies),
+            'p50': _percentile(latencies, 50),
+            'p99': _percentile(latencies, 99),
+            'max': latencies[-1],
+        },
+        'shots': {
+            'mean': statistics.mean(shots),
+            'stdev': statistics.pstdev(shots),
+            'min': min(shots),
+            'max': max(shots),
+        },
+    }
+
+
+def report(result):
+    """Formats a benchmark() result as a line of text.
+    """
+    lat = result['latency_ms']
+    shots = result['shots']
+    return (f"{result['targeting']:>12} vs {result['placement']:<12} "
+            f"games={result['games']} "
+            f"shots mean={shots['mean']:.2f} sd={shots['stdev']:.2f} "
+            f"min={shots['min']} max={shots['max']} | "
+            f"move ms mean={lat['mean']:.4f} p50={lat['p50']:.4f} "
+            f"p99={lat['p99']:.4f} max={lat['max']:.4f}")
+
+
+def _wall_ms(cmd, runs):
+    """Median wall clock milliseconds of running cmd.
+    """
+    times = []
+    for run in range(runs):
+        start = perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=True)
+        times.append((perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def importtime(argv=('--help',)):
+    """Runs bship under `python -X importtime` and returns a dict of each
+    battleship module it imported to its cumulative import microseconds.
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'battleship'] + list(argv),
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        universal_newlines=True)
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        if name.strip().startswith('battleship'):
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def startup(argv=('--help',), runs=10):
+    """Times `python -m battleship argv` against the bare interpreter and
+    lists the battleship modules the command had to import.
+    """
+    base = _wall_ms([sys.executable, '-c', 'pass'], runs)
+    wall = _wall_ms([sys.executable, '-m', 'battleship'] + list(argv), runs)
+
+    return {
+        'argv': ' '.join(argv),
+        'interpreter_ms': base,
+        'wall_ms': wall,
+        'startup_ms': wall - base,
+        'target_ms': STARTUP_TARGET_MS,
+        'ok': wall - base <= STARTUP_TARGET_MS,
+        'modules': importtime(argv),
+    }
+
+
+def report_startup(result):
+    """Formats a startup() result as text.
+    """
+    return (f"bship {result['argv']}: {result['wall_ms']:.1f}ms, "
+            f"{result['startup_ms']:.1f}ms over the bare interpreter "
+            f"(target {result['target_ms']}ms: "
+            f"{'ok' if result['ok'] else 'TOO SLOW'})\n  imports: " +
+            ', '.join(f'{name} {us / 1000:.1f}ms' for name, us in
+                      sorted(result['modules'].items())))
+
+
+def main(argv=None):
+    """Command line entry: benchmarks the named (or all) targeting
+    strategies.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m battleship.bench',
+        description='Benchmark registered targeting strategies.')
+    parser.add_argument('targeting', nargs='*',
+                        help='strategy names (default: all registered)')
+    parser.add_argument('--placement', default='random')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--rows', type=int, default=10)
+    parser.add_argument('--cols', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--adjacency', choices=ADJACENCY, default='touch')
+    parser.add_argument('--startup', action='store_true',
+                        help='time `bship --help` instead of strategies')
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        result = startup()
+        print(report_startup(result))
+        return 0 if result['ok'] else 1
+
+    for name in args.targeting or available('targeting'):
+        print(report(benchmark(name, args.games, args.placement, args.rows,
+                               args.cols, args.seed, args.adjacency)))
+
+
+if __name__ == "__main__":
+    main()
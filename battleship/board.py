@@ -1,30 +1,31 @@
-from battleship.config import POINT
-from battleship.ship import Ship
+from battleship.config import POINT, SHIPS, fleet
+from battleship.geometry import geometry
+from battleship.ship import Ship  # noqa: F401, still imported from here
 
 
 class Board(object):
 
-    def __init__(self, rows=10, cols=10):
+    def __init__(self, rows=10, cols=10, ships=SHIPS, adjacency='touch'):
         """Creates a new board dataset: tuple as key dictionary with each coord
         as open/miss/occupied/hit/sunk status O X K @ k number of row/column
         maximum of 10 otherwise players.pick_pos will not work.
-        Initialises a fleet of ships.
+        Initialises a fleet of ships, ships is a (name, sign, size) table like
+        config.SHIPS. adjacency is how close ships may be hidden, one of
+        config.ADJACENCY.
         """
         self.board = {}
         self.rows = rows
         self.cols = cols
+        self.adjacency = adjacency
+        self.watchers = []  # callables told which coords changed
+        self.version = 0  # goes up with every change to the board
+        self.restored = 0  # times the points were replaced, not shot at
 
         for row in range(rows):
             for col in range(cols):
                 self.board[(col, row)] = POINT['open']
 
-        self.fleet = {
-            'K': Ship('AircraftCarrier', 'K', 5),
-            'T': Ship('Battleship', 'T', 4),
-            'S': Ship('Submarine', 'S', 3),
-            'Y': Ship('Destroyer', 'Y', 3),
-            'P': Ship('PatrolBoat', 'P', 2)
-        }
+        self.fleet = fleet(ships)
 
     def __str__(self, hide=False):
         """Converts board dict tuple as key into a list of list to display. It
@@ -59,6 +60,7 @@ class Board(object):
         ship.pos = pos
         for coord in ship.pos:
             self.board[coord] = ship.sign
+        self._changed(ship.pos)
 
     def remove_ship(self, ship):
         """Remove a ship ie. change K or T etc. back to O and delete the ship's
@@ -66,6 +68,7 @@ class Board(object):
         """
         for coord in ship.pos:
             self.board[coord] = POINT['open']
+        self._changed(ship.pos)
         ship.empty()
 
     def remove_fleet(self):
@@ -79,14 +82,100 @@ class Board(object):
         """Changes the point representation of the coord to a miss.
         """
         self.board[coord] = POINT['miss']
+        self._changed([coord])
 
     def record_hit(self, coord):
         """Changes the point representation of the coord to a hit.
         """
         self.board[coord] = POINT['hit']
+        self._changed([coord])
 
     def record_sunk(self, ship):
         """Changes the point representation of the list of coords to a sunk.
+        When ships may not touch, the open coords around the ship are marked
+        clear, as no other ship can be there.
         """
         for coord in ship.pos:
             self.board[coord] = ship.sign.lower()
+        changed = list(ship.pos)
+        for coord in self.halo(ship):
+            if self.board[coord] == POINT['open']:
+                self.board[coord] = POINT['clear']
+                changed.append(coord)
+        self._changed(changed)
+
+    def halo(self, ship):
+        """Returns the coords around the ship no other ship may take under
+        the adjacency rule, none when ships may touch.
+        """
+        if self.adjacency == 'touch':
+            return []
+        geo = geometry(self.rows, self.cols)
+        return geo.coords(geo.halo(geo.mask(ship.pos), self.adjacency))
+
+    def watch(self, watcher):
+        """Registers a callable that is called as watcher(board, coords) each
+        time the points at coords change, so a display can redraw just those.
+        """
+        self.watchers.append(watcher)
+
+    def _changed(self, coords):
+        self.version += 1
+        for watcher in self.watchers:
+            watcher(self, coords)
+
+    def shoot(self, coord):
+        """Resolves a shot at the coord without printing anything. Records the
+        miss/hit/sunk on the board, adds to the Ship's hits tally and returns
+        the result as a PROMPT key together with the Ship that was hit (or
+        None); miss, already_shot, already_sunk, hit, sunk.
+        """
+        shot = self.board[coord]
+
+        if shot == POINT['open']:
+            self.record_miss(coord)
+            return 'miss', None
+        elif shot in POINT.values():
+            return 'already_shot', None
+        elif shot.upper() in self.fleet and shot.islower():
+            return 'already_sunk', self.fleet[shot.upper()]
+
+        ship = self.fleet[shot]
+        ship.hits += 1
+
+        if ship.hits == ship.size:
+            self.record_sunk(ship)
+            return 'sunk', ship
+        else:
+            self.record_hit(coord)
+            return 'hit', ship
+
+    def volley(self, coords):
+        """Resolves a salvo of shots in one pass, watchers are told about all
+        the changed coords at once. Returns a list of (coord, result, Ship or
+        None) in the order of the coords, shooting the same coord twice in a
+        volley counts as already_shot.
+        """
+        watchers, self.watchers = self.watchers, []
+        try:
+            results = [(coord,) + self.shoot(coord) for coord in coords]
+        finally:
+            self.watchers = watchers
+
+        changed = []
+        for coord, result, ship in results:
+            if result == 'sunk':
+                changed.extend(ship.pos)
+                changed.extend(coord for coord in self.halo(ship) if
+                               self.board[coord] == POINT['clear'])
+            elif result in ('miss', 'hit'):
+                changed.append(coord)
+        if changed:
+            self._changed(changed)
+
+        return results
+
+    def afloat(self):
+        """Returns the list of Ships in the fleet that have not been sunk.
+        """
+        return [ship for ship in self.fleet.values() if ship.hits < ship.size]
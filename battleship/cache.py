@@ -0,0 +1,17 @@
+"""Where the Computer keeps what it works out once and reuses: tuned
+placements (adversarial), learnt priors (learning) and perfect play
+(perfect), a file each per board size and fleet.
+
+    BSHIP_CACHE=/tmp/bship python -m battleship.adversarial  # elsewhere
+"""
+import os
+
+CACHE_DIR = os.environ.get(
+    'BSHIP_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'bship'))
+
+
+def fleet_key(ships):
+    """Returns a short signature of a fleet eg. K5P2S3T4Y3.
+    """
+    return ''.join(f'{ship.sign}{ship.size}' for ship in
+                   sorted(ships, key=lambda ship: ship.sign))
@@ -0,0 +1,235 @@
+"""Crash-safe checkpoints of a running Engine.
+
+A Journal watches an Engine and keeps one file per match: a snapshot of the
+whole game followed by one short record per turn, the coords fired. Each
+record is appended and synced to disk at the end of the turn, a few dozen
+bytes; every `every` turns the file is compacted, a new snapshot written
+and synced next to it and swapped in, so recovery reads one snapshot and at
+most `every` turns whatever the length of the match.
+
+Snapshots hold both boards, fleets, the rules, the turn, who moves next and
+the state of the Computer's targeting generator, the one the game draws
+from once it is set up; the module `random` is left alone. Rather than
+storing that state (2.5kB) every turn, the record of each of its turns
+reseeds it from a 64 bit seed drawn from itself and keeps the seed, so a
+restored game draws the same numbers the original did from there on.
+(Under salvo rules, when the Human sinks a ship the Computer's move may
+have been speculated after another branch, see Engine._speculate, and
+differ.)
+
+    engine.set()
+    journal = Journal('match.bsj', engine)
+    engine.play()
+    ...
+    engine = Engine()
+    restore('match.bsj', engine)
+    journal = Journal('match.bsj', engine)  # goes on reseeding as before
+    engine.play()
+"""
+import os
+import struct
+from battleship.config import ADJACENCY, POINT
+
+FRAME = struct.Struct('<cH')  # record kind, payload length
+SNAPSHOT, TURN = b'S', b'T'
+GAME = struct.Struct('<BHBBB')  # rules, turn, to move, went first, adjacency
+BOARD = struct.Struct('<BBB')  # rows, cols, ships
+SHIP = struct.Struct('<cBBB')  # sign, size, hits, coords
+RNG = struct.Struct('<625IBd')  # Mersenne Twister state, gauss_next
+MOVE = struct.Struct('<BHQB')  # shooter, turn, seed, coords
+
+RULES = ('classic', 'salvo')
+
+
+class Journal(object):
+
+    def __init__(self, path, engine, every=50):
+        """Starts the journal of an Engine that is set up, with a snapshot.
+        """
+        self.path = path
+        self.engine = engine
+        self.every = every
+        self.coords = []  # fired this turn
+        self.turns = 0  # recorded since the last snapshot
+        self.file = None
+        self.compact(engine.current_player)
+        engine.watch(self)
+
+    def __call__(self, event):
+        if event['type'] == 'result':
+            self.coords.append(event['coord'])
+        elif event['type'] == 'turn_over':
+            self.record()
+        elif event['type'] == 'game_over':
+            self.close()
+
+    def record(self):
+        """Appends the turn just played, and compacts every `every` turns.
+        """
+        engine = self.engine
+        shooter = engine.players.index(engine.current_player)
+        seed = 0
+        # only after the Computer's own turn, once the Human's turn starts
+        # the Computer may be speculating with it on another thread
+        computers = engine.current_player is engine.opponent
+        if computers:
+            rng = engine.opponent.targeting.rng
+            seed = rng.getrandbits(64)
+            rng.seed(seed)
+
+        flat = [n for coord in self.coords for n in coord]
+        payload = MOVE.pack(shooter, engine.turn, seed, len(self.coords)) + \
+            bytes(flat)
+        self.coords = []
+        self.file.write(FRAME.pack(TURN, len(payload)) + payload)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+        self.turns += 1
+        if self.turns >= self.every and computers:
+            self.compact(engine.next_player)
+
+    def compact(self, to_move):
+        """Replaces the journal with a snapshot of the game, to_move being
+        the player whose turn is next.
+        """
+        if self.file is not None:
+            self.file.close()
+        payload = snapshot(self.engine, to_move)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(FRAME.pack(SNAPSHOT, len(payload)) + payload)
+            f.flush()
+            os.fsync(f.fileno())  # or the rename may land before the data
+        os.replace(tmp, self.path)
+        self.file = open(self.path, 'ab')
+        self.turns = 0
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def snapshot(engine, to_move):
+    """Returns the bytes of a snapshot of the engine.
+    """
+    players = engine.players
+    first = engine.first_player
+    parts = [GAME.pack(RULES.index(engine.rules), engine.turn,
+                       players.index(to_move),
+                       255 if first is None else players.index(first),
+                       ADJACENCY.index(engine.home.brd.adjacency))]
+
+    for player in players:
+        brd = player.brd
+        ships = [ship for ship in brd.fleet.values()]
+        parts.append(BOARD.pack(brd.rows, brd.cols, len(ships)))
+        parts.append(''.join(brd.board[(col, row)] for row in range(brd.rows)
+                             for col in range(brd.cols)).encode())
+        for ship in ships:
+            parts.append(SHIP.pack(ship.sign.encode(), ship.size, ship.hits,
+                                   len(ship.pos)))
+            parts.append(bytes(n for coord in ship.pos for n in coord))
+
+    version, state, gauss = engine.opponent.targeting.rng.getstate()
+    parts.append(RNG.pack(*state, gauss is not None, gauss or 0.0))
+    return b''.join(parts)
+
+
+def read(path):
+    """Returns the (kind, payload) records of a journal, leaving out a last
+    record cut short by a crash.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    records = []
+    at = 0
+    while at + FRAME.size <= len(data):
+        kind, length = FRAME.unpack_from(data, at)
+        at += FRAME.size
+        if at + length > len(data):
+            break
+        records.append((kind, data[at:at + length]))
+        at += length
+    return records
+
+
+def restore(path, engine):
+    """Brings a new Engine, not set up yet, to the state journalled at path.
+    """
+    records = read(path)
+    starts = [n for n, (kind, payload) in enumerate(records) if
+              kind == SNAPSHOT]
+    if not starts:
+        raise ValueError(f'{path} has no snapshot to restore')
+    _load(engine, records[starts[-1]][1])
+    for kind, payload in records[starts[-1] + 1:]:
+        _replay(engine, payload)
+    return engine
+
+
+def _load(engine, data):
+    rules, turn, to_move, first, adjacency = GAME.unpack_from(data)
+    at = GAME.size
+    players = engine.players
+    engine.rules = RULES[rules]
+    engine.turn = turn
+    engine.current_player = players[to_move]
+    engine.next_player = players[1 - to_move]
+    engine.first_player = None if first == 255 else players[first]
+
+    for player in players:
+        brd = player.brd
+        brd.adjacency = ADJACENCY[adjacency]
+        rows, cols, count = BOARD.unpack_from(data, at)
+        at += BOARD.size
+        if (rows, cols) != (brd.rows, brd.cols):
+            raise ValueError(f'the snapshot is of a {rows}x{cols} board')
+        cells = data[at:at + rows * cols].decode()
+        at += rows * cols
+        for index, point in enumerate(cells):
+            brd.board[(index % cols, index // cols)] = point
+        for ship in range(count):
+            sign, size, hits, length = SHIP.unpack_from(data, at)
+            at += SHIP.size
+            ship = brd.fleet[sign.decode()]
+            flat = data[at:at + 2 * length]
+            at += 2 * length
+            ship.pos = [(flat[n], flat[n + 1]) for n in range(0, len(flat), 2)]
+            ship.hits = hits
+        brd.version += 1
+        brd.restored += 1
+        player.sunk = sum(ship.pos != [] and ship.hits == ship.size
+                          for ship in brd.fleet.values())
+
+    # what the Computer has already fired at
+    engine.opponent.bombed = {coord for coord, point in
+                              engine.home.brd.board.items() if
+                              point not in engine.home.brd.fleet and
+                              point != POINT['open']}
+
+    *state, has_gauss, gauss = RNG.unpack_from(data, at)
+    engine.opponent.targeting.rng.setstate(
+        (3, tuple(state), gauss if has_gauss else None))
+
+
+def _replay(engine, data):
+    shooter, turn, seed, count = MOVE.unpack_from(data)
+    flat = data[MOVE.size:MOVE.size + 2 * count]
+    player = engine.players[shooter]
+    target = engine.players[1 - shooter]
+
+    for n in range(0, len(flat), 2):
+        coord = (flat[n], flat[n + 1])
+        result, ship = target.brd.shoot(coord)
+        player.observe(coord, result)
+        if result == 'sunk':
+            target.sunk += 1
+        if player is engine.opponent:
+            player.bombed.add(coord)
+
+    engine.turn = turn
+    engine.current_player, engine.next_player = target, player
+    if player is engine.opponent:
+        engine.opponent.targeting.rng.seed(seed)
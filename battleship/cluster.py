@@ -0,0 +1,294 @@
+"""Computer v Computer tournaments spread over machines.
+
+A Coordinator holds the seeded game jobs and listens on TCP; workers, on
+any machine that can reach it, connect and exchange JSON lines with it: each
+line from a worker carries the results of its last batch and asks for the
+next, and while it plays a batch it sends heartbeats, {"alive": true}. Jobs
+stay leased to the connection they went out on, and go back on the queue if
+it closes or goes quiet before their results arrive, so a dead worker costs
+only its batch. A worker that loses its connection makes a new one and
+hands in the results it has on that.
+
+    bship cluster coordinate density montecarlo --games 100000 --port 5151
+    bship cluster work coordinator-host:5151 --processes 8
+
+Jobs are [id, player, player, seed] with players targeting:placement names
+as in bench.duel(); results are [id, winner, first, shots, shots].
+"""
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+from collections import deque
+from multiprocessing import Process
+
+PORT = 5151
+
+
+def make_jobs(players, games, seed=None):
+    """Returns games jobs between random pairs of players.
+    """
+    rng = random.Random(seed)
+    return [[n] + rng.sample(players, 2) + [rng.random()]
+            for n in range(games)]
+
+
+def play(job, rows=10, cols=10):
+    """Plays one job, returns its compact result.
+    """
+    from battleship.bench import duel
+
+    number, a, b, seed = job
+    targeting_a, _, placement_a = a.partition(':')
+    targeting_b, _, placement_b = b.partition(':')
+    outcome = duel((targeting_a, targeting_b),
+                   (placement_a or 'random', placement_b or 'random'),
+                   rows, cols, seed)
+    return [number, outcome['winner'], outcome['first'],
+            outcome['sides'][0]['shots'], outcome['sides'][1]['shots']]
+
+
+class Coordinator(object):
+
+    def __init__(self, jobs, host='127.0.0.1', port=PORT, timeout=60,
+                 on_result=None):
+        """Serves jobs on host:port (port 0 picks a free one, see address).
+        A worker that sends nothing, not even a heartbeat, for timeout
+        seconds counts as dead.
+        on_result(result) is called once per job as results come in.
+        """
+        self.jobs = {job[0]: job for job in jobs}
+        self.todo = deque(jobs)
+        self.results = {}
+        self.timeout = timeout
+        self.on_result = on_result
+        self.lock = threading.Lock()
+        self.finished = threading.Event()
+        if not self.jobs:
+            self.finished.set()
+
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind((host, port))
+        self.server.listen()
+        self.address = self.server.getsockname()
+
+    def serve(self):
+        """Hands out jobs until every one has a result, then returns the
+        results in job order.
+        """
+        self.server.settimeout(0.2)
+        try:
+            while not self.finished.is_set():
+                try:
+                    conn, address = self.server.accept()
+                except socket.timeout:
+                    continue
+                threading.Thread(target=self._handle, args=(conn,),
+                                 daemon=True).start()
+        finally:
+            self.server.close()
+        return [self.results[number] for number in sorted(self.results)]
+
+    def _handle(self, conn):
+        """Talks to one worker until it leaves, then puts its unfinished
+        jobs back on the queue.
+        """
+        leased = set()
+        conn.settimeout(self.timeout)
+        stream = conn.makefile('rwb')
+        try:
+            for line in stream:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError(f'not a request: {request!r}')
+                if request.get('alive'):
+                    continue  # busy with its batch, the timeout starts over
+                reply = self._exchange(request.get('results', ()),
+                                       request.get('want', 0), leased)
+                stream.write(json.dumps(reply).encode() + b'\n')
+                stream.flush()
+                if reply.get('done'):
+                    break
+        except (OSError, ValueError, LookupError, TypeError):
+            pass  # gone, or talking nonsense: its jobs go back
+        finally:
+            with self.lock:
+                self.todo.extend(self.jobs[number] for number in leased if
+                                 number not in self.results)
+            try:
+                stream.close()
+                conn.close()
+            except OSError:
+                pass
+
+    def _exchange(self, results, want, leased):
+        fresh = []
+        with self.lock:
+            for result in results:
+                number = result[0]
+                leased.discard(number)
+                if number in self.jobs and number not in self.results:
+                    self.results[number] = result  # repeats are dropped
+                    fresh.append(result)
+            jobs = []
+            while self.todo and len(jobs) < want:
+                job = self.todo.popleft()
+                if job[0] not in self.results:
+                    jobs.append(job)
+                    leased.add(job[0])
+            if len(self.results) == len(self.jobs):
+                self.finished.set()
+
+        if self.on_result:
+            for result in fresh:
+                self.on_result(result)
+        if jobs:
+            return {'jobs': jobs}
+        if self.finished.is_set():
+            return {'jobs': [], 'done': True}
+        return {'jobs': [], 'wait': 0.1}  # the rest are out with others
+
+
+def work(address, batch=20, rows=10, cols=10, retry=5.0, heartbeat=10.0):
+    """Worker: plays jobs from the coordinator at address, (host, port),
+    until it says there are none left. While it plays it sends a heartbeat
+    every heartbeat seconds, well under the coordinator's timeout, or none
+    if heartbeat is None. A dropped connection is made again, the worker
+    giving up once it has not reached the coordinator for retry seconds.
+    Returns the number played.
+    """
+    played = 0
+    results = []  # of the last batch, until the coordinator has them
+    connected = False
+    while True:
+        try:
+            conn = _connect(address, retry)
+        except OSError:
+            if not connected:
+                raise
+            return played  # the coordinator is gone, done or not
+        connected = True
+        lock = threading.Lock()
+        stop = threading.Event()
+        with conn, conn.makefile('rwb') as stream:
+            if heartbeat is not None:
+                threading.Thread(target=_beat,
+                                 args=(stream, lock, stop, heartbeat),
+                                 daemon=True).start()
+            try:
+                while True:
+                    try:
+                        with lock:
+                            stream.write(json.dumps(
+                                {'results': results,
+                                 'want': batch}).encode() + b'\n')
+                            stream.flush()
+                        line = stream.readline()
+                    except OSError:
+                        line = None
+                    if not line:
+                        break  # dropped, the results go on the next one
+                    reply = json.loads(line)
+                    if reply.get('done'):
+                        return played
+                    time.sleep(reply.get('wait', 0))
+                    results = [play(job, rows, cols) for job in reply['jobs']]
+                    played += len(results)
+            finally:
+                stop.set()
+
+
+def _connect(address, retry):
+    """Connects to the coordinator, which may not be up yet, trying for
+    retry seconds.
+    """
+    deadline = time.monotonic() + retry
+    while True:
+        try:
+            return socket.create_connection(address)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def _beat(stream, lock, stop, every):
+    """Tells the coordinator the worker is alive every every seconds until
+    stop is set or the connection goes.
+    """
+    while not stop.wait(every):
+        try:
+            with lock:
+                stream.write(b'{"alive": true}\n')
+                stream.flush()
+        except (OSError, ValueError):  # closed
+            return
+
+
+def start_workers(address, processes, batch=20):
+    """Starts processes worker processes on this machine, returns them.
+    """
+    workers = [Process(target=work, args=(address, batch), daemon=True)
+               for n in range(processes)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def report(results):
+    lines = [f'{len(results)} games']
+    if results:
+        shots = [result[3 + result[1]] for result in results]
+        first = sum(result[1] == result[2] for result in results)
+        lines.append(f'{sum(shots) / len(shots):.2f} shots to win on average'
+                     f', the side going first won {first / len(results):.1%}')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='bship cluster',
+        description='Run a tournament over worker processes on any number of '
+                    'machines.')
+    commands = parser.add_subparsers(dest='command')
+    coordinate = commands.add_parser('coordinate', help='hand out the games')
+    coordinate.add_argument('players', nargs='+',
+                            help='targeting or targeting:placement strategies')
+    coordinate.add_argument('--games', type=int, default=1000)
+    coordinate.add_argument('--host', default='0.0.0.0')
+    coordinate.add_argument('--port', type=int, default=PORT)
+    coordinate.add_argument('--seed', type=int, default=None)
+    coordinate.add_argument('--out', help='file to write the results to, one '
+                                          'JSON list per line')
+    worker = commands.add_parser('work', help='play games for a coordinator')
+    worker.add_argument('address', help='host:port of the coordinator')
+    worker.add_argument('--processes', type=int, default=1)
+    worker.add_argument('--batch', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.command == 'coordinate':
+        if len(args.players) < 2:
+            parser.error('a tournament needs at least two players')
+        coordinator = Coordinator(make_jobs(args.players, args.games,
+                                            args.seed), args.host, args.port)
+        results = coordinator.serve()
+        if args.out:
+            with open(args.out, 'w') as f:
+                for result in results:
+                    f.write(json.dumps(result) + '\n')
+        print(report(results))
+    elif args.command == 'work':
+        host, _, port = args.address.rpartition(':')
+        workers = start_workers((host, int(port)), args.processes,
+                                args.batch)
+        for process in workers:
+            process.join()
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
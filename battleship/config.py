@@ -61,19 +61,50 @@ coordinate:\n\t{}\n([Y]/n) >> ",
     'pos_ok?': "The {} will be hidden here:\n\t[ {} ]\n([Y]/n) >> ",
     'player_attack': "Player1 attacks {}.",
     'comp_attack': "Computer attacks {}.",
-    'bored': "OK you're bored, Goodbye!!"
+    'salvo_shot': "Salvo shot {} of {}.",
+    'salvo_twice': "   That coordinate is already in this salvo.",
+    'salvo_result': "   {} shots: {}",
+    'bored': "OK you're bored, Goodbye!!",
+    # .screen
+    'screen_setup': "Your fleet is hidden. [r] hides it again, [Enter] \
+starts the battle, [q] quits.",
+    'screen_aim': "Type a coordinate and press [Enter] to bomb, [q] quits. \
+>> {}",
+    'screen_again': "[Enter] plays again, [q] quits.",
 }
 
 POINT = {
     'open': '.',
     'miss': 'x',
-    'hit': '@'
+    'hit': '@',
+    'clear': '~',  # not shot, but known to be empty by the adjacency rule
 }
 
-FLEET = {
-    'K': Ship('AircraftCarrier', 'K', 5),
-    'T': Ship('Battleship', 'T', 4),
-    'S': Ship('Submarine', 'S', 3),
-    'Y': Ship('Destroyer', 'Y', 3),
-    'P': Ship('PatrolBoat', 'P', 2)
-}
+# how close ships may be hidden: 'touch' anywhere but on top of each other,
+# 'no-touch' not sharing an edge, 'no-diagonal-touch' not even a corner
+ADJACENCY = ('touch', 'no-touch', 'no-diagonal-touch')
+
+# name, sign and size of each ship in a fleet
+SHIPS = (
+    ('AircraftCarrier', 'K', 5),
+    ('Battleship', 'T', 4),
+    ('Submarine', 'S', 3),
+    ('Destroyer', 'Y', 3),
+    ('PatrolBoat', 'P', 2),
+)
+
+
+def fleet(ships=SHIPS):
+    """Returns a new dict of sign to Ship for a whole fleet, ships is a table
+    like SHIPS.
+    """
+    return {sign: Ship(name, sign, size) for name, sign, size in ships}
+
+
+def __getattr__(name):
+    """FLEET is only built the first time it is used.
+    """
+    if name == 'FLEET':
+        globals()['FLEET'] = fleet()
+        return globals()['FLEET']
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
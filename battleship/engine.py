@@ -1,4 +1,6 @@
 import random
+import time
+from battleship import metrics
 from battleship.players import Human, Computer
 from battleship.config import PROMPT
 from battleship.ui import show_game, convert, flip
@@ -6,12 +8,34 @@ from battleship.ui import show_game, convert, flip
 
 class Engine(object):
 
-    def __init__(self):
-        """Engine has a list of players.
+    def __init__(self, rules='classic', adjacency='touch'):
+        """Engine has a list of players. With the 'salvo' rules each turn is
+        one shot per ship the player still has afloat. adjacency is how close
+        the ships may be hidden, one of config.ADJACENCY.
         """
+        self.rules = rules
         self.opponent = Computer()
         self.home = Human()
         self.players = self.opponent, self.home
+        for player in self.players:
+            player.brd.adjacency = adjacency
+
+        self.opponent.aim(self.home.brd)
+        self.home.aim(self.opponent.brd)
+
+        self.watchers = []
+        self.turn = 0
+        self.first_player = None
+
+    def watch(self, watcher):
+        """Calls watcher(event) with a dict for each event of the game, its
+        'type' being 'shot' (a 'coord' fired at), 'result' (of the shot at
+        'coord'), 'sink' (the 'ship' sign and 'coords' of a ship just sunk),
+        'turn_over' once the player's shots are resolved, or 'game_over'
+        (with the 'winner'). Every event also has the name of the 'player'
+        whose turn it is and the 'turn' number.
+        """
+        self.watchers.append(watcher)
 
     def start(self):
         """Starts the game with some instructions.
@@ -44,32 +68,57 @@ class Engine(object):
         else:
             self.current_player = self.opponent
             self.next_player = self.home
+        self.first_player = self.current_player
+        self.turn = 0
 
         input(PROMPT['comprehend'])
 
     def play(self):
-        """Rolls out the turns, determines who wins.
+        """Rolls out the turns, determines who wins. A game restored from a
+        checkpoint carries on from its turn.
         """
-        turn = 0
-        first2go = self.current_player
+        metrics.GAMES.inc()
+        metrics.PLAYING.inc()
+        try:
+            return self._play()
+        finally:
+            metrics.PLAYING.dec()
 
-        print(PROMPT['turn_line'].format(turn))
+    def _play(self):
+        if self.first_player is None:
+            self.first_player = self.current_player
+        first2go = self.first_player
 
-        show_game(self.home.brd, self.opponent.brd)
+        print(PROMPT['turn_line'].format(self.turn))
+
+        self._show()
 
         while True:
             if self.current_player == first2go:
-                turn += 1
-                print(PROMPT['turn_line'].format(turn))
-
-            point = self.current_player.where2bomb()
-            self.next_player.receive_shot(point)
+                self.turn += 1
+                print(PROMPT['turn_line'].format(self.turn))
+
+            if self.current_player is self.home:
+                self._speculate()
+
+            if self.rules == 'salvo':
+                self._salvo()
+            else:
+                point = self.current_player.where2bomb()
+                self._emit('shot', coord=point)
+                result = self.next_player.receive_shot(point)
+                self.current_player.observe(point, result)
+                self._resolved(point, result)
+            self._emit('turn_over')
 
             if self.current_player != first2go:
-                show_game(self.home.brd, self.opponent.brd)
+                self._show()
                 input(PROMPT['comprehend'])
 
             if self.next_player.sunk == 5:
+                self.opponent.lookahead.close()
+                self.opponent.learn(self.home.brd)
+                self._emit('game_over', winner=self.current_player.name())
                 return self.current_player.win()
 
             self.current_player, self.next_player =\
@@ -85,6 +134,52 @@ class Engine(object):
         else:
             return True
 
+    def _show(self):
+        start = time.perf_counter()
+        show_game(self.home.brd, self.opponent.brd)
+        metrics.RENDER_SECONDS.observe(time.perf_counter() - start)
+
+    def _speculate(self):
+        """While the Human thinks, the Computer works out its next move. Under
+        salvo rules that is one shot per ship it has afloat, one less if the
+        Human sinks a ship; both are worked out.
+        """
+        if self.rules == 'salvo':
+            shots = len(self.opponent.brd.afloat())
+            branches = [shots, shots - 1] if shots > 1 else [shots]
+        else:
+            branches = [None]
+        self.opponent.speculate(branches)
+
+    def _salvo(self):
+        """The current player fires one shot per surviving ship, resolved by
+        the other player's Board in one go.
+        """
+        shots = len(self.current_player.brd.afloat())
+        points = self.current_player.where2bomb(shots)
+        for point in points:
+            self._emit('shot', coord=point)
+
+        for point, result in self.next_player.receive_volley(points):
+            self.current_player.observe(point, result)
+            self._resolved(point, result)
+
+    def _resolved(self, point, result):
+        if not self.watchers:
+            return
+        self._emit('result', coord=point, result=result)
+        if result == 'sunk':
+            sign = self.next_player.brd.board[point].upper()
+            ship = self.next_player.brd.fleet[sign]
+            self._emit('sink', ship=sign, coords=list(ship.pos))
+
+    def _emit(self, kind, **event):
+        if self.watchers:
+            event.update(type=kind, player=self.current_player.name(),
+                         turn=self.turn)
+            for watcher in self.watchers:
+                watcher(event)
+
     def _example_setup(self):
         """Setup to show an example of the board and game.
         """
@@ -92,5 +187,4 @@ class Engine(object):
         fleet_lst = [fleet[ship] for ship in fleet]
         random.shuffle(fleet_lst)
 
-        for ship in fleet_lst:
-            self.opponent.auto_hide_ships(ship, 2)
+        self.opponent.auto_hide_fleet(fleet_lst, 2)
@@ -0,0 +1,122 @@
+"""Targeting that shoots where it learns most about the enemy layout.
+
+EntropyTargeting ('entropy') keeps the pool of sampled layouts consistent
+with the board that MonteCarloTargeting does. Instead of the cell most
+layouts put a ship on, it shoots the cell whose result (miss, hit or sunk)
+the layouts are most divided over: the expected information the shot gives
+about which layout is the real one, the entropy of its result over the pool.
+Information alone is myopic, though: it would rather shoot a cell half the
+layouts put a ship on than finish off a ship nine in ten agree on. So each
+cell is scored its information plus greed times its chance of a hit; over
+200 games on the 10x10 board pure information (greed 0) took about three
+shots more than montecarlo, greed 1 about as many as density.
+
+All cells are scored in one pass over the pool transposed into bit-sliced
+columns: per cell, an int with a bit per layout putting a ship there, and
+one per layout where a shot there would sink it. Counting the layouts of
+each result is then a popcount per cell, so scoring costs about as much
+as the counting montecarlo does, a few milliseconds on a 10x10 board.
+"""
+from math import log
+from time import perf_counter
+from battleship.geometry import bits, popcount
+from battleship.montecarlo import MonteCarloTargeting
+from battleship.strategies import register
+
+
+@register('targeting', 'entropy')
+class EntropyTargeting(MonteCarloTargeting):
+    """Shoots the unknown cell whose result the sampled layouts are most
+    divided over, a likely hit counting greed times its chance on top.
+    """
+    greed = 1.0
+
+    def __init__(self, rng=None, particles=None, budget=None, greed=None):
+        super().__init__(rng, particles, budget)
+        if greed is not None:
+            self.greed = greed
+        self.xlogx = [0.0]  # k log k by k, for the entropies
+
+    def pick(self, view):
+        values = self.values(view)
+        if values is None:  # no particle survived the budget
+            return self.fallback.pick(view)
+        best = max(values.values())
+        return self.geo.coord(self.rng.choice(
+            [index for index, value in values.items() if value == best]))
+
+    def pick_many(self, view, shots):
+        """A salvo takes the cells scoring best each on their own.
+        """
+        values = self.values(view)
+        if values is None:
+            return self.fallback.pick_many(view, shots)
+        ranked = sorted(values, key=lambda index: (-values[index],
+                                                   self.rng.random()))
+        return [self.geo.coord(index) for index in ranked[:shots]]
+
+    def values(self, view):
+        """Returns per unknown cell index its information plus greed times
+        its chance of a hit, None if the pool is empty.
+        """
+        scores = self.scores(view)
+        if scores is None:
+            return None
+        layouts = len(self.pool)
+        # rounded so that cells with the same counts tie
+        return {index: round(entropy + self.greed * hits / layouts, 9) for
+                index, (entropy, hits) in scores.items()}
+
+    def scores(self, view):
+        """Brings the pool up to date with the view and returns per unknown
+        cell index its (information, layouts with a ship there), None if the
+        pool is empty, all within the time budget.
+        """
+        start = perf_counter()
+        self._sync(view)
+        synced = perf_counter()
+        self._refill(start + self.budget - self.scoring * self.size)
+        scoring = perf_counter()
+        layouts = len(self.pool)
+        if not layouts:
+            return None
+
+        ships, sinks = self.columns()
+        while len(self.xlogx) <= layouts:
+            k = len(self.xlogx)
+            self.xlogx.append(k * log(k))
+        xlogx = self.xlogx
+
+        scores = {}
+        total = xlogx[layouts]
+        for index in bits(self.unknown):
+            hit = popcount(ships[index])
+            sink = popcount(sinks[index])
+            # entropy in nats of the miss, hit and sunk counts
+            entropy = (total - xlogx[layouts - hit] - xlogx[hit - sink] -
+                       xlogx[sink]) / layouts
+            scores[index] = (entropy, hit)
+        self._spent(synced - start, scoring)
+        return scores
+
+    def columns(self):
+        """Returns the pool as two lists of bit-sliced columns by cell index,
+        bit n of each standing for layout n of the pool: the layouts with an
+        afloat ship on the cell, and those where a shot at it sinks one.
+        """
+        using = {}  # afloat ship mask to the layouts having it
+        for number, layout in enumerate(self.pool):
+            bit = 1 << number
+            for sign, mask in layout.items():
+                if sign not in self.sunk:
+                    using[mask] = using.get(mask, 0) | bit
+
+        ships = [0] * self.geo.cells
+        sinks = [0] * self.geo.cells
+        for mask, layouts in using.items():
+            left = mask & ~self.hits
+            for index in bits(left):
+                ships[index] |= layouts
+            if left and not left & (left - 1):  # one cell left to hit
+                sinks[left.bit_length() - 1] |= layouts
+        return ships, sinks
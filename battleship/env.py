@@ -0,0 +1,284 @@
+"""Reinforcement learning environments: an agent shoots at a hidden fleet.
+
+The rules are those of Board.shoot() but the state is kept in flat arrays,
+so VectorEnv.step() advances many environments in one call. Observations are
+bytes in C order for a uint8 tensor of shape (envs, 3, rows, cols): the
+planes are hits on ships still afloat, misses and sunk ships. With numpy:
+
+    obs = numpy.frombuffer(env.reset(), numpy.uint8).reshape(env.shape)
+
+    python -m battleship.env --envs 64 --seconds 5
+"""
+import argparse
+import operator
+import random
+from time import perf_counter
+from battleship.board import Board
+from battleship.config import SHIPS
+from battleship.geometry import geometry
+from battleship.strategies import make_placement
+
+HIT, MISS, SUNK = range(3)  # observation planes
+
+# reward for each result of a shot
+REWARDS = {
+    'miss': 0.0,
+    'hit': 1.0,
+    'sunk': 1.0,
+    'already_shot': -1.0,
+}
+
+
+class VectorEnv(object):
+
+    def __init__(self, envs=1, rows=10, cols=10, ships=SHIPS, placement=None,
+                 seed=None, max_steps=None, autoreset=True, rewards=REWARDS):
+        """envs environments on rows x cols boards with the ships table of
+        config.SHIPS. The fleets are hidden uniformly at random unless a
+        placement strategy name is given. An episode ends when the fleet is
+        sunk or after max_steps shots (default twice the cells); with
+        autoreset finished environments start again straight away.
+        """
+        self.envs = envs
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+        self.shape = (envs, 3, rows, cols)
+        self.ships = tuple(ships)
+        self.sizes = tuple(size for name, sign, size in self.ships)
+        self.geo = geometry(rows, cols)
+        self.placement = placement
+        self.max_steps = max_steps or 2 * self.cells
+        self.autoreset = autoreset
+        self.rewards = tuple(rewards[result] for result in
+                             ('miss', 'hit', 'sunk', 'already_shot'))
+        self.rng = random.Random(seed)
+
+        count = len(self.ships)
+        self.obs = bytearray(envs * 3 * self.cells)
+        self.ship_at = bytearray(envs * self.cells)  # 0 water, n ship n - 1
+        self.shot = bytearray(envs * self.cells)
+        self.left = [0] * (envs * count)  # hits each ship can still take
+        self.ship_cells = [()] * (envs * count)
+        self.afloat = [0] * envs
+        self.steps = [0] * envs
+        self.returns = [0.0] * envs
+
+    def reset(self, seed=None):
+        """Hides new fleets in every environment, returns the observations.
+        """
+        if seed is not None:
+            self.rng.seed(seed)
+        for env in range(self.envs):
+            self._reset(env)
+        return bytes(self.obs)
+
+    def _indexes(self, actions):
+        """Returns the actions, a list, tuple or array, as cell indexes,
+        raising ValueError unless there is one per environment and each is a
+        cell.
+        """
+        if len(actions) != self.envs:
+            raise ValueError(f'{len(actions)} actions for {self.envs} '
+                             f'environments')
+        try:
+            if len(actions) == 0 or (0 <= min(actions) and
+                                     max(actions) < self.cells):
+                return actions  # all indexes already, checked at C speed
+        except (TypeError, ValueError):  # (col, row) pairs among them
+            pass
+        indexes = []
+        for action in actions:
+            try:
+                index = operator.index(action)
+            except TypeError:  # a (col, row) pair
+                col, row = action
+                if not (0 <= col < self.cols and 0 <= row < self.rows):
+                    raise ValueError(f'no cell {tuple(action)} on a '
+                                     f'{self.rows}x{self.cols} board')
+                index = col + row * self.cols
+            else:
+                if not 0 <= index < self.cells:
+                    raise ValueError(f'action {action} is not a cell index '
+                                     f'from 0 to {self.cells - 1}')
+            indexes.append(index)
+        return indexes
+
+    def step(self, actions):
+        """Takes one action per environment, a cell index col + row * cols or
+        a (col, row) tuple. Returns the observations, and lists of rewards,
+        done flags and info dicts; info['result'] is the result of the shot.
+        A finished environment's info also has its 'episode' shots and
+        return, and with autoreset its 'final_observation', while the
+        observation returned is already that of the next episode. Raises
+        ValueError, before any action is taken, unless there is an action for
+        every environment and each is a cell.
+        """
+        indexes = self._indexes(actions)
+        cells = self.cells
+        count = len(self.sizes)
+        obs, ship_at, shot, left = self.obs, self.ship_at, self.shot, self.left
+        miss_reward, hit_reward, sunk_reward, again_reward = self.rewards
+        rewards = [0.0] * self.envs
+        dones = [False] * self.envs
+        infos = [None] * self.envs
+
+        for env, action in enumerate(indexes):
+            base = env * cells
+            planes = base * 3
+            cell = base + action
+
+            if shot[cell]:
+                result, reward = 'already_shot', again_reward
+            else:
+                shot[cell] = 1
+                ship = ship_at[cell]
+                if not ship:
+                    obs[planes + MISS * cells + action] = 1
+                    result, reward = 'miss', miss_reward
+                else:
+                    which = env * count + ship - 1
+                    left[which] -= 1
+                    if left[which]:
+                        obs[planes + HIT * cells + action] = 1
+                        result, reward = 'hit', hit_reward
+                    else:
+                        for index in self.ship_cells[which]:
+                            obs[planes + HIT * cells + index] = 0
+                            obs[planes + SUNK * cells + index] = 1
+                        self.afloat[env] -= 1
+                        result, reward = 'sunk', sunk_reward
+
+            self.steps[env] += 1
+            self.returns[env] += reward
+            rewards[env] = reward
+            info = {'result': result}
+
+            if not self.afloat[env] or self.steps[env] >= self.max_steps:
+                dones[env] = True
+                info['episode'] = {'shots': self.steps[env],
+                                   'return': self.returns[env],
+                                   'won': not self.afloat[env]}
+                if self.autoreset:
+                    info['final_observation'] = bytes(obs[planes:planes +
+                                                          3 * cells])
+                    self._reset(env)
+            infos[env] = info
+
+        return bytes(obs), rewards, dones, infos
+
+    def legal(self, env):
+        """Returns the cell indices environment env has not shot yet.
+        """
+        base = env * self.cells
+        shot = self.shot
+        return [index for index in range(self.cells) if not shot[base + index]]
+
+    def _reset(self, env):
+        cells = self.cells
+        count = len(self.sizes)
+        base = env * cells
+        self.obs[base * 3:(base + cells) * 3] = bytes(3 * cells)
+        self.shot[base:base + cells] = bytes(cells)
+        self.ship_at[base:base + cells] = bytes(cells)
+
+        for ship, idx in enumerate(self._layout()):
+            for index in idx:
+                self.ship_at[base + index] = ship + 1
+            self.left[env * count + ship] = len(idx)
+            self.ship_cells[env * count + ship] = idx
+
+        self.afloat[env] = count
+        self.steps[env] = 0
+        self.returns[env] = 0.0
+
+    def _layout(self):
+        """Returns the cell indices of each ship of a new hidden fleet.
+        """
+        if self.placement is not None:
+            fleet = Board(self.rows, self.cols, self.ships).fleet
+            hider = make_placement(self.placement, rng=self.rng)
+            layout = hider.place(self.rows, self.cols, list(fleet.values()))
+            return [tuple(sorted(self.geo.index(coord) for coord in
+                                 layout[sign]))
+                    for name, sign, size in self.ships]
+
+        while True:
+            occupied = 0
+            layout = []
+            for size in self.sizes:
+                placements = self.geo.placements(size)
+                for attempt in range(100):
+                    mask, idx = self.rng.choice(placements)
+                    if not mask & occupied:
+                        break
+                else:
+                    break  # painted into a corner, start again
+                occupied |= mask
+                layout.append(idx)
+            else:
+                return layout
+
+
+class BattleshipEnv(object):
+    """A single environment with the reset()/step(action) interface, step
+    returns (observation, reward, done, info) and does not reset by itself.
+    """
+
+    def __init__(self, rows=10, cols=10, ships=SHIPS, placement=None,
+                 seed=None, max_steps=None, rewards=REWARDS):
+        self.vector = VectorEnv(1, rows, cols, ships, placement, seed,
+                                max_steps, autoreset=False, rewards=rewards)
+        self.shape = self.vector.shape[1:]
+        self.actions = self.vector.cells
+
+    def reset(self, seed=None):
+        return self.vector.reset(seed)
+
+    def step(self, action):
+        obs, rewards, dones, infos = self.vector.step((action,))
+        return obs, rewards[0], dones[0], infos[0]
+
+    def legal(self):
+        return self.vector.legal(0)
+
+
+def throughput(envs=64, seconds=2.0, seed=None):
+    """Steps envs environments with random unshot actions for about seconds
+    and returns the steps per minute.
+    """
+    vector = VectorEnv(envs, seed=seed)
+    vector.reset()
+    rng = random.Random(seed)
+    # a shuffled order of cells per environment stands in for an agent
+    orders = [rng.sample(range(vector.cells), vector.cells)
+              for env in range(envs)]
+    moves = [0] * envs
+    steps = 0
+
+    start = perf_counter()
+    while perf_counter() - start < seconds:
+        actions = [orders[env][moves[env]] for env in range(envs)]
+        obs, rewards, dones, infos = vector.step(actions)
+        for env in range(envs):
+            moves[env] = 0 if dones[env] else moves[env] + 1
+        steps += envs
+
+    return steps / (perf_counter() - start) * 60
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m battleship.env',
+        description='Measure the steps per minute of VectorEnv.')
+    parser.add_argument('--envs', type=int, default=64)
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    print(f'{throughput(args.envs, args.seconds, args.seed):,.0f} steps per '
+          f'minute with {args.envs} environments')
+
+
+if __name__ == "__main__":
+    main()
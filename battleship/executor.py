@@ -0,0 +1,252 @@
+"""Computer moves worked out in a pool of processes, so an expensive
+targeting strategy does not hold up an event loop serving other matches.
+
+A MoveExecutor takes move requests from any number of matches, gathers the
+ones arriving together into one call to a worker process, so pickling and
+the trip through the pool are paid once per batch rather than once per move,
+and answers each with a future. A move not back by its deadline is answered
+with a cheap fallback strategy instead, and the late one is dropped.
+
+    executor = MoveExecutor(workers=4, deadline=0.05)
+    coord = await executor.move('montecarlo', view, key=match_id)
+    ...
+    executor.close()
+
+Requests carry what a BoardView shows, not the Board, so they stay small.
+Each worker keeps the strategy of the last matches it played by key: a
+strategy that carries state from move to move picks it up again when the
+same worker gets the match, and rebuilds it from the board otherwise. A key
+must stand for one game only, never reused for the next; forget() it once
+the game is over.
+"""
+import asyncio
+import itertools
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from battleship import metrics
+from battleship.board import Board
+from battleship.strategies import BoardView, make_targeting
+
+KEEP = 256  # strategies a worker keeps, least recently used go first
+
+_strategies = OrderedDict()  # in a worker, key to (name, strategy)
+
+
+def describe(view):
+    """Returns what a move needs of a BoardView as plain data: rows, cols,
+    the adjacency rule, the sizes of the ships, the points of every cell row
+    by row and the coords of the ships sunk.
+    """
+    cells = ''.join(view[(col, row)] for row in range(view.rows)
+                    for col in range(view.cols))
+    return (view.rows, view.cols, view.adjacency, view.ships(), cells,
+            view.sunk())
+
+
+def rebuild(rows, cols, adjacency, ships, cells, sunk):
+    """Returns a BoardView of a Board that shows what describe() did, the
+    ships not sunk being nowhere.
+    """
+    brd = Board(rows, cols, [(sign, sign, size) for sign, size in
+                             ships.items()], adjacency)
+    for index, point in enumerate(cells):
+        brd.board[(index % cols, index // cols)] = point
+    for sign, pos in sunk.items():
+        ship = brd.fleet[sign]
+        ship.pos = [tuple(coord) for coord in pos]
+        ship.hits = ship.size
+    return BoardView(brd)
+
+
+def play_moves(requests, forget=()):
+    """Worker: drops the strategies of the keys in forget, then returns
+    the move for each (key, targeting, seed, shots, description) request,
+    None for one that failed.
+    """
+    for key in forget:
+        _strategies.pop(key, None)
+    moves = []
+    for key, name, seed, shots, description in requests:
+        try:
+            strategy = _strategy(key, name, seed)
+            view = rebuild(*description)
+            if shots is None:
+                moves.append(strategy.pick(view))
+            else:
+                moves.append(strategy.pick_many(view, shots))
+        except Exception:  # the deadline's fallback answers it
+            moves.append(None)
+    return moves
+
+
+def _strategy(key, name, seed):
+    if key in _strategies and _strategies[key][0] == name:
+        _strategies.move_to_end(key)
+        return _strategies[key][1]
+    strategy = make_targeting(name, rng=random.Random(seed))
+    _strategies[key] = name, strategy
+    while len(_strategies) > KEEP:
+        _strategies.popitem(last=False)
+    return strategy
+
+
+class MoveExecutor(object):
+
+    def __init__(self, workers=None, deadline=0.05, batch=64, linger=0.001,
+                 fallback='random'):
+        """Runs moves on workers processes (None for one per core). Each
+        move is answered within deadline seconds; requests are sent in
+        batches of up to batch, waiting up to linger seconds for a batch to
+        fill, and split so that every worker gets a share. fallback names the
+        targeting strategy answering late moves.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.deadline = deadline
+        self.batch = batch
+        self.linger = linger
+        self.fallback = make_targeting(fallback)  # dispatcher thread only
+        self.pool = ProcessPoolExecutor(self.workers)
+        self.numbers = itertools.count()
+        self.lock = threading.Condition()
+        self.queue = []  # (number, request, time queued), not sent yet
+        self.waiting = {}  # number to (future, due, view, shots)
+        self.forgotten = set()  # keys of games over, for the workers to drop
+        self.closed = False
+        self.moves = 0
+        self.missed = 0  # answered by the fallback
+        self.thread = threading.Thread(target=self._dispatch, daemon=True,
+                                       name='moves')
+        self.thread.start()
+
+    def submit(self, targeting, view, shots=None, key=None, seed=None):
+        """Asks for the move of the targeting strategy named on view, for
+        shots shots (None for one). key tells the matches apart, so a worker
+        can keep a match's strategy between moves; seed seeds a new one.
+        Returns a concurrent Future of the coord, or list of coords.
+        """
+        if not isinstance(targeting, str):
+            raise ValueError('a strategy for a worker is given by name')
+        future = Future()
+        number = next(self.numbers)
+        request = (key, targeting, seed, shots, describe(view))
+        now = time.monotonic()
+        with self.lock:
+            if self.closed:
+                raise RuntimeError('the executor is closed')
+            self.queue.append((number, request, now))
+            self.waiting[number] = (future, now + self.deadline, view, shots)
+            self.lock.notify()
+        return future
+
+    async def move(self, targeting, view, shots=None, key=None, seed=None):
+        """submit() for asyncio code: awaits the move without blocking the
+        event loop.
+        """
+        return await asyncio.wrap_future(
+            self.submit(targeting, view, shots, key, seed))
+
+    def forget(self, key):
+        """Lets the workers drop the strategy kept for key, its game being
+        over. They are told along with the next batches sent; a worker not
+        getting one drops it in time as the least recently used.
+        """
+        with self.lock:
+            self.forgotten.add(key)
+
+    def close(self):
+        """Answers the moves still waiting with the fallback and stops the
+        workers.
+        """
+        with self.lock:
+            self.closed = True
+            self.lock.notify()
+        self.thread.join()
+        self.pool.shutdown()
+
+    def _dispatch(self):
+        """Sends batches to the pool and answers late moves, on a thread of
+        its own.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                late = self._late(now)
+                batches = []
+                if self.queue and (self.closed or
+                                   len(self.queue) >= self.batch or
+                                   now >= self.queue[0][2] + self.linger):
+                    # as many as fit, shared out between the workers
+                    taken = self.queue[:self.batch * self.workers]
+                    del self.queue[:len(taken)]
+                    size = -(-len(taken) // self.workers)
+                    batches = [taken[start:start + size] for start in
+                               range(0, len(taken), size)]
+                    forget, self.forgotten = list(self.forgotten), set()
+                if self.closed and not self.waiting and not late:
+                    return
+                if not (late or batches):
+                    self.lock.wait(self._timeout(now))
+                    continue
+
+            for number, future, view, shots in late:
+                self._answer(future, self._fall_back(view, shots))
+            for batch in batches if not self.closed else ():
+                numbers = [number for number, request, queued in batch]
+                sent = self.pool.submit(play_moves, [
+                    request for number, request, queued in batch], forget)
+                sent.add_done_callback(
+                    lambda sent, numbers=numbers: self._done(numbers, sent))
+
+    def _late(self, now):
+        """Takes the moves past their deadline, all of them once closed, off
+        the books, as (number, future, view, shots). The lock must be held.
+        """
+        late = [number for number, (future, due, view, shots) in
+                self.waiting.items() if due <= now or self.closed]
+        if not late:
+            return []
+        gone = set(late)
+        self.queue = [entry for entry in self.queue if entry[0] not in gone]
+        self.missed += len(late)
+        metrics.MISSED.inc(len(late))
+        taken = []
+        for number in late:
+            future, due, view, shots = self.waiting.pop(number)
+            taken.append((number, future, view, shots))
+        return taken
+
+    def _timeout(self, now):
+        """Seconds until the next batch is due or a move is late.
+        """
+        times = [due for future, due, view, shots in self.waiting.values()]
+        if self.queue:
+            times.append(self.queue[0][2] + self.linger)
+        return max(0, min(times) - now) if times else None
+
+    def _done(self, numbers, sent):
+        """Called on a pool thread with a batch's moves.
+        """
+        try:
+            moves = sent.result()
+        except Exception:  # a broken worker, the deadlines take over
+            return
+        with self.lock:
+            answered = [(self.waiting.pop(number)[0], move) for number, move
+                        in zip(numbers, moves) if number in self.waiting and
+                        move is not None]
+            self.moves += len(answered)
+        for future, move in answered:
+            self._answer(future, move)
+
+    def _fall_back(self, view, shots):
+        if shots is None:
+            return self.fallback.pick(view)
+        return self.fallback.pick_many(view, shots)
+
+    def _answer(self, future, move):
+        if not future.done():
+            future.set_result(move)
@@ -0,0 +1,194 @@
+"""Free-for-all: 3 to 16 Computer players, each with their own Board, take
+turns shooting at whichever other player they choose until one fleet is left.
+
+Every board is public, so a player's view of an opponent is a BoardView of
+that opponent's board, nothing to update. What a player needs to choose a
+target is kept per board by a Board watcher, from the coords each shot
+changes, so a turn costs the same however many opponents there are: one
+look over the living boards' tallies and one targeting move on the board
+chosen.
+
+    bship ffa --players 8 --seed 3
+"""
+import argparse
+import random
+from battleship.board import Board
+from battleship.config import POINT, SHIPS
+from battleship.strategies import BoardView, make_placement, make_targeting
+
+MIN_PLAYERS, MAX_PLAYERS = 3, 16
+
+
+class Tally(object):
+    """What every player can see of one board: the hits on ships still
+    afloat, and how many ship cells have not been hit yet.
+    """
+
+    def __init__(self, brd):
+        self.open_hits = set()
+        self.struck = set()
+        self.cells = sum(ship.size for ship in brd.fleet.values())
+        brd.watch(self)
+
+    def __call__(self, brd, coords):
+        for coord in coords:
+            point = brd.board[coord]
+            if point == POINT['hit']:
+                self.open_hits.add(coord)
+                self.struck.add(coord)
+            else:
+                self.open_hits.discard(coord)
+                if point != POINT['miss'] and point.islower():
+                    self.struck.add(coord)  # sunk
+
+    @property
+    def left(self):
+        return self.cells - len(self.struck)
+
+
+class Seat(object):
+    """One player of a free-for-all: a name, a board and the strategies it
+    plays with. It gets one targeting strategy per opponent, made when it
+    first shoots at them, since a targeting strategy plays one board.
+    """
+
+    def __init__(self, name, targeting='density', placement='random',
+                 rows=10, cols=10, ships=SHIPS, rng=None):
+        self.name = name
+        self.rng = rng or random.Random()
+        self.brd = Board(rows, cols, ships)
+        self.targeting = targeting
+        self.placement = placement
+        self.targets = {}  # opponent name to TargetingStrategy
+        self.shots = 0
+
+    def set_up(self):
+        hider = make_placement(self.placement, rng=self.rng)
+        layout = hider.place(self.brd.rows, self.brd.cols,
+                             list(self.brd.fleet.values()))
+        for sign, pos in layout.items():
+            self.brd.place_ship(self.brd.fleet[sign], pos)
+
+    def choose(self, opponents, tallies):
+        """Returns the opponent to shoot at: one with a ship already hit if
+        any, to finish it off, else the one with the fewest ship cells left.
+        Ties are broken at random.
+        """
+        def key(seat):
+            tally = tallies[seat.name]
+            return not tally.open_hits, tally.left, self.rng.random()
+        return min(opponents, key=key)
+
+    def shoot(self, target, view):
+        if target.name not in self.targets:
+            self.targets[target.name] = make_targeting(
+                self.targeting, rng=random.Random(self.rng.random()))
+        strategy = self.targets[target.name]
+        coord = strategy.pick(view)
+        result, ship = target.brd.shoot(coord)
+        strategy.observe(coord, result)
+        self.shots += 1
+        return coord, result, ship
+
+
+class FreeForAll(object):
+
+    def __init__(self, players=4, targeting='density', placement='random',
+                 rows=10, cols=10, ships=SHIPS, seed=None):
+        """players is a number of players or a list of (targeting,
+        placement) strategy names, one per player.
+        """
+        if isinstance(players, int):
+            players = [(targeting, placement)] * players
+        if not MIN_PLAYERS <= len(players) <= MAX_PLAYERS:
+            raise ValueError(f'a free-for-all takes {MIN_PLAYERS} to '
+                             f'{MAX_PLAYERS} players, not {len(players)}')
+        self.rng = random.Random(seed)
+        self.seats = [Seat(f'P{n + 1}', targeting, placement, rows, cols,
+                           ships, random.Random(self.rng.random()))
+                      for n, (targeting, placement) in enumerate(players)]
+        self.tallies = {seat.name: Tally(seat.brd) for seat in self.seats}
+        self.views = {seat.name: BoardView(seat.brd) for seat in self.seats}
+        self.alive = list(self.seats)
+        self.out = []  # names in the order they were knocked out
+        self.watchers = []
+        self.turn = 0
+
+    def watch(self, watcher):
+        """Calls watcher(event) with the event dicts of Engine.watch(), the
+        'shot', 'result' and 'sink' events also naming the 'target' player,
+        and an 'out' event for each player knocked out.
+        """
+        self.watchers.append(watcher)
+
+    def play(self):
+        """Sets up every board and plays until one player is left. Returns
+        the winner's name.
+        """
+        for seat in self.seats:
+            seat.set_up()
+
+        while len(self.alive) > 1:
+            self.turn += 1
+            for seat in list(self.alive):
+                if seat not in self.alive:
+                    continue  # knocked out earlier this round
+                self._move(seat)
+                if len(self.alive) == 1:
+                    break
+
+        winner = self.alive[0].name
+        self._emit('game_over', winner, winner=winner)
+        return winner
+
+    def standings(self):
+        """Returns the names best first: the winner, then those knocked out
+        last to first.
+        """
+        return [seat.name for seat in self.alive] + self.out[::-1]
+
+    def _move(self, seat):
+        opponents = [other for other in self.alive if other is not seat]
+        target = seat.choose(opponents, self.tallies)
+        coord, result, ship = seat.shoot(target, self.views[target.name])
+
+        if self.watchers:
+            self._emit('shot', seat.name, target=target.name, coord=coord)
+            self._emit('result', seat.name, target=target.name, coord=coord,
+                       result=result)
+            if result == 'sunk':
+                self._emit('sink', seat.name, target=target.name,
+                           ship=ship.sign, coords=list(ship.pos))
+
+        if result == 'sunk' and not target.brd.afloat():
+            self.alive.remove(target)
+            self.out.append(target.name)
+            self._emit('out', seat.name, target=target.name)
+
+    def _emit(self, kind, player, **event):
+        if self.watchers:
+            event.update(type=kind, player=player, turn=self.turn)
+            for watcher in self.watchers:
+                watcher(event)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='bship ffa',
+        description='Play a free-for-all between Computer players.')
+    parser.add_argument('--players', type=int, default=4)
+    parser.add_argument('--targeting', default='density')
+    parser.add_argument('--placement', default='random')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    game = FreeForAll(args.players, args.targeting, args.placement,
+                      seed=args.seed)
+    game.play()
+    for place, name in enumerate(game.standings(), 1):
+        seat = next(seat for seat in game.seats if seat.name == name)
+        print(f'{place:3}. {name:4} {seat.shots:5} shots')
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,16 @@
 from battleship.engine import Engine
 
 
-def run():
+def run(rules='classic', adjacency='touch'):
     """Runs the Engine methods in the right order.
     """
-    game = Engine()
+    game = Engine(rules, adjacency)
 
     game.start()
     game.set()
     game.play()
     if game.end():
-        return run()
+        return run(rules, adjacency)
     print("good game!")
 
 
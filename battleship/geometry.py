@@ -0,0 +1,115 @@
+from functools import lru_cache
+
+
+class Geometry(object):
+    """Bitmask bookkeeping for a rows x cols board: every cell is a bit, the
+    cell (col, row) is bit col + row * cols, so a set of coords is a single
+    int and overlap tests are bitwise ands.
+    """
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+        self.full = (1 << self.cells) - 1
+        self.first_col = sum(1 << row * cols for row in range(rows))
+        self.last_col = self.first_col << cols - 1
+        self._placements = {}
+        self._covering = {}
+        self._halos = {}
+
+    def index(self, coord):
+        return coord[0] + coord[1] * self.cols
+
+    def coord(self, index):
+        return index % self.cols, index // self.cols
+
+    def mask(self, coords):
+        """Returns the bitmask of an iterable of coords.
+        """
+        mask = 0
+        for col, row in coords:
+            mask |= 1 << (col + row * self.cols)
+        return mask
+
+    def coords(self, mask):
+        """Returns the list of coords in a bitmask.
+        """
+        return [self.coord(index) for index in bits(mask)]
+
+    def placements(self, size):
+        """Returns a tuple of (mask, cell indices) for every position a ship
+        of size can take on the board, built once per size.
+        """
+        if size not in self._placements:
+            pos = []
+            for row in range(self.rows):
+                for col in range(self.cols - size + 1):
+                    start = col + row * self.cols
+                    pos.append(tuple(range(start, start + size)))
+            if size > 1:
+                for col in range(self.cols):
+                    for row in range(self.rows - size + 1):
+                        start = col + row * self.cols
+                        pos.append(tuple(range(start, start + size * self.cols,
+                                               self.cols)))
+            self._placements[size] = tuple(
+                (sum(1 << i for i in idx), idx) for idx in pos)
+        return self._placements[size]
+
+    def covering(self, size):
+        """Returns, per cell index, the tuple of placement masks of a ship of
+        size that cover that cell.
+        """
+        if size not in self._covering:
+            cover = [[] for index in range(self.cells)]
+            for mask, idx in self.placements(size):
+                for index in idx:
+                    cover[index].append(mask)
+            self._covering[size] = tuple(tuple(masks) for masks in cover)
+        return self._covering[size]
+
+    def halo(self, mask, adjacency):
+        """Returns the mask of the cells around mask that another ship may
+        not take under the adjacency rule, see config.ADJACENCY: a few shifts
+        whatever the number of cells.
+        """
+        if adjacency == 'touch':
+            return 0
+        side = (mask & ~self.first_col) >> 1 | (mask & ~self.last_col) << 1
+        if adjacency == 'no-diagonal-touch':
+            side |= mask
+            return (side | side >> self.cols | side << self.cols) & \
+                self.full & ~mask
+        return (side | mask >> self.cols | mask << self.cols) & \
+            self.full & ~mask
+
+    def halos(self, size, adjacency):
+        """Returns the halo masks of the placements(size), in the same order,
+        built once per size and rule.
+        """
+        if (size, adjacency) not in self._halos:
+            self._halos[size, adjacency] = tuple(
+                self.halo(mask, adjacency) for mask, idx in
+                self.placements(size))
+        return self._halos[size, adjacency]
+
+
+@lru_cache(maxsize=None)
+def geometry(rows, cols):
+    """Returns the shared Geometry of a board size.
+    """
+    return Geometry(rows, cols)
+
+
+def bits(mask):
+    """Yields the index of every set bit of mask, lowest first.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def popcount(mask):
+    return bin(mask).count('1')
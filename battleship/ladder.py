@@ -0,0 +1,227 @@
+"""A rating ladder of Computer players, each a targeting strategy name or
+targeting:placement, rated with the two player TrueSkill update.
+
+Games are scheduled where they tell the most: pairs are drawn in proportion
+to their match quality, the chance of a close game, so well separated pairs
+stop being played once the ladder knows their order. Results are rated as
+they come back from the worker processes and the ladder is saved after each,
+so a run can be stopped and carried on later.
+
+    bship ladder random density montecarlo --games 2000 --save ladder.json
+"""
+import argparse
+import json
+import math
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+MU = 25.0
+SIGMA = MU / 3
+BETA = SIGMA / 2  # rating difference giving the better player ~76% wins
+TAU = SIGMA / 100  # uncertainty added before each game, so ratings can move
+
+
+def _pdf(x):
+    return math.exp(-x * x / 2) / math.sqrt(2 * math.pi)
+
+
+def _cdf(x):
+    return (1 + math.erf(x / math.sqrt(2))) / 2
+
+
+class Ladder(object):
+
+    def __init__(self, players=(), beta=BETA, tau=TAU):
+        """Every player starts at the same rating, mu MU with uncertainty
+        sigma SIGMA.
+        """
+        self.beta = beta
+        self.tau = tau
+        self.ratings = {}
+        self.played = {}
+        self.games = 0
+        for player in players:
+            self.add(player)
+
+    def add(self, player):
+        if player not in self.ratings:
+            self.ratings[player] = (MU, SIGMA)
+            self.played[player] = 0
+
+    def quality(self, a, b):
+        """Returns the TrueSkill match quality of a v b, from 0 for a
+        foregone conclusion to 1 for an even game between known players.
+        """
+        mu_a, sigma_a = self.ratings[a]
+        mu_b, sigma_b = self.ratings[b]
+        c2 = 2 * self.beta ** 2 + sigma_a ** 2 + sigma_b ** 2
+        return (math.sqrt(2 * self.beta ** 2 / c2) *
+                math.exp(-(mu_a - mu_b) ** 2 / (2 * c2)))
+
+    def pick(self, rng):
+        """Returns a pair of players to play next, drawn in proportion to
+        their match quality.
+        """
+        players = sorted(self.ratings)
+        if len(players) < 2:
+            raise ValueError('a ladder needs two players to schedule a game')
+        pairs = [(a, b) for n, a in enumerate(players) for b in
+                 players[n + 1:]]
+        weights = [self.quality(a, b) for a, b in pairs]
+        a, b = rng.choices(pairs, weights)[0]
+        return (a, b) if rng.random() < 0.5 else (b, a)
+
+    def record(self, winner, loser):
+        """Updates both ratings with the result of one game.
+        """
+        mu_w, sigma_w = self.ratings[winner]
+        mu_l, sigma_l = self.ratings[loser]
+        var_w = sigma_w ** 2 + self.tau ** 2
+        var_l = sigma_l ** 2 + self.tau ** 2
+
+        c2 = 2 * self.beta ** 2 + var_w + var_l
+        c = math.sqrt(c2)
+        t = (mu_w - mu_l) / c
+        v = _pdf(t) / max(_cdf(t), 1e-300)
+        w = v * (v + t)
+
+        self.ratings[winner] = (mu_w + var_w / c * v,
+                                math.sqrt(var_w * (1 - var_w / c2 * w)))
+        self.ratings[loser] = (mu_l - var_l / c * v,
+                               math.sqrt(var_l * (1 - var_l / c2 * w)))
+        self.played[winner] += 1
+        self.played[loser] += 1
+        self.games += 1
+
+    def standings(self):
+        """Returns (player, conservative rating, mu, sigma, games) best first,
+        the conservative rating being mu - 3 sigma.
+        """
+        table = [(player, mu - 3 * sigma, mu, sigma, self.played[player])
+                 for player, (mu, sigma) in self.ratings.items()]
+        return sorted(table, key=lambda row: -row[1])
+
+    def to_dict(self):
+        return {'beta': self.beta, 'tau': self.tau, 'games': self.games,
+                'ratings': {player: {'mu': mu, 'sigma': sigma,
+                                     'played': self.played[player]}
+                            for player, (mu, sigma) in self.ratings.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        ladder = cls(beta=data['beta'], tau=data['tau'])
+        ladder.games = data['games']
+        for player, rating in data['ratings'].items():
+            ladder.ratings[player] = (rating['mu'], rating['sigma'])
+            ladder.played[player] = rating['played']
+        return ladder
+
+    def save(self, path):
+        """Saves to path, replacing it only once fully written.
+        """
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def _strategies(player):
+    """Splits a player name into its targeting and placement strategy.
+    """
+    targeting, _, placement = player.partition(':')
+    return targeting, placement or 'random'
+
+
+def play(job):
+    """Worker: plays one game of a pair of players and returns the pair
+    winner first.
+    """
+    from battleship.bench import duel
+
+    a, b, rows, cols, seed = job
+    (targeting_a, placement_a), (targeting_b, placement_b) = (
+        _strategies(a), _strategies(b))
+    outcome = duel((targeting_a, targeting_b), (placement_a, placement_b),
+                   rows, cols, seed)
+    return (a, b) if outcome['winner'] == 0 else (b, a)
+
+
+def climb(ladder, games, rows=10, cols=10, workers=None, seed=None,
+          save=None):
+    """Plays games more games on the ladder, keeping each worker process two
+    games ahead. Every game is scheduled from the ratings as they are when
+    it is sent, so only the few games in flight miss the latest results.
+    """
+    rng = random.Random(seed)
+
+    def job():
+        a, b = ladder.pick(rng)
+        return a, b, rows, cols, rng.random()
+
+    def rate(result):
+        ladder.record(*result)
+        if save:
+            ladder.save(save)
+
+    if workers == 1:
+        for game in range(games):
+            rate(play(job()))
+        return ladder
+
+    with ProcessPoolExecutor(workers) as pool:
+        ahead = 2 * (workers or os.cpu_count() or 1)
+        sent = min(games, ahead)
+        pending = {pool.submit(play, job()) for game in range(sent)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                rate(future.result())
+                if sent < games:
+                    pending.add(pool.submit(play, job()))
+                    sent += 1
+    return ladder
+
+
+def report(ladder):
+    lines = [f'{ladder.games} games',
+             f"{'player':24} {'rating':>7} {'mu':>7} {'sigma':>6} "
+             f"{'games':>6}"]
+    for player, rating, mu, sigma, played in ladder.standings():
+        lines.append(f'{player:24} {rating:7.2f} {mu:7.2f} {sigma:6.2f} '
+                     f'{played:6}')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='bship ladder',
+        description='Rate Computer players against each other, a player '
+                    'being a targeting strategy or targeting:placement.')
+    parser.add_argument('players', nargs='*')
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--save', help='JSON file to save the ladder to and '
+                                       'resume it from')
+    args = parser.parse_args(argv)
+
+    if args.save and os.path.exists(args.save):
+        ladder = Ladder.load(args.save)
+    else:
+        ladder = Ladder()
+    for player in args.players:
+        ladder.add(player)
+
+    climb(ladder, args.games, workers=args.workers, seed=args.seed,
+          save=args.save)
+    print(report(ladder))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Targeting that learns where an opponent likes to hide their fleet.
+
+A PlacementPrior counts, over the games played against an opponent, how
+often each cell and each placement of each ship held a ship, older games
+fading by decay per game. It is kept in a small binary file per board size
+and fleet, next to the other caches, so it carries over from one Engine,
+and one session, to the next.
+
+LearningTargeting ('learning') scores cells like DensityTargeting and then
+favours the cells the prior says are used most, an O(cells) pass per move;
+the Computer feeds it the enemy layout once a game is over, an O(ships)
+update of the counts.
+
+    python -m battleship.learning  # shows the prior of the standard game
+"""
+import argparse
+import os
+import struct
+from array import array
+from battleship.board import Board
+from battleship.cache import CACHE_DIR, fleet_key
+from battleship.geometry import geometry
+from battleship.strategies import DensityTargeting, TargetingStrategy, register
+
+MAGIC = b'BSPR'
+HEADER = struct.Struct('<4sHHIHd')  # magic, rows, cols, games, ships, scale
+SHIP = struct.Struct('<cH')  # sign, size
+
+
+def prior_path(rows, cols, ships):
+    return os.path.join(CACHE_DIR, f'prior-{rows}x{cols}-'
+                                   f'{fleet_key(ships)}.bin')
+
+
+class PlacementPrior(object):
+
+    def __init__(self, rows=10, cols=10, ships=None, decay=0.9):
+        """Counts for the Ships of ships on a rows x cols board, each game
+        weighing decay times the one after it. Rather than scaling every
+        count down after each game, each new game is counted scale up, so an
+        update only touches the cells and placements of the fleet.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.ships = ships or list(Board(rows, cols).fleet.values())
+        self.decay = decay
+        self.geo = geometry(rows, cols)
+        self.games = 0
+        self.scale = 1.0
+        self.cells = array('d', bytes(8 * self.geo.cells))
+        self.placements = {
+            ship.sign: array('d', bytes(8 * len(self.geo.placements(
+                ship.size)))) for ship in self.ships}
+        self.numbers = {}  # size to {mask: number of the placement}
+
+    def add(self, layout):
+        """Counts one game's layout, a dict of ship sign to coords.
+        """
+        self.games += 1
+        self.scale /= self.decay
+        for ship in self.ships:
+            mask = self.geo.mask(layout[ship.sign])
+            number = self._numbers(ship.size).get(mask)
+            if number is not None:
+                self.placements[ship.sign][number] += self.scale
+            for coord in layout[ship.sign]:
+                self.cells[self.geo.index(coord)] += self.scale
+        if self.scale > 1e100:
+            self._rescale()
+
+    def weights(self):
+        """Returns per cell index how much it is used, from 0 to 1 for the
+        most used cell. All 0 before the first game.
+        """
+        top = max(self.cells)
+        if not top:
+            return [0.0] * self.geo.cells
+        return [count / top for count in self.cells]
+
+    def likeliest(self, sign, n=5):
+        """Returns the n placements of ship sign used most, as (share,
+        coords) with share the fraction of the decayed games using it.
+        """
+        counts = self.placements[sign]
+        total = sum(counts)
+        if not total:
+            return []
+        size = next(ship.size for ship in self.ships if ship.sign == sign)
+        placements = self.geo.placements(size)
+        ranked = sorted(range(len(counts)), key=lambda n: -counts[n])[:n]
+        return [(counts[number] / total,
+                 [self.geo.coord(index) for index in placements[number][1]])
+                for number in ranked]
+
+    def save(self, path):
+        """Writes the counts to path, replacing it only once fully written.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, self.rows, self.cols, self.games,
+                                len(self.ships), self.scale))
+            self.cells.tofile(f)
+            for ship in self.ships:
+                f.write(SHIP.pack(ship.sign.encode(), ship.size))
+                self.placements[ship.sign].tofile(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, rows=10, cols=10, ships=None, decay=0.9):
+        """Returns the prior saved at path, or an empty one if there is none
+        for this board and fleet.
+        """
+        prior = cls(rows, cols, ships, decay)
+        try:
+            with open(path, 'rb') as f:
+                magic, rows, cols, games, count, scale = HEADER.unpack(
+                    f.read(HEADER.size))
+                if (magic, rows, cols, count) != (
+                        MAGIC, prior.rows, prior.cols, len(prior.ships)):
+                    return prior
+                cells = array('d')
+                cells.fromfile(f, len(prior.cells))
+                sizes = {ship.sign: ship.size for ship in prior.ships}
+                placements = {}
+                for n in range(count):
+                    sign, size = SHIP.unpack(f.read(SHIP.size))
+                    sign = sign.decode()
+                    if sizes.get(sign) != size:  # saved for another fleet
+                        return prior
+                    placements[sign] = array('d')
+                    placements[sign].fromfile(f, len(prior.placements[sign]))
+        except (OSError, EOFError, struct.error, UnicodeDecodeError):
+            return prior
+        prior.games, prior.scale = games, scale
+        prior.cells, prior.placements = cells, placements
+        return prior
+
+    def _numbers(self, size):
+        if size not in self.numbers:
+            self.numbers[size] = {mask: number for number, (mask, idx) in
+                                  enumerate(self.geo.placements(size))}
+        return self.numbers[size]
+
+    def _rescale(self):
+        for n in range(len(self.cells)):
+            self.cells[n] /= self.scale
+        for counts in self.placements.values():
+            for n in range(len(counts)):
+                counts[n] /= self.scale
+        self.scale = 1.0
+
+
+@register('targeting', 'learning')
+class LearningTargeting(TargetingStrategy):
+    """DensityTargeting with each cell's score raised by up to strength
+    times for the cells the opponent has used most in past games.
+    """
+    strength = 1.0
+
+    def __init__(self, rng=None, path=None, strength=None):
+        """The prior is read from path, by default the cache file for the
+        board size and fleet, when the first move is asked for.
+        """
+        super().__init__(rng)
+        if strength is not None:
+            self.strength = strength
+        self.density = DensityTargeting(self.rng)
+        self.path = path
+        self.prior = None
+        self.boost = None
+
+    def pick(self, view):
+        scores = self.scores(view)
+        best = max(scores)
+        return self.geo.coord(self.rng.choice(
+            [index for index, score in enumerate(scores) if score == best]))
+
+    def pick_many(self, view, shots):
+        scores = self.scores(view)
+        ranked = sorted((index for index, score in enumerate(scores) if score),
+                        key=lambda index: (-scores[index], self.rng.random()))
+        return [self.geo.coord(index) for index in ranked[:shots]]
+
+    def scores(self, view):
+        if self.prior is None:
+            self._load(view)
+        return [score * boost for score, boost in
+                zip(self.density.scores(view), self.boost)]
+
+    def learn(self, layout):
+        """Adds the enemy layout of a finished game, a dict of ship sign to
+        coords, to the prior and saves it.
+        """
+        if self.prior is None:
+            return  # never moved, the board size is not known
+        self.prior.add(layout)
+        self.prior.save(self.path)
+
+    def _load(self, view):
+        self.geo = geometry(view.rows, view.cols)
+        # the enemy's own fleet, whatever its signs, so that learn() can
+        # count every ship of the layouts it is given
+        ships = list(Board(view.rows, view.cols, [
+            (sign, sign, size) for sign, size in view.ships().items()
+        ]).fleet.values())
+        self.path = self.path or prior_path(view.rows, view.cols, ships)
+        self.prior = PlacementPrior.load(self.path, view.rows, view.cols,
+                                         ships)
+        # worked out once a game, the prior only changes after it
+        self.boost = [1 + self.strength * weight for weight in
+                      self.prior.weights()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m battleship.learning',
+        description='Show what the learning Computer has learnt of where '
+                    'its opponents hide their ships.')
+    parser.add_argument('--rows', type=int, default=10)
+    parser.add_argument('--cols', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    ships = list(Board(args.rows, args.cols).fleet.values())
+    path = prior_path(args.rows, args.cols, ships)
+    prior = PlacementPrior.load(path, args.rows, args.cols, ships)
+    print(f'{path}: {prior.games} games')
+    weights = prior.weights()
+    for row in range(args.rows):
+        print(' '.join(f'{weights[col + row * args.cols]:4.2f}'
+                       for col in range(args.cols)))
+    for ship in prior.ships:
+        for share, coords in prior.likeliest(ship.sign, 1):
+            print(f'{ship.sign}: {share:.0%} at {coords[0]} to {coords[-1]}')
+
+
+if __name__ == "__main__":
+    main()
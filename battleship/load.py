@@ -0,0 +1,274 @@
+"""Load test of `bship serve`: ramps up the number of scripted clients
+playing at once, each on its own connection playing game after game, and
+reports per step the moves per second, the move latency percentiles and the
+server's memory per match.
+
+    bship load --steps 10 100 1000 --seconds 10
+    bship load --address 127.0.0.1:5152 --targeting density
+
+Without --address a server is started for the test in a process of its own,
+so its memory can be read (from /proc, where there is one) and its event
+loop does not share a core with the clients'. A client's latency is from
+sending a shot to reading the Computer's reply; picking its own shots, with
+a targeting strategy of its own, is not counted.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from battleship.board import Board
+from battleship.server import LINE_LIMIT, raise_file_limit
+from battleship.stats import Sketch
+from battleship.strategies import BoardView, make_targeting
+from battleship.ui import convert
+
+STEPS = (10, 100, 1000)
+
+
+class Client(object):
+    """One scripted player: hides its fleet with auto, then shoots where its
+    targeting strategy says on a board of its own mirroring the answers.
+    """
+
+    def __init__(self, reader, writer, targeting='random', rng=None):
+        self.reader = reader
+        self.writer = writer
+        self.targeting = targeting
+        self.rng = rng or random.Random()
+        self.games = 0
+
+    async def request(self, msg, last):
+        """Sends msg and returns its answers, up to the one last(answer) is
+        true for.
+        """
+        self.writer.write((json.dumps(msg) + '\n').encode())
+        await self.writer.drain()
+        answers = []
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError('the server closed the connection')
+            answers.append(json.loads(line))
+            if last(answers[-1]):
+                return answers
+
+    async def play(self, latency, counts, deadline):
+        """Plays one game, adding the seconds each move took to the latency
+        sketch and counting the moves. Returns whether the game was finished
+        before the deadline.
+        """
+        if self.games:
+            await self.request({'new': True}, lambda answer: 'new' in answer)
+        self.games += 1
+        answers = await self.request(
+            {'auto': True},
+            lambda answer: 'ready' in answer or 'error' in answer)
+        if 'error' in answers[-1]:
+            raise RuntimeError(answers[-1]['error'])
+
+        enemy = Board()
+        view = BoardView(enemy)
+        shooter = make_targeting(self.targeting,
+                                 rng=random.Random(self.rng.random()))
+        hits = {}  # sign to the coords hit on that ship so far
+        fleet = len(enemy.fleet)
+        lost = 0
+
+        while time.monotonic() < deadline:
+            coord = shooter.pick(view)
+            start = time.perf_counter()
+            # the Computer's sinking of the last ship is followed by over
+            answers = await self.request(
+                {'shoot': convert(coord)},
+                lambda answer: 'over' in answer or 'error' in answer or (
+                    'reply' in answer and not (
+                        answer['result'] == 'sunk' and lost == fleet - 1)))
+            latency.add(time.perf_counter() - start)
+            counts['moves'] += 1
+
+            for answer in answers:
+                if 'error' in answer:
+                    raise RuntimeError(answer['error'])
+                if 'shot' in answer:
+                    self._mirror(enemy, hits, coord, answer)
+                    shooter.observe(coord, answer['result'])
+                elif 'reply' in answer and answer['result'] == 'sunk':
+                    lost += 1
+            if 'over' in answers[-1]:
+                return True
+        return False
+
+    def _mirror(self, enemy, hits, coord, answer):
+        result = answer['result']
+        if result == 'miss':
+            enemy.record_miss(coord)
+        elif result == 'hit':
+            hits.setdefault(answer['ship'], []).append(coord)
+            enemy.record_hit(coord)
+        elif result == 'sunk':
+            ship = enemy.fleet[answer['ship']]
+            ship.pos = hits.pop(ship.sign, []) + [coord]
+            ship.hits = ship.size
+            enemy.record_sunk(ship)
+
+
+async def client(address, deadline, latency, counts, targeting='random',
+                 rng=None):
+    """Connects and plays games until deadline, counting moves, finished
+    matches and errors in counts.
+    """
+    try:
+        reader, writer = await asyncio.open_connection(*address,
+                                                       limit=LINE_LIMIT)
+    except OSError:
+        counts['errors'] += 1
+        return
+    player = Client(reader, writer, targeting, rng)
+    try:
+        while time.monotonic() < deadline:
+            if await player.play(latency, counts, deadline):
+                counts['matches'] += 1
+    except (OSError, ValueError, RuntimeError):
+        counts['errors'] += 1
+    finally:
+        writer.close()
+
+
+def memory(pid):
+    """Returns the resident memory of process pid in bytes, None if it cannot
+    be read (no /proc).
+    """
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+async def step(address, clients, seconds, targeting='random', rng=None,
+               pid=None):
+    """Runs clients at once for seconds and returns what they measured: the
+    latency sketch, counts of moves, matches and errors, and if the server's
+    pid is known its memory idle and halfway through.
+    """
+    rng = rng or random.Random()
+    latency = Sketch()
+    counts = {'moves': 0, 'matches': 0, 'errors': 0}
+    idle = memory(pid) if pid else None
+    start = time.monotonic()
+    deadline = start + seconds
+
+    tasks = [asyncio.ensure_future(client(
+        address, deadline, latency, counts, targeting,
+        random.Random(rng.random()))) for n in range(clients)]
+    await asyncio.sleep(seconds / 2)
+    busy = memory(pid) if pid else None
+    await asyncio.gather(*tasks)
+
+    return dict(counts, clients=clients, latency=latency,
+                seconds=time.monotonic() - start, idle=idle, busy=busy)
+
+
+async def ramp(address, steps=STEPS, seconds=10.0, targeting='random',
+               seed=None, pid=None, report=None):
+    """Runs a step per number of clients in steps, calling report(result)
+    after each. Returns the list of step results.
+    """
+    rng = random.Random(seed)
+    results = []
+    for clients in steps:
+        result = await step(address, clients, seconds, targeting,
+                            random.Random(rng.random()), pid)
+        results.append(result)
+        if report:
+            report(result)
+    return results
+
+
+def start_server(targeting='density', placement='random', seed=None,
+                 workers=0):
+    """Starts bship serve on a free port in a new process, its moves on
+    workers processes if any. Returns the process and the (host, port) it
+    listens on.
+    """
+    command = [sys.executable, '-m', 'battleship.server', '--port', '0',
+               '--targeting', targeting, '--placement', placement,
+               '--workers', str(workers)]
+    if seed is not None:
+        command += ['--seed', str(seed)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                               universal_newlines=True)
+    line = process.stdout.readline()
+    if not line.startswith('serving on '):
+        process.kill()
+        raise RuntimeError('the server did not start')
+    host, _, port = line.split()[-1].rpartition(':')
+    return process, (host, int(port))
+
+
+def format_step(result):
+    """Formats a step result as a line of the report.
+    """
+    line = (f"{result['clients']:6} clients "
+            f"{result['moves'] / result['seconds']:9.0f} moves/s "
+            f"{result['matches']:7} matches")
+    if result['latency'].count:
+        p50, p99, p999 = (1000 * result['latency'].quantile(q) for q in
+                          (0.5, 0.99, 0.999))
+        line += f' | move ms p50={p50:.2f} p99={p99:.2f} p999={p999:.2f}'
+    if result['idle'] is not None and result['busy'] is not None:
+        per_match = max(0, result['busy'] - result['idle']) / \
+            result['clients']
+        line += f" | {per_match / 1024:.1f} kB/match"
+    if result['errors']:
+        line += f" | {result['errors']} errors"
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='bship load',
+        description='Load test a game server with scripted clients, ramping '
+                    'up how many play at once.')
+    parser.add_argument('--address', help='host:port of a running bship serve'
+                                          ' (default: start one)')
+    parser.add_argument('--steps', type=int, nargs='+', default=STEPS,
+                        help='numbers of clients playing at once')
+    parser.add_argument('--seconds', type=float, default=10.0,
+                        help='length of each step')
+    parser.add_argument('--targeting', default='random',
+                        help="the clients' targeting strategy")
+    parser.add_argument('--server-targeting', default='density',
+                        help="the Computer's, when starting the server")
+    parser.add_argument('--server-workers', type=int, default=0,
+                        help="processes for the Computer's moves, when "
+                             "starting the server")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    raise_file_limit()
+    process = None
+    if args.address:
+        host, _, port = args.address.rpartition(':')
+        address = host, int(port)
+    else:
+        process, address = start_server(args.server_targeting,
+                                        seed=args.seed,
+                                        workers=args.server_workers)
+    try:
+        asyncio.run(ramp(address, args.steps, args.seconds, args.targeting,
+                         args.seed, process and process.pid,
+                         lambda result: print(format_step(result),
+                                              flush=True)))
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
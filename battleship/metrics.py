@@ -0,0 +1,284 @@
+"""Always-on service metrics: counters, gauges and fixed-bucket histograms
+cheap enough to update on every move, and a plain-text scrape endpoint
+serving them on localhost in the Prometheus text format.
+
+    bship serve --metrics-port 9464
+    curl http://127.0.0.1:9464/metrics
+
+Updates take no lock. Each thread adds to cells of its own, a list made the
+first time the thread touches the metric, and a scrape sums the cells of
+every thread; with the GIL each cell has a single writer, so nothing is lost
+and the only cost is an attribute lookup and an add. A histogram's buckets
+are fixed when it is made, an observation finding its bucket with bisect.
+
+The metrics of the game itself are made here, in the default REGISTRY:
+
+    bship_games_total, bship_games_playing    games started, in progress
+    bship_moves_total                         Computer moves, by strategy
+    bship_move_seconds                        move latency, by strategy
+    bship_moves_missed_total                  moves past their deadline
+    bship_shots_total                         shots received, by result
+    bship_render_seconds                      time to draw the boards
+    bship_memory_per_game_bytes               resident memory / games
+
+Moves per second are the rate of bship_moves_total between two scrapes.
+"""
+import os
+import threading
+from bisect import bisect_left
+
+# seconds, from a quick pick to a Monte Carlo move gone well past a deadline
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Counter(object):
+    """A number only ever added to, summed over the threads adding to it.
+    """
+    kind = 'counter'
+
+    def __init__(self):
+        self.local = threading.local()
+        self.cells = []  # one [count] per thread that has added
+
+    def inc(self, amount=1):
+        try:
+            self.local.cell[0] += amount
+        except AttributeError:
+            self.local.cell = [amount]
+            self.cells.append(self.local.cell)  # atomic under the GIL
+
+    def value(self):
+        return sum(cell[0] for cell in list(self.cells))
+
+    def samples(self, name, labels):
+        return [(name, labels, self.value())]
+
+
+class Gauge(Counter):
+    """A number that goes up and down, or if made with a function the value
+    it returns when scraped.
+    """
+    kind = 'gauge'
+
+    def __init__(self, function=None):
+        super().__init__()
+        self.function = function
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def value(self):
+        if self.function is not None:
+            return self.function()
+        return super().value()
+
+
+class Histogram(object):
+    """Counts of observations at or under each of a fixed list of bounds,
+    with their sum.
+    """
+    kind = 'histogram'
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.local = threading.local()
+        self.cells = []  # per thread, a count per bucket, +Inf, then the sum
+
+    def observe(self, value):
+        try:
+            cell = self.local.cell
+        except AttributeError:
+            cell = self.local.cell = [0] * (len(self.buckets) + 2)
+            self.cells.append(cell)
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def counts(self):
+        """Returns the count in each bucket, +Inf last, and the sum.
+        """
+        totals = [0] * (len(self.buckets) + 2)
+        for cell in list(self.cells):
+            for n, count in enumerate(cell):
+                totals[n] += count
+        return totals[:-1], totals[-1]
+
+    def samples(self, name, labels):
+        counts, total = self.counts()
+        samples = []
+        seen = 0
+        for bound, count in zip(self.buckets + ('+Inf',), counts):
+            seen += count
+            samples.append((name + '_bucket', labels + (('le', bound),),
+                            seen))
+        samples.append((name + '_sum', labels, total))
+        samples.append((name + '_count', labels, seen))
+        return samples
+
+
+class Family(object):
+    """A metric by name, one child metric per combination of label values.
+    """
+
+    def __init__(self, name, doc, make, labels=()):
+        self.name = name
+        self.doc = doc
+        self.make = make
+        self.labels = tuple(labels)
+        self.children = {}
+        self.lock = threading.Lock()
+        if not self.labels:
+            self.children[()] = make()
+        self.kind = make().kind
+
+    def child(self, *values):
+        """Returns the metric for the label values, made the first time they
+        are seen.
+        """
+        if len(values) != len(self.labels):
+            raise ValueError(f'{self.name} takes the labels '
+                             f'{", ".join(self.labels)}')
+        try:
+            return self.children[values]
+        except KeyError:
+            with self.lock:
+                return self.children.setdefault(values, self.make())
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.doc}',
+                 f'# TYPE {self.name} {self.kind}']
+        for values, metric in sorted(self.children.items()):
+            for name, labels, value in metric.samples(
+                    self.name, tuple(zip(self.labels, values))):
+                lines.append(name + _labels(labels) + ' ' + _number(value))
+        return lines
+
+
+class Registry(object):
+    """The metrics of a process by name.
+    """
+
+    def __init__(self):
+        self.families = {}
+
+    def counter(self, name, doc, labels=()):
+        """Returns the counter of that name, labelled by labels, made the
+        first time it is asked for. So are gauge() and histogram().
+        """
+        return self._family(name, doc, Counter, labels)
+
+    def gauge(self, name, doc, labels=(), function=None):
+        return self._family(name, doc, lambda: Gauge(function), labels)
+
+    def histogram(self, name, doc, labels=(), buckets=BUCKETS):
+        return self._family(name, doc, lambda: Histogram(buckets), labels)
+
+    def render(self):
+        """Returns every metric in the Prometheus text format.
+        """
+        lines = []
+        for name in sorted(self.families):
+            lines.extend(self.families[name].render())
+        return '\n'.join(lines) + '\n'
+
+    def _family(self, name, doc, make, labels):
+        if name not in self.families:
+            self.families[name] = Family(name, doc, make, labels)
+        family = self.families[name]
+        if family.labels != tuple(labels):
+            raise ValueError(f'{name} is already labelled '
+                             f'{", ".join(family.labels)}')
+        return family.child() if not family.labels else family
+
+
+def memory():
+    """Returns the resident memory of this process in bytes, 0 if it cannot
+    be read (no /proc).
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0
+
+
+def moved(strategy, seconds):
+    """Counts a move of the targeting strategy, or strategy named, that
+    took seconds.
+    """
+    if not isinstance(strategy, str):
+        strategy = getattr(strategy, 'name', type(strategy).__name__)
+    MOVES.child(strategy).inc()
+    MOVE_SECONDS.child(strategy).observe(seconds)
+
+
+def serve(port=9464, registry=None, host='127.0.0.1'):
+    """Serves registry, by default REGISTRY, as plain text on
+    http://host:port/metrics from a daemon thread, port 0 picking a free one.
+    Returns the HTTPServer, see its server_address; shutdown() stops it.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    registry = registry or REGISTRY
+
+    class Scrape(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type',
+                             'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # a scrape every few seconds is not worth a line each
+
+    server = ThreadingHTTPServer((host, port), Scrape)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True,
+                     name='metrics').start()
+    return server
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in
+                          labels) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace(
+        '\n', r'\n')
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+REGISTRY = Registry()
+
+GAMES = REGISTRY.counter('bship_games_total', 'Games started.')
+PLAYING = REGISTRY.gauge('bship_games_playing', 'Games in progress.')
+MOVES = REGISTRY.counter('bship_moves_total',
+                         'Moves worked out by the Computer.', ('strategy',))
+MOVE_SECONDS = REGISTRY.histogram(
+    'bship_move_seconds', 'Seconds the Computer took to work out a move.',
+    ('strategy',))
+MISSED = REGISTRY.counter('bship_moves_missed_total',
+                          'Moves past their deadline on the workers, played '
+                          'by the fallback.')
+SHOTS = REGISTRY.counter('bship_shots_total', 'Shots received, by result.',
+                         ('result',))
+RENDER_SECONDS = REGISTRY.histogram('bship_render_seconds',
+                                    'Seconds taken drawing the boards.')
+REGISTRY.gauge('bship_memory_per_game_bytes',
+               'Resident memory over the games in progress, or all of it '
+               'when none are.',
+               function=lambda: memory() // max(1, PLAYING.value()))
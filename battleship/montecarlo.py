@@ -0,0 +1,248 @@
+from time import perf_counter
+from battleship.geometry import bits, geometry
+from battleship.strategies import DensityTargeting, TargetingStrategy, register
+
+
+@register('targeting', 'montecarlo')
+class MonteCarloTargeting(TargetingStrategy):
+    """Keeps a pool of sampled fleet layouts (particles) consistent with
+    everything seen on the enemy board and shoots the unknown coord most of
+    them put a ship on.
+
+    The pool lives across moves: each move only the new misses, hits and
+    sinks are checked against it, the particles they contradict are repaired
+    by re-placing just the offending ships, and the pool is topped up with
+    fresh samples, all within a time budget per move. Layouts are dicts of
+    ship sign to bitmask, see geometry.Geometry.
+    """
+    particles = 400  # most particles in the pool
+    budget = 0.005  # seconds a move may take
+    tries = 8  # attempts at completing one layout
+
+    def __init__(self, rng=None, particles=None, budget=None):
+        super().__init__(rng)
+        if particles is not None:
+            self.particles = particles
+        if budget is not None:
+            self.budget = budget
+        self.fallback = DensityTargeting(self.rng)
+        self.geo = None
+        # seconds counting took per particle, at first a guess of half the
+        # budget for the full pool
+        self.scoring = self.budget / 2 / self.particles
+        self.size = self.particles  # of the pool the budget can keep up
+
+    def pick(self, view):
+        counts = self.counts(view)
+        best = max(counts)
+        if not best:  # no particle survived the budget, count placements
+            return self.fallback.pick(view)
+        return self.geo.coord(self.rng.choice(
+            [index for index, count in enumerate(counts) if count == best]))
+
+    def pick_many(self, view, shots):
+        """A salvo takes the coords most particles agree on.
+        """
+        counts = self.counts(view)
+        if not max(counts):
+            return self.fallback.pick_many(view, shots)
+        ranked = sorted((index for index, count in enumerate(counts)
+                         if count),
+                        key=lambda index: (-counts[index], self.rng.random()))
+        return [self.geo.coord(index) for index in ranked[:shots]]
+
+    def counts(self, view):
+        """Brings the pool up to date with the view and returns, per cell
+        index, how many particles have an afloat ship on that unknown cell,
+        all within the time budget.
+        """
+        start = perf_counter()
+        self._sync(view)
+        synced = perf_counter()
+        # leaves the time counting a full pool takes, to count in
+        self._refill(start + self.budget - self.scoring * self.size)
+        scoring = perf_counter()
+
+        counts = [0] * self.geo.cells
+        for layout in self.pool:
+            for sign, mask in layout.items():
+                if sign not in self.sunk:
+                    for index in bits(mask & self.unknown):
+                        counts[index] += 1
+        self._spent(synced - start, scoring)
+        return counts
+
+    def _spent(self, syncing, scoring):
+        """Notes the seconds syncing took and the time scoring began, and
+        sizes the pool so that syncing and scoring it take no more than half
+        the budget, the rest going to repairs and samples.
+        """
+        if self.pool:
+            self.scoring = (perf_counter() - scoring) / len(self.pool)
+            each = syncing / len(self.pool) + self.scoring
+            self.size = max(1, min(self.particles,
+                                   int(self.budget / 2 / each)))
+
+    def _sync(self, view):
+        """Reads the board and drops the particles contradicted by what is new
+        since the last move; they are kept aside to be repaired.
+        """
+        geo = geometry(view.rows, view.cols)
+        if self.geo is not geo:  # first move
+            self.geo = geo
+            self.sizes = view.ships()
+            self.pool = []
+            self.broken = []
+            self.misses = self.hits = 0
+            self.sunk = {}
+            self.adjacency = view.adjacency
+
+        misses = geo.mask(view.misses())
+        sunk = {sign: geo.mask(pos) for sign, pos in view.sunk().items()}
+        hits = geo.mask(view.hits())
+        for mask in sunk.values():
+            hits |= mask
+
+        new_misses = misses & ~self.misses
+        new_hits = hits & ~self.hits
+        new_sunk = {sign: mask for sign, mask in sunk.items() if
+                    sign not in self.sunk}
+
+        self.misses, self.hits, self.sunk = misses, hits, sunk
+        self.unknown = geo.mask(view.unknown())
+
+        if not (new_misses or new_hits or new_sunk):
+            return
+
+        kept = []
+        for layout in self.pool:
+            if self._fits(layout, new_misses, new_hits, new_sunk):
+                kept.append(layout)
+            else:
+                self.broken.append(layout)
+        self.pool = kept
+
+    def _fits(self, layout, misses, hits, sunk):
+        """Checks a layout that fitted the old observations against the new
+        misses, hits and sunk ships only.
+        """
+        union = 0
+        for sign, mask in layout.items():
+            if mask & misses:
+                return False
+            if sign in sunk:
+                if mask != sunk[sign]:
+                    return False
+            elif mask & hits and not mask & ~self.hits:
+                return False  # every cell hit but the ship was not sunk
+            elif self.geo.halo(mask, self.adjacency) & hits:
+                return False  # another ship touching it
+            union |= mask
+        return union & hits == hits
+
+    def _refill(self, deadline):
+        """Repairs broken particles, then samples new ones, until the pool is
+        full or the time is up, the deadline being checked between attempts
+        as well so that no one layout runs far past it. Broken particles
+        left over are dropped.
+        """
+        del self.pool[self.size:]
+        while len(self.pool) < self.size and perf_counter() < deadline:
+            if self.broken:
+                layout = self._repair(self.broken.pop(), deadline)
+            else:
+                layout = self._complete(dict(self.sunk), [
+                    sign for sign in self.sizes if sign not in self.sunk],
+                    deadline)
+            if layout:
+                self.pool.append(layout)
+        self.broken = []
+
+    def _repair(self, layout, deadline):
+        """Keeps the ships of a broken layout that still fit and re-places
+        the rest, freeing more ships if they will not fit.
+        """
+        sunk = 0
+        for mask in self.sunk.values():
+            sunk |= mask
+
+        fixed = dict(self.sunk)
+        for sign, mask in layout.items():
+            if sign in fixed or mask & (self.misses | sunk):
+                continue
+            if not mask & ~self.hits:
+                continue
+            if self.geo.halo(mask, self.adjacency) & self.hits:
+                continue
+            fixed[sign] = mask
+
+        while perf_counter() < deadline:
+            todo = [sign for sign in self.sizes if sign not in fixed]
+            repaired = self._complete(fixed, todo, deadline, tries=2)
+            if repaired:
+                return repaired
+            afloat = [sign for sign in fixed if sign not in self.sunk]
+            if not afloat:
+                return None
+            del fixed[self.rng.choice(afloat)]
+        return None
+
+    def _complete(self, fixed, todo, deadline, tries=None):
+        """Places the todo ships around the fixed ones so that every hit is
+        covered, no ship crosses a miss and no afloat ship is all hits.
+        Uncovered hits are dealt with first. Returns the layout, or None if
+        the tries or the time run out.
+        """
+        for attempt in range(tries or self.tries):
+            if attempt and perf_counter() >= deadline:
+                return None
+            layout = dict(fixed)
+            occupied = near = 0  # near adds the halos of the ships
+            for mask in layout.values():
+                occupied |= mask
+                near |= mask | self.geo.halo(mask, self.adjacency)
+            left = list(todo)
+
+            while left:
+                uncovered = self.hits & ~occupied
+                if uncovered:
+                    index = self.rng.choice(list(bits(uncovered)))
+                    options = [(sign, mask) for sign in left for mask in
+                               self.geo.covering(self.sizes[sign])[index] if
+                               self._free(mask, near)]
+                    if not options:
+                        break
+                    sign, mask = self.rng.choice(options)
+                else:
+                    sign = left[-1]
+                    mask = self._place(self.sizes[sign], near)
+                    if mask is None:
+                        break
+                left.remove(sign)
+                layout[sign] = mask
+                occupied |= mask
+                near |= mask | self.geo.halo(mask, self.adjacency)
+
+            if not left and not self.hits & ~occupied:
+                return layout
+        return None
+
+    def _place(self, size, near):
+        """Returns a random free placement mask for a ship of size, trying a
+        few at random before listing them all.
+        """
+        placements = self.geo.placements(size)
+        for attempt in range(10):
+            mask = self.rng.choice(placements)[0]
+            if self._free(mask, near):
+                return mask
+        free = [mask for mask, idx in placements if self._free(mask, near)]
+        return self.rng.choice(free) if free else None
+
+    def _free(self, mask, near):
+        """An afloat ship can go at mask if it misses the missed cells and
+        those near the ships placed, is not entirely on hits and has no hit
+        in its own halo, which would be another ship touching it.
+        """
+        return not mask & (near | self.misses) and mask & ~self.hits and \
+            not self.geo.halo(mask, self.adjacency) & self.hits
@@ -0,0 +1,461 @@
+"""Perfect play on small boards: the targeting policy needing the fewest
+shots on average against a fleet hidden uniformly at random.
+
+Analyzer works it out by dynamic programming over what the shooter has seen.
+Two boards that leave the same layouts possible have the same future, so a
+state is written as a string with every cell no possible layout uses marked
+as water, and mirror images and rotations of the board share one entry
+under their smallest string. Entries go to a dbm file as they are solved,
+an interrupted run carries on where it stopped.
+
+The solved policy is exported as a tree of the states it actually reaches,
+each with its shot and the state every possible result leads to, which
+PerfectTargeting ('perfect') follows at O(1) per move:
+
+    python -m battleship.perfect --rows 4 --cols 4 --ships D2 C3
+"""
+import argparse
+import dbm
+import json
+import os
+from operator import itemgetter
+from battleship.board import Board
+from battleship.cache import CACHE_DIR, fleet_key
+from battleship.config import POINT, SHIPS
+from battleship.geometry import bits, geometry, popcount
+from battleship.strategies import DensityTargeting, TargetingStrategy, register
+
+_tables = {}  # in process memo of the policy files
+
+
+def symmetries(rows, cols):
+    """Returns the permutations of cell indices mapping the board onto
+    itself, identity first: the mirror images, and for square boards the
+    rotations and diagonal flips too.
+    """
+    maps = [
+        lambda col, row: (col, row),
+        lambda col, row: (cols - 1 - col, row),
+        lambda col, row: (col, rows - 1 - row),
+        lambda col, row: (cols - 1 - col, rows - 1 - row),
+    ]
+    if rows == cols:
+        maps += [
+            lambda col, row: (row, col),
+            lambda col, row: (rows - 1 - row, col),
+            lambda col, row: (row, cols - 1 - col),
+            lambda col, row: (rows - 1 - row, cols - 1 - col),
+        ]
+    geo = geometry(rows, cols)
+    return [tuple(geo.index(move(*geo.coord(index)))
+                  for index in range(geo.cells)) for move in maps]
+
+
+def table_path(rows, cols, ships):
+    return os.path.join(CACHE_DIR, f'perfect-{rows}x{cols}-'
+                                   f'{fleet_key(ships)}.json')
+
+
+class Analyzer(object):
+
+    def __init__(self, rows=4, cols=4, ships=SHIPS, memo=None):
+        """Solves rows x cols boards for the ships table of config.SHIPS,
+        keeping solved states in the dbm file memo, or in memory if None.
+        Layouts are tuples of one placement mask per ship of the table.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.ships = tuple(ships)
+        self.fleet = list(Board(rows, cols, ships).fleet.values())
+        self.signs = tuple(sign for name, sign, size in self.ships)
+        self.sizes = tuple(size for name, sign, size in self.ships)
+        self.geo = geometry(rows, cols)
+        self.transforms = symmetries(rows, cols)
+        # moves a key string to the frame of each transform
+        self.movers = [itemgetter(*_inverse(perm)) for perm in self.transforms]
+        self.layouts = self._layouts()
+        if not self.layouts:
+            raise ValueError(f'the fleet does not fit on {rows}x{cols}')
+        self.memo = dbm.open(memo, 'c') if memo else {}
+        self.solved = 0  # states solved by this run, not found in the memo
+        self.values = {}  # (used, hits, sunk...) as seen to value
+
+    def close(self):
+        if hasattr(self.memo, 'close'):
+            self.memo.close()
+
+    def value(self):
+        """Returns the expected number of shots of perfect play.
+        """
+        try:
+            return self.solve(self.layouts, 0, {})
+        finally:
+            self._sync()
+
+    def solve(self, layouts, hits, sunk):
+        """Returns the expected shots left to sink the fleet from the state
+        where layouts are still possible, hits is the mask of cells hit and
+        sunk a dict of ship number to mask, playing perfectly from here.
+        """
+        if len(sunk) == len(self.sizes):
+            return 0.0
+        used = _used(layouts)
+        seen = (used, hits) + tuple(sorted(sunk.items()))
+        if seen in self.values:
+            return self.values[seen]
+        key, transform = self.canonical(self.key(used, hits, sunk))
+        entry = self.memo.get(key)
+        if entry is not None:
+            self.values[seen] = float(entry.split()[0])
+            return self.values[seen]
+
+        todo = sum(self.sizes) - popcount(hits)  # ship cells left to shoot
+        split = self.split(layouts, hits)
+        cells = sorted(split, key=lambda index: -sum(map(len, split[index].
+                                                            values())))
+
+        best, action = float('inf'), None
+        for index in cells:
+            # every ship cell left needs a shot, at best the misses are this
+            # one if it misses
+            covered = sum(map(len, split[index].values()))
+            total = 1 + todo - covered / len(layouts)
+            if total >= best:
+                continue
+            outcomes = list(split[index].items())
+            if covered < len(layouts):
+                outcomes.append(('miss', self.missing(layouts, split[index])))
+            # the likeliest first, to stop as soon as it cannot be the best
+            outcomes.sort(key=lambda outcome: -len(outcome[1]))
+            for result, rest in outcomes:
+                bound = todo - (result != 'miss')
+                shots = self.solve(rest, *self.after(hits, sunk, index,
+                                                     result))
+                total += (shots - bound) * len(rest) / len(layouts)
+                if total >= best:
+                    break
+            else:
+                best, action = total, index
+
+        self.memo[key] = f'{best!r} {self.transforms[transform][action]}'
+        self.values[seen] = best
+        self.solved += 1
+        if not self.solved % 10000:
+            self._sync()
+        return best
+
+    def split(self, layouts, hits):
+        """Returns, per cell index a ship could still be on, a dict of what a
+        shot there would show, 'hit' or (ship number, mask) for the ship it
+        would sink, to the layouts that would show it.
+        """
+        split = {}
+        for layout in layouts:
+            for ship, mask in enumerate(layout):
+                left = mask & ~hits
+                result = (ship, mask) if not left & (left - 1) else 'hit'
+                for index in bits(left):
+                    results = split.get(index)
+                    if results is None:
+                        results = split[index] = {}
+                    if result in results:
+                        results[result].append(layout)
+                    else:
+                        results[result] = [layout]
+        return split
+
+    def missing(self, layouts, results):
+        """Returns the layouts not in any of the results of a split() cell.
+        """
+        shown = {id(layout) for rest in results.values() for layout in rest}
+        return [layout for layout in layouts if id(layout) not in shown]
+
+    def outcomes(self, layouts, hits, index):
+        """Returns a list of (result, layouts) for a shot at cell index, the
+        result being 'miss' or one of those of split().
+        """
+        results = self.split(layouts, hits).get(index, {})
+        outcomes = list(results.items())
+        missing = self.missing(layouts, results)
+        if missing:
+            outcomes.append(('miss', missing))
+        return outcomes
+
+    def after(self, hits, sunk, index, result):
+        """Returns the hits and sunk of the state a shot at index leads to.
+        """
+        if result == 'miss':
+            return hits, sunk
+        hits |= 1 << index
+        if result != 'hit':
+            sunk = dict(sunk)
+            sunk[result[0]] = result[1]
+        return hits, sunk
+
+    def key(self, used, hits, sunk):
+        """Returns the state as a string of one character per cell: x for
+        water (shot or not, no layout left uses the cell), @ for a hit, the
+        lower case sign of a sunk ship and . for the rest. It is only
+        canonical() once mirrored and rotated.
+        """
+        cells = ['x'] * self.geo.cells
+        for index in bits(used):
+            cells[index] = '.'
+        for index in bits(hits):
+            cells[index] = '@'
+        for ship, mask in sunk.items():
+            for index in bits(mask):
+                cells[index] = self.signs[ship].lower()
+        return ''.join(cells)
+
+    def canonical(self, cells):
+        """Returns the smallest of the key cells among its symmetries and
+        the number of the transform giving it.
+        """
+        best = None
+        for number, move in enumerate(self.movers):
+            moved = ''.join(move(cells))
+            if best is None or moved < best[0]:
+                best = moved, number
+        return best
+
+    def export(self):
+        """Solves the board and returns the policy as a dict: the nodes are
+        [shot, {result: [node, transform]}] in the frame of the node's
+        canonical key, the root node first. Results are 'miss', 'hit' or the
+        sign of the ship sunk and the sorted cell indices it took up.
+        """
+        value = self.value()
+        inverse = [_inverse(perm) for perm in self.transforms]
+        compose = _compose_table(self.transforms)
+        nodes, ids = [], {}
+
+        def visit(layouts, hits, sunk):
+            key, transform = self.canonical(self.key(_used(layouts), hits,
+                                                     sunk))
+            if key in ids:
+                return ids[key], transform
+            ids[key] = len(nodes)
+            shot = int(self.memo[key].split()[1])
+            edges = {}
+            nodes.append([shot, edges])
+            index = inverse[transform][shot]
+            for result, rest in self.outcomes(layouts, hits, index):
+                state = self.after(hits, sunk, index, result)
+                if len(state[1]) == len(self.sizes):
+                    node, child = None, 0
+                else:
+                    node, child = visit(rest, *state)
+                # child = relative o transform, both real to canonical
+                relative = compose[child][_inverse_number(
+                    compose, transform)]
+                edges[self._label(result, self.transforms[transform])] = \
+                    [node, relative]
+            return ids[key], transform
+
+        root, transform = visit(self.layouts, 0, {})
+        return {'rows': self.rows, 'cols': self.cols,
+                'ships': [list(ship) for ship in self.ships],
+                'value': value, 'transforms': self.transforms,
+                'root': [root, transform], 'nodes': nodes}
+
+    def save(self, path=None):
+        """Exports the policy to path, by default where PerfectTargeting
+        looks for it. Returns the path.
+        """
+        path = path or table_path(self.rows, self.cols, self.fleet)
+        table = self.export()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(table, f, separators=(',', ':'))
+        os.replace(tmp, path)
+        return path
+
+    def _label(self, result, perm):
+        if result in ('miss', 'hit'):
+            return result
+        ship, mask = result
+        return label(self.signs[ship], (perm[index] for index in bits(mask)))
+
+    def _layouts(self):
+        layouts = []
+
+        def place(ship, occupied, layout):
+            if ship == len(self.sizes):
+                layouts.append(tuple(layout))
+                return
+            for mask, idx in self.geo.placements(self.sizes[ship]):
+                if not mask & occupied:
+                    place(ship + 1, occupied | mask, layout + [mask])
+
+        place(0, 0, [])
+        return layouts
+
+    def _sync(self):
+        if hasattr(self.memo, 'sync'):
+            self.memo.sync()
+
+
+def label(sign, indices):
+    """Returns the result label of sinking the ship sign on cell indices.
+    """
+    return f"{sign}:{','.join(str(index) for index in sorted(indices))}"
+
+
+def _used(layouts):
+    """Returns the mask of the cells any of the layouts puts a ship on.
+    """
+    used = 0
+    for layout in layouts:
+        for mask in layout:
+            used |= mask
+    return used
+
+
+def _inverse(perm):
+    inverse = [0] * len(perm)
+    for index, moved in enumerate(perm):
+        inverse[moved] = index
+    return tuple(inverse)
+
+
+def _compose_table(transforms):
+    """Returns table[a][b], the number of the transform doing b then a.
+    """
+    numbers = {perm: number for number, perm in enumerate(transforms)}
+    return [[numbers[tuple(a[b[index]] for index in range(len(a)))]
+             for b in transforms] for a in transforms]
+
+
+def _inverse_number(compose, number):
+    return compose[number].index(0)
+
+
+def load_table(rows, cols, ships):
+    """Returns the exported policy for the geometry and fleet, or None. Each
+    file is read once per process.
+    """
+    path = table_path(rows, cols, ships)
+    if path not in _tables:
+        try:
+            with open(path) as f:
+                _tables[path] = json.load(f)
+        except (OSError, ValueError):
+            _tables[path] = None
+    return _tables[path]
+
+
+@register('targeting', 'perfect')
+class PerfectTargeting(TargetingStrategy):
+    """Follows the exported perfect play policy for the board and fleet, see
+    Analyzer. Boards without one, salvoes, and games that leave the policy
+    (eg. shots it did not pick) are played by DensityTargeting.
+    """
+
+    def __init__(self, rng=None, table=None):
+        super().__init__(rng)
+        self.fallback = DensityTargeting(self.rng)
+        self.table = table
+        self.node = None
+        self.last = None
+        self.lost = False
+
+    def pick(self, view):
+        if self.lost or not self._follow(view):
+            self.lost = True
+            return self.fallback.pick(view)
+        shot = self.table['nodes'][self.node][0]
+        self.last = self.geo.coord(self.inverse[self.transform][shot])
+        return self.last
+
+    def pick_many(self, view, shots):
+        self.lost = True
+        return self.fallback.pick_many(view, shots)
+
+    def _follow(self, view):
+        """Moves to the node of the result of the last shot. Returns False
+        when the game is not on the policy.
+        """
+        if self.node is None:
+            if self.last is not None:
+                return False
+            return self._start(view)
+
+        point = view[self.last]
+        if point == POINT['miss']:
+            result = 'miss'
+        elif point == POINT['hit']:
+            result = 'hit'
+        elif point.upper() not in view.sunk():
+            return False  # shot twice, the policy never does
+        else:
+            perm = self.transforms[self.transform]
+            result = label(point.upper(), (
+                perm[self.geo.index(coord)] for coord in
+                view.sunk()[point.upper()]))
+
+        edge = self.table['nodes'][self.node][1].get(result)
+        if edge is None or edge[0] is None:
+            return False
+        self.node = edge[0]
+        self.transform = self.compose[edge[1]][self.transform]
+        return True
+
+    def _start(self, view):
+        if self.table is None:
+            fleet = [_Size(sign, size) for sign, size in view.ships().items()]
+            self.table = load_table(view.rows, view.cols, fleet)
+        # solved for ships that may touch, the other rules rule out layouts
+        # and mark cells clear the policy knows nothing of
+        if (self.table is None or view.adjacency != 'touch' or
+                view.misses() or view.hits() or
+                view.sunk() or (self.table['rows'], self.table['cols']) !=
+                (view.rows, view.cols)):
+            return False
+        self.geo = geometry(view.rows, view.cols)
+        self.transforms = [tuple(perm) for perm in self.table['transforms']]
+        self.inverse = [_inverse(perm) for perm in self.transforms]
+        self.compose = _compose_table(self.transforms)
+        self.node, self.transform = self.table['root']
+        return True
+
+
+class _Size(object):
+    """Enough of a Ship for fleet_key().
+    """
+
+    def __init__(self, sign, size):
+        self.sign = sign
+        self.size = size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m battleship.perfect',
+        description='Work out perfect play on a small board and save it for '
+                    'the perfect targeting strategy.')
+    parser.add_argument('--rows', type=int, default=4)
+    parser.add_argument('--cols', type=int, default=4)
+    parser.add_argument('--ships', nargs='+', default=['D2', 'C3'],
+                        help='sign and size of each ship, eg. D2 C3')
+    parser.add_argument('--memo', help='dbm file to keep solved states in, '
+                                       'to resume an interrupted run')
+    parser.add_argument('--out', help='policy file, by default where the '
+                                      'strategy looks for it')
+    args = parser.parse_args(argv)
+
+    names = {sign: name for name, sign, size in SHIPS}
+    ships = [(names.get(spec[0], spec[0]), spec[0], int(spec[1:]))
+             for spec in args.ships]
+    analyzer = Analyzer(args.rows, args.cols, ships, args.memo)
+    try:
+        path = analyzer.save(args.out)
+        print(f'{analyzer.value():.4f} shots on average, policy saved to '
+              f'{path}')
+    finally:
+        analyzer.close()
+
+
+if __name__ == "__main__":
+    main()
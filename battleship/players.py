@@ -1,7 +1,11 @@
 import random
+import time
 from abc import ABCMeta, abstractmethod
+from battleship import metrics
 from battleship.board import Board
-from battleship.config import PROMPT, POINT, FLEET
+from battleship.config import PROMPT
+from battleship.speculate import Lookahead
+from battleship.strategies import BoardView, make_targeting, make_placement
 from battleship.ui import convert, pick_coord, show_board
 
 
@@ -12,33 +16,63 @@ class Player(metaclass=ABCMeta):
         pass
 
     @abstractmethod
-    def where2bomb(self):
+    def where2bomb(self, shots=None):
         pass
 
     def auto_hide_ships(self, ship, who=0):
-        """Computer randomly selects head coord, then using _head2tail() gets a
-        dict of coords, from the given choice randomly selects a list and
-        returns the ship object and its coords to Board.
+        """Computer randomly selects a position among all those _head2tail()
+        gives for every head coord, and returns the ship object and its
+        coords to Board. Raises ValueError if the ships hidden so far leave
+        no room for it, see auto_hide_fleet().
         """
-        self.occupied = set(key for key in self.brd.board if
-                            self.brd.board[key] in FLEET.keys())
-
-        while True:
-            head = random.choice(list(self.brd.board.keys()))
-            h2t = self._head2tail(ship, head)
+        self.occupied = self._taken()
+
+        options = [pos for head in self.brd.board for pos in
+                   self._head2tail(ship, head).values()]
+        if not options:
+            raise ValueError(f'no room left for the {ship}')
+        self.brd.place_ship(ship, random.choice(options))
+        self._hidden(ship, who)
+
+    def auto_hide_fleet(self, ships, who=0):
+        """Hides the list of ships with auto_hide_ships(), starting them all
+        again when the ones hidden so far leave no room for the next, as can
+        happen when ships may not touch. Ships hidden before are kept.
+        """
+        for attempt in range(100):
+            hidden = []
             try:
-                pos = random.choice(list(h2t.values()))
-                break
-            except IndexError:  # if the h2t dict has zero possible coords
-                continue  # will need to pick a new head coord
+                for ship in ships:
+                    self.auto_hide_ships(ship, None)
+                    hidden.append(ship)
+            except ValueError:  # painted into a corner, start again
+                for ship in hidden:
+                    self.brd.remove_ship(ship)
+                continue
+            for ship in ships:
+                self._hidden(ship, who)
+            return
 
-        self.brd.place_ship(ship, pos)
+        raise ValueError(f'cannot fit the fleet on a '
+                         f'{self.brd.rows}x{self.brd.cols} board')
 
+    def _hidden(self, ship, who):
         if who == 0:
             print(PROMPT['comp_hidden'].format(str(ship)))
         elif who == 1:
             print(PROMPT['player_hidden'].format(str(ship)))
 
+    def _taken(self):
+        """Returns the set of coords no other ship may take: those of the
+        ships hidden so far and, unless ships may touch, those around them.
+        """
+        taken = set(key for key in self.brd.board if
+                    self.brd.board[key] in self.brd.fleet)
+        for ship in self.brd.fleet.values():
+            if ship.pos:
+                taken.update(self.brd.halo(ship))
+        return taken
+
     def _head2tail(self, ship, head):
         """Given the Ship, its head coord and size, returns a dict with each
         tail as key to the full list of coords for each possible ship
@@ -55,8 +89,7 @@ class Player(metaclass=ABCMeta):
             diff += 1
 
         # removes h2t if it goes off board
-        h2t_lst = [h2t for h2t in h2t_lst if 0 <= h2t[-1][0] < self.brd.rows]
-        h2t_lst = [h2t for h2t in h2t_lst if 0 <= h2t[-1][1] < self.brd.cols]
+        h2t_lst = [h2t for h2t in h2t_lst if h2t[-1] in self.brd.board]
 
         # to remove h2t if any of its coords overlaps with occupied coord
         # first need list of individual coords in the h2t_lst
@@ -75,39 +108,59 @@ class Player(metaclass=ABCMeta):
         return h2t_dict
 
     def receive_shot(self, new):
-        """Takes a new tuple which is the coordinate of where to shoot,
-        compares what is at the coordinate on the board and distributes action;
-        miss, already shot, hit.
+        """Takes a new tuple which is the coordinate of where to shoot, lets
+        the Board resolve the shot and prints the outcome; miss, already shot,
+        hit or sunk. Returns the result so the shooter can observe it.
         """
-        shot = self.brd.board[new]
-
-        if shot == POINT['open']:
-            self.brd.record_miss(new)
-            print(PROMPT['miss'])
-        elif shot in POINT.values():
-            print(PROMPT['already_shot'])
-        elif shot in (key.lower() for key in FLEET):
-            print(PROMPT['already_sunk'])
-        elif shot in (FLEET.keys()):
-            self._hit(self.brd.fleet[shot], new)
+        result, ship = self.brd.shoot(new)
+        metrics.SHOTS.child(result).inc()
+
+        if result in ('hit', 'sunk'):
+            print(PROMPT[result].format(str(ship)))
         else:
-            pass  # maybe raise error here
+            print(PROMPT[result])
+
+        if result == 'sunk':
+            self.sunk += 1
+
+        return result
 
-    def _hit(self, ship, new):
-        """Takes the new coord that needs to be changed to a hit checks whether
-        or not this hit sinks the ship and correspondingly changes the board
-        and adds to the Ship's hits tally and if need be adds to the SUNK
-        tally.
+    def receive_volley(self, coords):
+        """Takes a salvo of coords, lets the Board resolve them all in one pass
+        and prints a single summary line. Returns the list of (coord, result)
+        so the shooter can observe them.
         """
-        ship.hits += 1
+        results = self.brd.volley(coords)
+
+        counts = dict.fromkeys(('miss', 'hit', 'already_shot', 'already_sunk'),
+                               0)
+        sunk = []
+        for coord, result, ship in results:
+            metrics.SHOTS.child(result).inc()
+            if result == 'sunk':
+                self.sunk += 1
+                sunk.append(str(ship))
+            else:
+                counts[result] += 1
 
-        if ship.hits == ship.size:
-            print(PROMPT['sunk'].format(str(ship)))
-            self.brd.record_sunk(ship)
-            self.sunk += 1
-        else:
-            print(PROMPT['hit'].format(str(ship)))
-            self.brd.record_hit(new)
+        summary = [f'{count} {result.replace("_", " ")}' for result, count in
+                   counts.items() if count]
+        if sunk:
+            summary.append('sinks the enemy ' + ', '.join(sunk))
+        print(PROMPT['salvo_result'].format(len(results), ', '.join(summary)))
+
+        return [(coord, result) for coord, result, ship in results]
+
+    def aim(self, brd):
+        """Gives the player a read-only view of the enemy Board it shoots at.
+        """
+        self.view = BoardView(brd)
+
+    def observe(self, coord, result):
+        """Told the result of the player's own shot at coord; a Human can
+        already see it on the board.
+        """
+        pass
 
 
 class Human(Player):
@@ -137,8 +190,7 @@ class Human(Player):
                            '\n   '.join([str(ship) for ship in fleet_lst])))
 
             if select.lower() == 'a':  # automates the hiding process
-                for ship in fleet_lst:
-                    self.auto_hide_ships(ship, 1)
+                self.auto_hide_fleet(fleet_lst, 1)
                 self._confirm_setup()
                 return
 
@@ -176,8 +228,7 @@ class Human(Player):
         to show possible coords for the tail and _full() to select tail to hide
         a ship sends the ship object and a list of coords to Board.
         """
-        self.occupied = set(key for key in self.brd.board if
-                            self.brd.board[key] in FLEET.keys())
+        self.occupied = self._taken()
 
         for n in range(3):
             print(PROMPT['lets_hide'].format(ship))
@@ -240,12 +291,27 @@ class Human(Player):
             print(PROMPT['wrong_tail'])
             return None
 
-    def where2bomb(self):
-        """Human selects a coordinate to bomb.
+    def where2bomb(self, shots=None):
+        """Human selects a coordinate to bomb, or a list of shots coordinates
+        for a salvo.
         """
-        bomb = pick_coord('where2bomb')
-        print(PROMPT['player_attack'].format(convert(bomb)))
-        return bomb
+        if shots is None:
+            bomb = pick_coord('where2bomb')
+            print(PROMPT['player_attack'].format(convert(bomb)))
+            return bomb
+
+        salvo = []
+        while len(salvo) < shots:
+            print(PROMPT['salvo_shot'].format(len(salvo) + 1, shots))
+            bomb = pick_coord('where2bomb')
+            if bomb in salvo:
+                print(PROMPT['salvo_twice'])
+                continue
+            salvo.append(bomb)
+
+        print(PROMPT['player_attack'].format(
+            ' '.join(convert(bomb) for bomb in salvo)))
+        return salvo
 
     def win(self):
         """Declares Human as the winner and shows the board.
@@ -257,34 +323,113 @@ class Human(Player):
 
 class Computer(Player):
 
-    def __init__(self):
+    def __init__(self, targeting='learning', placement='adversarial'):
+        """The Computer's targeting and placement are strategies looked up by
+        name in the strategies registry. The default targeting learns where
+        its opponents tend to hide their ships, see learn().
+        """
         self.brd = Board()
         self.sunk = 0
         self.occupied = set()
         self.bombed = set()
+        self.targeting = make_targeting(targeting)
+        self.placement = make_placement(placement)
+        self.lookahead = Lookahead(self._compute)
 
     def name(self):
         return "Computer"
 
     def set_up(self):
-        """Gets computer to hide the ships for game play.
+        """Gets computer to hide the ships for game play, using its placement
+        strategy.
         """
-        fleet = self.brd.fleet
-        fleet_lst = [fleet[ship] for ship in fleet]
-        random.shuffle(fleet_lst)
-
         print(PROMPT['border'])
 
-        for ship in fleet_lst:
-            self.auto_hide_ships(ship)
+        self.placement.adjacency = self.brd.adjacency
+        layout = self.placement.place(self.brd.rows, self.brd.cols,
+                                      list(self.brd.fleet.values()))
 
-    def where2bomb(self):
-        """Computer selects a coordinate to bomb.
+        for sign in layout:
+            ship = self.brd.fleet[sign]
+            self.brd.place_ship(ship, layout[sign])
+            print(PROMPT['comp_hidden'].format(str(ship)))
+
+    def where2bomb(self, shots=None):
+        """Computer selects a coordinate to bomb, or a list of shots
+        coordinates for a salvo.
+        """
+        if shots is None:
+            bomb = self._pick()
+            print(PROMPT['comp_attack'].format((convert(bomb))))
+            return bomb
+
+        salvo = self._pick_many(shots)
+        print(PROMPT['comp_attack'].format(
+            ' '.join(convert(bomb) for bomb in salvo)))
+        return salvo
+
+    def observe(self, coord, result):
+        """Passes the result of the Computer's shot on to its targeting
+        strategy.
+        """
+        self.targeting.observe(coord, result)
+
+    def learn(self, brd):
+        """Once a game is over, shows the targeting strategy where the enemy
+        fleet on brd was hidden, if it learns from that.
+        """
+        learn = getattr(self.targeting, 'learn', None)
+        if learn is not None:
+            learn({ship.sign: list(ship.pos) for ship in brd.fleet.values()
+                   if ship.pos})
+
+    def speculate(self, branches=(None,)):
+        """Starts working out the Computer's next move on a background thread,
+        eg. while the Human is typing theirs. branches are the numbers of
+        shots the move may need, None for a single shot.
         """
-        bomb = self._random_pick()
-        print(PROMPT['comp_attack'].format((convert(bomb))))
+        if getattr(self, 'view', None) is not None:
+            self.lookahead.start(self.view.version, branches)
+
+    def _pick(self):
+        """Asks the targeting strategy for a coordinate, falling back to
+        _random_pick() if the Computer has not been given a view to aim at.
+        """
+        if getattr(self, 'view', None) is None:
+            return self._random_pick()
+
+        bomb = self._move(None)
+        self.bombed.add(bomb)
+
         return bomb
 
+    def _pick_many(self, shots):
+        """Asks the targeting strategy for a salvo of coordinates.
+        """
+        if getattr(self, 'view', None) is None:
+            return [self._random_pick() for shot in range(shots)]
+
+        salvo = self._move(shots)
+        self.bombed.update(salvo)
+
+        return salvo
+
+    def _move(self, shots):
+        """Takes the move speculate() worked out if it is still good, or
+        works it out now. The time it took is counted in the metrics.
+        """
+        start = time.perf_counter()
+        move = self.lookahead.take(self.view.version, shots)
+        if move is None:
+            move = self._compute(shots)
+        metrics.moved(self.targeting, time.perf_counter() - start)
+        return move
+
+    def _compute(self, shots):
+        if shots is None:
+            return self.targeting.pick(self.view)
+        return self.targeting.pick_many(self.view, shots)
+
     def _random_pick(self):
         """Computer randomly selects a coordinate out of a list of coord tuples
         that have not yet been bombed.
@@ -0,0 +1,302 @@
+"""Tournament results in a SQLite database.
+
+Games, where each side hid its fleet and per game metrics (shots, the shot
+each ship sank at) are written by a single writer process that takes
+outcomes from a queue as the worker processes playing them finish, and
+commits them a batch per transaction. Summary tables are kept up to date in
+the same transactions, so win rates and shot distributions are read from a
+few hundred rows however many games there are.
+
+    bship results density montecarlo random --games 10000 --db results.db
+    bship results --db results.db
+"""
+import argparse
+import json
+import random
+import sqlite3
+import traceback
+from multiprocessing import Pool, Process, Queue
+from queue import Empty, Full
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    player_a TEXT NOT NULL,
+    player_b TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    seed REAL,
+    first INTEGER NOT NULL,
+    winner INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS placements (
+    game INTEGER NOT NULL REFERENCES games(id),
+    side INTEGER NOT NULL,
+    sign TEXT NOT NULL,
+    cells TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    game INTEGER NOT NULL REFERENCES games(id),
+    side INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    value REAL NOT NULL
+);
+
+-- kept up to date by the writer, one row per ordered pair of players
+CREATE TABLE IF NOT EXISTS pair_summary (
+    player TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    PRIMARY KEY (player, opponent)
+) WITHOUT ROWID;
+-- the shots each player took to win
+CREATE TABLE IF NOT EXISTS shots_summary (
+    player TEXT NOT NULL,
+    shots INTEGER NOT NULL,
+    games INTEGER NOT NULL,
+    PRIMARY KEY (player, shots)
+) WITHOUT ROWID;
+
+CREATE VIEW IF NOT EXISTS win_rates AS
+    SELECT player, opponent, games, wins, 1.0 * wins / games AS rate
+    FROM pair_summary;
+CREATE VIEW IF NOT EXISTS player_rates AS
+    SELECT player, SUM(games) AS games, SUM(wins) AS wins,
+           1.0 * SUM(wins) / SUM(games) AS rate
+    FROM pair_summary GROUP BY player;
+"""
+
+# the upserts are spelt out as insert or ignore then update, sqlite only has
+# ON CONFLICT DO UPDATE since 3.24
+PAIR = [
+    "INSERT OR IGNORE INTO pair_summary VALUES (?, ?, 0, 0)",
+    "UPDATE pair_summary SET games = games + 1, wins = wins + ? "
+    "WHERE player = ? AND opponent = ?",
+]
+SHOTS = [
+    "INSERT OR IGNORE INTO shots_summary VALUES (?, ?, 0)",
+    "UPDATE shots_summary SET games = games + 1 "
+    "WHERE player = ? AND shots = ?",
+]
+
+
+def connect(path):
+    """Opens the database in WAL mode, so summaries can be read while the
+    writer commits, creating the tables on first use.
+    """
+    db = sqlite3.connect(path, timeout=30)
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('PRAGMA synchronous=NORMAL')
+    db.executescript(SCHEMA)
+    return db
+
+
+def player(targeting, placement):
+    return f'{targeting}:{placement}'
+
+
+def insert(db, games):
+    """Writes the outcomes of bench.duel() with the 'seed' they were played
+    with, and updates the summaries, in one transaction.
+    """
+    with db:
+        for outcome in games:
+            sides = outcome['sides']
+            names = [player(side['targeting'], side['placement'])
+                     for side in sides]
+            cursor = db.execute(
+                'INSERT INTO games (player_a, player_b, rows, cols, seed, '
+                'first, winner) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (names[0], names[1], outcome['rows'], outcome['cols'],
+                 outcome.get('seed'), outcome['first'], outcome['winner']))
+            game = cursor.lastrowid
+
+            db.executemany('INSERT INTO placements VALUES (?, ?, ?, ?)', [
+                (game, n, sign, json.dumps(cells))
+                for n, side in enumerate(sides)
+                for sign, cells in side['layout'].items()])
+            db.executemany('INSERT INTO metrics VALUES (?, ?, ?, ?)', [
+                (game, n, name, value) for n, side in enumerate(sides)
+                for name, value in [('shots', side['shots'])] + [
+                    (f'sunk_at:{sign}', shot)
+                    for sign, shot in side['sunk_at'].items()]])
+
+            for n in (0, 1):
+                me, them = names[n], names[1 - n]
+                db.execute(PAIR[0], (me, them))
+                db.execute(PAIR[1], (int(outcome['winner'] == n), me, them))
+            winner = names[outcome['winner']]
+            shots = sides[outcome['winner']]['shots']
+            db.execute(SHOTS[0], (winner, shots))
+            db.execute(SHOTS[1], (winner, shots))
+
+
+def win_rates(db):
+    """Returns (player, opponent, games, wins, rate) rows, best first.
+    """
+    return db.execute('SELECT * FROM win_rates '
+                      'ORDER BY rate DESC, player, opponent').fetchall()
+
+
+def shots_distribution(db, name):
+    """Returns {shots: games} of the games player name won.
+    """
+    return dict(db.execute('SELECT shots, games FROM shots_summary '
+                           'WHERE player = ? ORDER BY shots', (name,)))
+
+
+def _write(path, queue, errors, batch, wait):
+    """Writer process: commits outcomes off the queue batch at a time, or
+    whatever came in the last wait seconds, until it gets None. An error is
+    put on errors, as its traceback, before the process dies of it.
+    """
+    try:
+        db = connect(path)
+        pending = []
+        done = False
+        while not done:
+            try:
+                outcome = queue.get(timeout=wait)
+                if outcome is None:
+                    done = True
+                else:
+                    pending.append(outcome)
+            except Empty:
+                pass
+            if pending and (done or len(pending) >= batch or queue.empty()):
+                insert(db, pending)
+                pending = []
+        db.close()
+    except Exception:
+        errors.put(traceback.format_exc())
+        raise
+
+
+class Writer(object):
+    """The single process writing to the database; put() outcomes on it.
+    """
+
+    def __init__(self, path, batch=1000, wait=0.5):
+        self.wait = wait
+        self.queue = Queue(maxsize=100 * batch)
+        self.errors = Queue()
+        self.error = None  # of the writer, once it has died of one
+        self.process = Process(target=_write,
+                               args=(path, self.queue, self.errors, batch,
+                                     wait),
+                               daemon=True)
+        self.process.start()
+
+    def put(self, outcome):
+        """Queues outcome, raising RuntimeError rather than waiting forever
+        on a full queue if the writer has died.
+        """
+        while True:
+            try:
+                self.queue.put(outcome, timeout=self.wait)
+                return
+            except Full:
+                self.check()
+
+    def check(self):
+        """Raises RuntimeError, with the writer's error if it had one, if
+        the writer process has died before being closed.
+        """
+        if self.process.is_alive() or self.process.exitcode == 0:
+            return
+        # nothing will read what is still queued, exiting must not wait on it
+        self.queue.cancel_join_thread()
+        if self.error is None:
+            try:
+                self.error = self.errors.get(timeout=self.wait).strip()
+            except Empty:
+                self.error = f'exit code {self.process.exitcode}'
+        raise RuntimeError(f'the results writer died: {self.error}')
+
+    def close(self):
+        """Waits for everything queued to be committed.
+        """
+        self.put(None)
+        self.process.join()
+        self.check()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _play(job):
+    """Worker: plays one game and returns its outcome for the writer.
+    """
+    from battleship.bench import duel
+
+    a, b, rows, cols, seed = job
+    targeting_a, _, placement_a = a.partition(':')
+    targeting_b, _, placement_b = b.partition(':')
+    outcome = duel((targeting_a, targeting_b),
+                   (placement_a or 'random', placement_b or 'random'),
+                   rows, cols, seed)
+    outcome.update(rows=rows, cols=cols, seed=seed)
+    return outcome
+
+
+def tournament(path, players, games, rows=10, cols=10, workers=None,
+               seed=None):
+    """Plays games games between random pairs of players (targeting or
+    targeting:placement names) over worker processes, recording each one
+    as it is played. Jobs are made as the workers take them.
+    """
+    with Writer(path) as writer:
+        if workers == 1:
+            for job in _jobs(players, games, rows, cols, seed):
+                writer.put(_play(job))
+        else:
+            with Pool(workers) as pool:
+                for outcome in pool.imap_unordered(
+                        _play, _jobs(players, games, rows, cols, seed),
+                        chunksize=64):
+                    writer.put(outcome)
+
+
+def _jobs(players, games, rows, cols, seed):
+    rng = random.Random(seed)
+    for game in range(games):
+        a, b = rng.sample(players, 2)
+        yield a, b, rows, cols, rng.random()
+
+
+def report(db):
+    lines = [f"{'player':24} {'opponent':24} {'games':>7} {'rate':>6}"]
+    for name, opponent, games, wins, rate in win_rates(db):
+        lines.append(f'{name:24} {opponent:24} {games:7} {rate:6.1%}')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='bship results',
+        description='Play a tournament into a SQLite database, or show its '
+                    'win rates.')
+    parser.add_argument('players', nargs='*',
+                        help='targeting or targeting:placement strategies')
+    parser.add_argument('--db', default='results.db')
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if len(args.players) == 1:
+        parser.error('a tournament needs at least two players')
+    if args.players:
+        tournament(args.db, args.players, args.games, workers=args.workers,
+                   seed=args.seed)
+    db = connect(args.db)
+    print(report(db))
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Full screen curses front end: both boards stay on screen and only the
+cells a shot changes are repainted.
+"""
+import curses
+import random
+import time
+from battleship.board import Board
+from battleship.config import PROMPT, POINT
+from battleship.speculate import Lookahead
+from battleship.strategies import BoardView, make_placement, make_targeting
+from battleship.ui import clean, convert
+
+ATTACK = 3, 4  # (y, x) of the top left corner of each board
+DEFEND = 3, 42
+STATUS = 16  # first of the status lines under the boards
+ENTER = (curses.KEY_ENTER, 10, 13)
+BACKSPACE = (curses.KEY_BACKSPACE, 127, 8)
+
+
+class Screen(object):
+
+    def __init__(self, stdscr, targeting='density', placement='adversarial',
+                 rng=None, idle=0.02, rules='classic', adjacency='touch'):
+        """Takes the curses window to draw on and the names of the Computer's
+        strategies; idle is the pause between polls of the keyboard.
+        """
+        self.scr = stdscr
+        self.rules = rules
+        self.adjacency = adjacency
+        self.targeting = targeting
+        self.placement = placement
+        self.rng = rng or random.Random()
+        self.idle = idle
+
+    def new_game(self):
+        """Sets up fresh boards: the Computer hides its fleet, the player's
+        fleet is hidden randomly, and each board repaints its own cells.
+        """
+        self.enemy = Board(adjacency=self.adjacency)
+        self.home = Board(adjacency=self.adjacency)
+        self._hide(self.enemy, make_placement(self.placement, rng=self.rng))
+        self._hide(self.home, make_placement('random', rng=self.rng))
+
+        self.shooter = make_targeting(self.targeting, rng=self.rng)
+        self.view = BoardView(self.home)
+        self.lookahead = Lookahead(self._compute)
+
+        self.enemy.watch(lambda brd, coords:
+                         self._paint(ATTACK, brd, coords, hide=True))
+        self.home.watch(lambda brd, coords:
+                        self._paint(DEFEND, brd, coords, hide=False))
+
+    def draw(self):
+        """Draws the whole screen, only done at the start of a game.
+        """
+        self.scr.erase()
+        self._put(0, 0, PROMPT['title'].strip())
+        self._put(ATTACK[0] - 1, ATTACK[1], '*ATTACK')
+        self._put(DEFEND[0] - 1, DEFEND[1], '*DEFEND')
+
+        for (y, x), brd, hide in ((ATTACK, self.enemy, True),
+                                  (DEFEND, self.home, False)):
+            for n, line in enumerate(brd.__str__(hide).split('\n')):
+                self._put(y + n, x, line.strip('\t'))
+
+        self.scr.refresh()
+
+    def run(self):
+        """Plays games until the player quits.
+        """
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        self.scr.nodelay(True)
+        self.scr.keypad(True)
+
+        while True:
+            self.new_game()
+            self.draw()
+
+            if not self.set_up() or not self.play():
+                return
+
+            self.say(2, PROMPT['screen_again'])
+            if self.read_key(ENTER + (ord('q'),)) == ord('q'):
+                return
+
+    def set_up(self):
+        """Lets the player re-hide their fleet until happy. Returns False if
+        the player quits.
+        """
+        while True:
+            self.say(0, PROMPT['screen_setup'])
+            key = self.read_key(ENTER + (ord('r'), ord('q')))
+            if key == ord('q'):
+                return False
+            if key in ENTER:
+                return True
+            self.home.remove_fleet()
+            self._hide(self.home, make_placement('random', rng=self.rng))
+
+    def play(self):
+        """Alternates shots until a fleet is sunk. Returns False if the player
+        quits halfway.
+        """
+        players_turn = self.rng.random() < 0.5
+        self.say(0, PROMPT['one_first'] if players_turn else
+                 PROMPT['comp_first'])
+
+        try:
+            while True:
+                if players_turn:
+                    # the Computer works out its reply while the player types
+                    shots = self._shots(self.enemy)
+                    self.lookahead.start(self.home.version, [shots, shots - 1]
+                                         if shots > 1 else [shots])
+
+                    coords = self.read_salvo(self._shots(self.home))
+                    if coords is None:
+                        return False
+                    results = self.enemy.volley(coords)
+                    self._report(1, PROMPT['player_attack'], results)
+                    if not self.enemy.afloat():
+                        self.say(0, PROMPT['one_wins'].strip())
+                        return True
+                else:
+                    shots = self._shots(self.enemy)
+                    coords = self.lookahead.take(self.home.version, shots)
+                    if coords is None:
+                        coords = self._compute(shots)
+                    results = self.home.volley(coords)
+                    for coord, result, ship in results:
+                        self.shooter.observe(coord, result)
+                    self._report(2, PROMPT['comp_attack'], results)
+                    if not self.home.afloat():
+                        self.say(0, PROMPT['comp_wins'].strip())
+                        return True
+
+                players_turn = not players_turn
+        finally:
+            self.lookahead.close()
+
+    def read_salvo(self, shots):
+        """Reads the coordinates of a turn, one unless it is a salvo. Returns
+        None if the player quits.
+        """
+        coords = []
+        while len(coords) < shots:
+            prefix = (PROMPT['salvo_shot'].format(len(coords) + 1, shots) + ' '
+                      if shots > 1 else '')
+            coord = self.read_coord(prefix)
+            if coord is None:
+                return None
+            if coord in coords:
+                self.say(3, PROMPT['salvo_twice'].strip())
+                continue
+            coords.append(coord)
+        return coords
+
+    def read_key(self, wanted):
+        """Polls the keyboard without blocking until one of the wanted keys is
+        pressed.
+        """
+        while True:
+            key = self.scr.getch()
+            if key in wanted:
+                return key
+            if key == -1:
+                time.sleep(self.idle)
+
+    def read_coord(self, prefix=''):
+        """Collects the typed coordinate key by key, echoing it on the prompt
+        line. Returns the coord tuple on Enter or None if the player quits.
+        """
+        typed = ''
+        self.say(0, prefix + PROMPT['screen_aim'].format(typed))
+
+        while True:
+            key = self.scr.getch()
+            if key == -1:
+                time.sleep(self.idle)
+                continue
+
+            if key in ENTER:
+                entry = clean(typed) if typed.lower() not in 'qr' else None
+                coord = convert(entry) if entry else None
+                if coord in self.enemy.board:
+                    return coord
+                typed = ''
+                self.say(3, PROMPT['bad_coord'].format('B7'))
+            elif key in BACKSPACE:
+                typed = typed[:-1]
+            elif key == ord('q') and not typed:
+                return None
+            elif 0 < key < 256 and chr(key).isalnum() and len(typed) < 4:
+                typed += chr(key)
+            else:
+                continue
+
+            self.say(0, prefix + PROMPT['screen_aim'].format(typed))
+
+    def say(self, line, text):
+        """Replaces one status line.
+        """
+        self._put(STATUS + line, 0, text)
+        try:
+            self.scr.clrtoeol()
+        except curses.error:
+            pass
+        self.scr.refresh()
+
+    def _compute(self, shots):
+        """The Computer's move of shots coords.
+        """
+        if shots == 1:
+            return [self.shooter.pick(self.view)]
+        return self.shooter.pick_many(self.view, shots)
+
+    def _shots(self, brd):
+        """Shots in a turn for the owner of brd.
+        """
+        return len(brd.afloat()) if self.rules == 'salvo' else 1
+
+    def _report(self, line, attack, results):
+        """Shows a turn's shots and what they did on one status line.
+        """
+        outcome = ''
+        for coord, result, ship in results:
+            outcome += (PROMPT[result].format(str(ship)) if ship else
+                        PROMPT[result])
+        if line == 1:
+            self.say(3, '')
+        self.say(line, attack.format(' '.join(
+            convert(coord) for coord, result, ship in results)) + outcome)
+
+    def _paint(self, origin, brd, coords, hide):
+        """Repaints just the cells at coords of a board drawn at origin.
+        """
+        for col, row in coords:
+            point = brd.board[(col, row)]
+            if hide and point in brd.fleet:
+                point = POINT['open']
+            self._put(origin[0] + 1 + row, origin[1] + 3 + 3 * col, point)
+        self.scr.refresh()
+
+    def _put(self, y, x, text):
+        try:
+            self.scr.addstr(y, x, text)
+        except curses.error:  # the terminal is too small, draw what fits
+            pass
+
+    def _hide(self, brd, hider):
+        hider.adjacency = brd.adjacency
+        layout = hider.place(brd.rows, brd.cols, list(brd.fleet.values()))
+        for sign in layout:
+            brd.place_ship(brd.fleet[sign], layout[sign])
+
+
+def run(targeting='density', placement='adversarial', rules='classic',
+        adjacency='touch'):
+    """Starts the curses front end, restoring the terminal when done.
+    """
+    curses.wrapper(lambda stdscr: Screen(stdscr, targeting, placement,
+                                         rules=rules,
+                                         adjacency=adjacency).run())
+    print("good game!")
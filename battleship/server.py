@@ -0,0 +1,166 @@
+"""The batch protocol served over TCP: each connection is a session of games
+against the Computer, sending and answered with JSON lines as by
+`bship batch --json`. Every session runs on one asyncio event loop, the
+Computer's moves included, so one process holds as many matches as it has
+connections. With --workers the moves are worked out in a pool of processes
+instead (see executor.MoveExecutor), for targeting strategies too slow to
+run on the loop.
+
+    bship serve --port 5152
+    bship serve --targeting montecarlo --workers 4 --deadline 0.05
+    bship load --address 127.0.0.1:5152
+    bship serve --metrics-port 9464  # curl 127.0.0.1:9464/metrics
+"""
+import argparse
+import asyncio
+import random
+import time
+from battleship import metrics
+from battleship.batch import Batch, format_answer, shots_in
+
+PORT = 5152
+LINE_LIMIT = 4096  # longest request line, a salvo of JSON is well under
+
+
+def raise_file_limit():
+    """Lets the process have as many connections open as the system allows,
+    a soft limit of 1024 being common.
+    """
+    try:
+        import resource
+    except ImportError:  # not on Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+
+async def session(reader, writer, executor=None, **options):
+    """Plays the requests of one connection until the client leaves. The
+    Computer's moves are worked out by the executor if there is one.
+    """
+    batch = Batch(**options)
+    key = batch.key
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            line = line.decode(errors='replace')
+            if executor is None:
+                answers = batch.handle(line, json_lines=True)
+            else:
+                answers = await _handle(batch, line, executor)
+                if batch.over or batch.key != key:
+                    # the workers need not keep the game's strategy
+                    executor.forget(key)
+                    key = batch.key
+            writer.write(''.join(format_answer(answer, True) + '\n'
+                                 for answer in answers).encode())
+            await writer.drain()
+    except (OSError, ValueError):
+        pass  # gone, or a line over the limit
+    finally:
+        batch.close()
+        if executor is not None:
+            executor.forget(key)
+        writer.close()
+
+
+async def _handle(batch, line, executor):
+    """Answers a line as Batch.handle() does, awaiting the Computer's reply
+    to a shot from the executor.
+    """
+    try:
+        msg = batch.request(line, json_lines=True)
+    except ValueError:
+        msg = None
+    texts = shots_in(msg) if msg else None
+    if texts is None:
+        return batch.handle(line, json_lines=True)
+
+    answers, shots = batch.fire(texts)
+    if shots:
+        start = time.perf_counter()
+        move = await executor.move(batch.targeting, batch.view,
+                                   None if shots == 1 else shots,
+                                   key=batch.key, seed=batch.rng.random())
+        metrics.moved(batch.targeting, time.perf_counter() - start)
+        answers.extend(batch.reply([move] if shots == 1 else move))
+    return answers
+
+
+async def start(host='127.0.0.1', port=PORT, targeting='density',
+                placement='adversarial', rules='classic', seed=None,
+                executor=None):
+    """Starts serving on host:port, port 0 picking a free one, the moves
+    worked out by the executor if given. Returns the asyncio Server, see its
+    sockets for the address.
+    """
+    rng = random.Random(seed)
+
+    def connected(reader, writer):
+        return session(reader, writer, executor, targeting=targeting,
+                       placement=placement, rules=rules,
+                       rng=random.Random(rng.random()))
+
+    return await asyncio.start_server(connected, host, port, backlog=4096,
+                                      limit=LINE_LIMIT)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='bship serve',
+        description='Serve games against the Computer over TCP, JSON lines '
+                    'as in bship batch --json.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--salvo', action='store_true',
+                        help='one shot per ship still afloat each turn')
+    parser.add_argument('--targeting', default='density')
+    parser.add_argument('--placement', default='adversarial')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=0,
+                        help='processes working out the moves (default: '
+                             'none, on the event loop)')
+    parser.add_argument('--deadline', type=float, default=0.05,
+                        help='seconds a move may take on the workers before '
+                             'a random one is played')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='serve metrics as plain text on '
+                             'http://127.0.0.1:PORT/metrics')
+    args = parser.parse_args(argv)
+
+    raise_file_limit()
+    if args.metrics_port is not None:
+        metrics.serve(args.metrics_port)
+    executor = None
+    if args.workers:
+        from battleship.executor import MoveExecutor
+        executor = MoveExecutor(args.workers, args.deadline)
+
+    async def serve():
+        server = await start(args.host, args.port, args.targeting,
+                             args.placement,
+                             'salvo' if args.salvo else 'classic', args.seed,
+                             executor)
+        host, port = server.sockets[0].getsockname()[:2]
+        # the first line tells a parent process the port picked
+        print(f'serving on {host}:{port}', flush=True)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if executor:
+            executor.close()
+
+
+if __name__ == "__main__":
+    main()
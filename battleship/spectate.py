@@ -0,0 +1,142 @@
+"""Fan-out of a game's events to any number of spectators.
+
+A Hub watches an Engine (or anything calling it with the same event dicts)
+and turns each event into one line of JSON, encoded once however many
+spectators there are. Each Subscription holds a bounded backlog of those
+lines; a spectator that falls behind by more than its backlog loses them and
+gets a snapshot of the boards instead, so a slow reader costs the game
+nothing but a flag.
+
+    hub = Hub()
+    engine.watch(hub)
+    spectator = hub.subscribe()
+    for line in spectator.get():  # bytes, one JSON object per line
+        ...
+"""
+import json
+import threading
+from collections import deque
+
+
+class Subscription(object):
+
+    def __init__(self, hub, backlog):
+        self.hub = hub
+        self.backlog = backlog
+        self.pending = deque()
+        self.stale = True  # starts with a snapshot
+        self.closed = False
+        self.ready = threading.Condition(hub.lock)
+
+    def get(self, timeout=None):
+        """Returns the lines published since the last call, waiting up to
+        timeout seconds for one (None waits for ever). A snapshot line stands
+        in for everything that was dropped. Returns [] on timeout or once
+        closed.
+        """
+        with self.ready:
+            if not self.ready.wait_for(
+                    lambda: self.stale or self.pending or self.closed,
+                    timeout):
+                return []
+            if self.closed:
+                return []
+            if self.stale:
+                self.stale = False
+                self.pending.clear()
+                return [self.hub._snapshot()]
+            lines = list(self.pending)
+            self.pending.clear()
+            return lines
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class Hub(object):
+
+    def __init__(self, backlog=64):
+        """backlog is how many lines a subscriber may fall behind by before
+        they are replaced by a snapshot.
+        """
+        self.backlog = backlog
+        self.lock = threading.Lock()
+        self.subscribers = []
+        self.seq = 0
+        self.boards = {}  # player to what they have shot at
+        self.winner = None
+        self._snapshot_line = None
+
+    def __call__(self, event):
+        self.publish(event)
+
+    def publish(self, event):
+        """Applies an event dict to the boards and hands its JSON line to
+        every subscriber.
+        """
+        with self.lock:
+            self.seq += 1
+            event = dict(event, seq=self.seq)
+            self._apply(event)
+            line = (json.dumps(event) + '\n').encode()
+            for subscriber in self.subscribers:
+                if subscriber.stale:
+                    continue  # the snapshot it gets will cover this
+                if len(subscriber.pending) >= subscriber.backlog:
+                    subscriber.stale = True
+                    subscriber.pending.clear()
+                else:
+                    subscriber.pending.append(line)
+                subscriber.ready.notify()
+
+    def subscribe(self, backlog=None):
+        """Returns a new Subscription, whose first line is a snapshot.
+        """
+        subscriber = Subscription(self, backlog or self.backlog)
+        with self.lock:
+            self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+            subscriber.closed = True
+            subscriber.ready.notify_all()
+
+    def snapshot(self):
+        """Returns the snapshot line: per player the misses, hits and sunk
+        ships on the board they shoot at, the winner if the game is over and
+        the seq of the last event it includes.
+        """
+        with self.lock:
+            return self._snapshot()
+
+    def _snapshot(self):
+        """Encodes the snapshot once per event, the lock must be held.
+        """
+        if self._snapshot_line is None:
+            snapshot = {'type': 'snapshot', 'seq': self.seq,
+                        'boards': self.boards, 'winner': self.winner}
+            self._snapshot_line = (json.dumps(snapshot) + '\n').encode()
+        return self._snapshot_line
+
+    def _apply(self, event):
+        self._snapshot_line = None
+        kind = event['type']
+        if kind == 'game_over':
+            self.winner = event['winner']
+            return
+        board = self.boards.setdefault(
+            event['player'], {'misses': [], 'hits': [], 'sunk': {}})
+        if kind == 'result':
+            coord = list(event['coord'])
+            if event['result'] == 'miss':
+                board['misses'].append(coord)
+            elif event['result'] in ('hit', 'sunk'):
+                board['hits'].append(coord)
+        elif kind == 'sink':
+            coords = [list(coord) for coord in event['coords']]
+            board['sunk'][event['ship']] = coords
+            board['hits'] = [coord for coord in board['hits'] if
+                             coord not in coords]
@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Lookahead(object):
+    """Works out a player's next move on a background thread while the other
+    player is still thinking.
+
+    A move only depends on the board being shot at, so it is tagged with that
+    board's version when it is started and thrown away if the board changed
+    before it is taken. Branches are the numbers of shots the move may turn
+    out to need (None for a single shot); under salvo rules that depends on
+    what the other player's shots sink, so the likely ones are worked out in
+    turn, most likely first.
+    """
+
+    def __init__(self, compute):
+        """compute(shots) returns the move for a number of shots, it is only
+        ever run on one thread at a time.
+        """
+        self.compute = compute
+        self.executor = None
+        self.pending = {}
+
+    def start(self, version, branches):
+        """Starts working out the move for each branch.
+        """
+        self.discard()
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix='lookahead')
+        for shots in branches:
+            self.pending[shots] = (version,
+                                   self.executor.submit(self.compute, shots))
+
+    def take(self, version, shots):
+        """Returns the move worked out for this many shots on this version of
+        the board, waiting for it if it is still running, or None if there is
+        none. Every other branch is discarded.
+        """
+        version_then, future = self.pending.pop(shots, (None, None))
+        self.discard()
+        if future is None or version_then != version:
+            if future is not None:
+                self._settle(future)
+            return None
+        return future.result()
+
+    def discard(self):
+        """Cancels the branches not started yet and lets the running one end,
+        the strategy it runs is not safe to use from two threads.
+        """
+        for version, future in self.pending.values():
+            self._settle(future)
+        self.pending = {}
+
+    def close(self):
+        self.discard()
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def _settle(self, future):
+        if not future.cancel():
+            try:
+                future.result()
+            except Exception:  # the stale move is not wanted anyway
+                pass
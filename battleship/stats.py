@@ -0,0 +1,390 @@
+"""Streaming statistics over game outcomes (see bench.duel) that never keep
+the games themselves: every summary can be merged with the same summary from
+another process and saved to disk to resume from.
+
+    bship stats --games 100000 --workers 8 --checkpoint run.json
+"""
+import argparse
+import json
+import math
+import os
+import random
+from itertools import islice
+from multiprocessing import Pool
+
+
+class Moments(object):
+    """Count, mean, variance, min and max of a stream of numbers.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared differences from the mean
+        self.min = None
+        self.max = None
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.min = x if self.min is None else min(self.min, x)
+        self.max = x if self.max is None else max(self.max, x)
+
+    def merge(self, other):
+        if not other.count:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else 0.0
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2,
+                'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        moments = cls()
+        moments.__dict__.update(data)
+        return moments
+
+
+class Histogram(object):
+    """Counts per fixed width bucket, bucket n holding [n * width,
+    (n + 1) * width).
+    """
+
+    def __init__(self, width=1):
+        self.width = width
+        self.counts = {}
+
+    def add(self, x, count=1):
+        bucket = int(x // self.width)
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+
+    def merge(self, other):
+        if other.width != self.width:
+            raise ValueError('cannot merge histograms of different widths')
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        return self
+
+    def to_dict(self):
+        return {'width': self.width,
+                'counts': {str(bucket): count for bucket, count in
+                           sorted(self.counts.items())}}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data['width'])
+        histogram.counts = {int(bucket): count for bucket, count in
+                            data['counts'].items()}
+        return histogram
+
+
+class Sketch(object):
+    """Quantile sketch of non negative numbers with buckets growing
+    geometrically, so any quantile is within `accuracy` relative error and
+    sketches merge by adding bucket counts (the DDSketch idea).
+    """
+
+    def __init__(self, accuracy=0.01):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.zeros = 0
+        self.count = 0
+        self.buckets = {}
+
+    def add(self, x):
+        self.count += 1
+        if x <= 0:
+            self.zeros += 1
+            return
+        key = math.ceil(math.log(x) / self.log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def quantile(self, q):
+        """Returns the estimate of the q (0..1) quantile, None when empty.
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def merge(self, other):
+        if other.accuracy != self.accuracy:
+            raise ValueError('cannot merge sketches of different accuracy')
+        self.zeros += other.zeros
+        self.count += other.count
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        return self
+
+    def to_dict(self):
+        return {'accuracy': self.accuracy, 'zeros': self.zeros,
+                'count': self.count,
+                'buckets': {str(key): count for key, count in
+                            sorted(self.buckets.items())}}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['accuracy'])
+        sketch.zeros = data['zeros']
+        sketch.count = data['count']
+        sketch.buckets = {int(key): count for key, count in
+                          data['buckets'].items()}
+        return sketch
+
+
+class Metric(object):
+    """Moments and a quantile sketch of the same stream.
+    """
+
+    def __init__(self):
+        self.moments = Moments()
+        self.sketch = Sketch()
+
+    def add(self, x):
+        self.moments.add(x)
+        self.sketch.add(x)
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def summary(self):
+        return {'count': self.moments.count, 'mean': self.moments.mean,
+                'stdev': math.sqrt(self.moments.variance),
+                'min': self.moments.min, 'max': self.moments.max,
+                'p50': self.sketch.quantile(0.5),
+                'p90': self.sketch.quantile(0.9),
+                'p99': self.sketch.quantile(0.99)}
+
+    def to_dict(self):
+        return {'moments': self.moments.to_dict(),
+                'sketch': self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data):
+        metric = cls()
+        metric.moments = Moments.from_dict(data['moments'])
+        metric.sketch = Sketch.from_dict(data['sketch'])
+        return metric
+
+
+class GameStats(object):
+    """Summary of any number of game outcomes: wins per targeting strategy
+    and for the side going first, the winner's shots (moments, quantiles and
+    an exact histogram), the shot at which each ship sank, and how often
+    each cell was hit.
+    """
+
+    def __init__(self, rows=10, cols=10):
+        self.rows = rows
+        self.cols = cols
+        self.games = 0
+        self.wins = {}
+        self.first_wins = 0
+        self.shots = Metric()
+        self.shots_histogram = Histogram()
+        self.sink = {}
+        self.cell_hits = [0] * (rows * cols)
+        self.run = None  # what simulate() was asked to play, to resume it
+
+    def add(self, outcome):
+        """Takes in one outcome of bench.duel().
+        """
+        winner = outcome['sides'][outcome['winner']]
+        self.games += 1
+        name = winner['targeting']
+        self.wins[name] = self.wins.get(name, 0) + 1
+        if outcome['winner'] == outcome['first']:
+            self.first_wins += 1
+        self.shots.add(winner['shots'])
+        self.shots_histogram.add(winner['shots'])
+
+        for side in outcome['sides']:
+            for sign, shot in side['sunk_at'].items():
+                if sign not in self.sink:
+                    self.sink[sign] = Metric()
+                self.sink[sign].add(shot)
+            for col, row in side['hits']:
+                self.cell_hits[col + row * self.cols] += 1
+
+    def merge(self, other):
+        """Adds the games summarised by other, eg. from another worker.
+        """
+        if (other.rows, other.cols) != (self.rows, self.cols):
+            raise ValueError('cannot merge stats of different board sizes')
+        self.games += other.games
+        for name, wins in other.wins.items():
+            self.wins[name] = self.wins.get(name, 0) + wins
+        self.first_wins += other.first_wins
+        self.shots.merge(other.shots)
+        self.shots_histogram.merge(other.shots_histogram)
+        for sign, metric in other.sink.items():
+            self.sink.setdefault(sign, Metric()).merge(metric)
+        self.cell_hits = [mine + theirs for mine, theirs in
+                          zip(self.cell_hits, other.cell_hits)]
+        return self
+
+    def summary(self):
+        return {
+            'games': self.games,
+            'wins': dict(self.wins),
+            'first_wins': self.first_wins,
+            'shots': self.shots.summary(),
+            'sink': {sign: metric.summary() for sign, metric in
+                     sorted(self.sink.items())},
+        }
+
+    def to_dict(self):
+        return {'rows': self.rows, 'cols': self.cols, 'games': self.games,
+                'wins': self.wins, 'first_wins': self.first_wins,
+                'shots': self.shots.to_dict(),
+                'shots_histogram': self.shots_histogram.to_dict(),
+                'sink': {sign: metric.to_dict() for sign, metric in
+                         self.sink.items()},
+                'cell_hits': self.cell_hits, 'run': self.run}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data['rows'], data['cols'])
+        stats.games = data['games']
+        stats.wins = data['wins']
+        stats.first_wins = data['first_wins']
+        stats.shots = Metric.from_dict(data['shots'])
+        stats.shots_histogram = Histogram.from_dict(data['shots_histogram'])
+        stats.sink = {sign: Metric.from_dict(metric) for sign, metric in
+                      data['sink'].items()}
+        stats.cell_hits = data['cell_hits']
+        stats.run = data.get('run')
+        return stats
+
+    def save(self, path):
+        """Checkpoints to path, replacing it only once fully written.
+        """
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def _seeds(seed):
+    rng = random.Random(seed)
+    while True:
+        yield rng.random()
+
+
+def _play_chunk(job):
+    """Worker: plays a chunk of seeded duels and returns their summary.
+    """
+    from battleship.bench import duel
+
+    targeting, placement, rows, cols, seeds = job
+    stats = GameStats(rows, cols)
+    for seed in seeds:
+        stats.add(duel(targeting, placement, rows, cols, seed))
+    return stats.to_dict()
+
+
+def simulate(games, targeting=('density', 'density'),
+             placement=('random', 'random'), rows=10, cols=10, workers=None,
+             chunk=200, seed=None, checkpoint=None, stats=None):
+    """Plays games duels spread over worker processes, merging each chunk's
+    summary in order and saving a checkpoint after each if a path is given.
+    Pass the stats of a checkpoint to carry on from it: only the games it is
+    short of are played, the same ones as if it had never stopped. Raises
+    ValueError if it was a run of other games, targeting, placement or seed;
+    with no seed given, the checkpoint's is used.
+    """
+    stats = stats or GameStats(rows, cols)
+    if seed is None:
+        seed = (stats.run or {}).get('seed', random.randrange(2 ** 32))
+    run = {'games': games, 'targeting': list(targeting),
+           'placement': list(placement), 'seed': seed}
+    if stats.run is not None and stats.run != run:
+        raise ValueError(f'the checkpoint is of another run, {stats.run}')
+    stats.run = run
+
+    # the seeds of the games not played yet, chunk by chunk, made as needed
+    seeds = islice(_seeds(seed), stats.games, games)
+    jobs = ((targeting, placement, rows, cols, part) for part in
+            iter(lambda: list(islice(seeds, chunk)), []))
+
+    if workers == 1:
+        results = map(_play_chunk, jobs)
+        pool = None
+    else:
+        pool = Pool(workers)
+        # in order, so that the games checkpointed are always the first ones;
+        # imap takes jobs only as fast as the workers' pipe drains
+        results = pool.imap(_play_chunk, jobs)
+
+    try:
+        for result in results:
+            stats.merge(GameStats.from_dict(result))
+            if checkpoint:
+                stats.save(checkpoint)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='bship stats',
+        description='Play many Computer v Computer games and summarise them.')
+    parser.add_argument('--games', type=int, default=1000,
+                        help='games in all, counting those checkpointed')
+    parser.add_argument('--targeting', nargs=2, default=['density', 'density'])
+    parser.add_argument('--placement', nargs=2, default=['random', 'random'])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--checkpoint', help='JSON file to save to and '
+                                             'resume from')
+    args = parser.parse_args(argv)
+
+    stats = None
+    if args.checkpoint and os.path.exists(args.checkpoint):
+        stats = GameStats.load(args.checkpoint)
+
+    try:
+        stats = simulate(args.games, tuple(args.targeting),
+                         tuple(args.placement), workers=args.workers,
+                         seed=args.seed, checkpoint=args.checkpoint,
+                         stats=stats)
+    except ValueError as error:
+        parser.error(str(error))
+    print(json.dumps(stats.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+import random
+from abc import ABCMeta, abstractmethod
+from importlib import import_module
+from battleship.config import POINT
+from battleship.geometry import geometry, popcount
+
+# entry point groups third party packages can use to plug in strategies, eg.
+# in their setup.py:
+#   entry_points={"bship.targeting": ["hunter=mypkg.ai:Hunter"]}
+GROUPS = {
+    'targeting': 'bship.targeting',
+    'placement': 'bship.placement',
+}
+
+REGISTRY = {
+    'targeting': {},
+    'placement': {},
+}
+
+# strategies shipped in their own modules, imported on first use
+BUILTIN = {
+    'targeting': {
+        'entropy': 'battleship.entropy',
+        'learning': 'battleship.learning',
+        'montecarlo': 'battleship.montecarlo',
+        'perfect': 'battleship.perfect',
+    },
+    'placement': {
+        'adversarial': 'battleship.adversarial',
+        'fixed': 'battleship.adversarial',
+    },
+}
+
+_discovered = set()
+
+
+class BoardView(object):
+    """A read-only view of an enemy Board as seen by the player shooting at
+    it: ships that have not been hit show as open water.
+    """
+    __slots__ = ('_brd', '_exclude')
+
+    def __init__(self, brd, exclude=()):
+        """exclude are coords to leave out of unknown(), eg. the shots already
+        picked for a salvo.
+        """
+        self._brd = brd
+        self._exclude = frozenset(exclude)
+
+    def excluding(self, coords):
+        """Returns a view of the same board with coords also left out of
+        unknown().
+        """
+        return BoardView(self._brd, self._exclude.union(coords))
+
+    @property
+    def rows(self):
+        return self._brd.rows
+
+    @property
+    def cols(self):
+        return self._brd.cols
+
+    @property
+    def adjacency(self):
+        """How close the enemy ships may be, one of config.ADJACENCY.
+        """
+        return self._brd.adjacency
+
+    @property
+    def version(self):
+        """Changes whenever anything on the board does.
+        """
+        return self._brd.version
+
+    def __getitem__(self, coord):
+        """Returns the point at coord with unhit ships hidden: open, miss, hit
+        or the lower case sign of a sunk ship.
+        """
+        point = self._brd.board[coord]
+        if point in self._brd.fleet:
+            return POINT['open']
+        return point
+
+    def __iter__(self):
+        return iter(self._brd.board)
+
+    def __len__(self):
+        return len(self._brd.board)
+
+    def unknown(self):
+        """Returns the list of coords that have not been shot at yet.
+        """
+        board = self._brd.board
+        fleet = self._brd.fleet
+        return [coord for coord in board if coord not in self._exclude and
+                (board[coord] == POINT['open'] or board[coord] in fleet)]
+
+    def misses(self):
+        """Returns the list of coords that were shot and missed, or are
+        known to be clear by the adjacency rule.
+        """
+        return [coord for coord in self._brd.board if
+                self._brd.board[coord] in (POINT['miss'], POINT['clear'])]
+
+    def hits(self):
+        """Returns the list of coords hit on ships that are still afloat.
+        """
+        return [coord for coord in self._brd.board if
+                self._brd.board[coord] == POINT['hit']]
+
+    def sunk(self):
+        """Returns a dict of the sign of each sunk ship to its coords.
+        """
+        return {ship.sign: list(ship.pos) for ship in self._brd.fleet.values()
+                if ship.pos and ship.hits == ship.size}
+
+    def ships(self):
+        """Returns a dict of sign to size for the whole enemy fleet, which is
+        known to both players.
+        """
+        return {ship.sign: ship.size for ship in self._brd.fleet.values()}
+
+    def remaining(self):
+        """Returns a dict of sign to size for the enemy ships not yet sunk.
+        """
+        return {ship.sign: ship.size for ship in self._brd.afloat()}
+
+
+class TargetingStrategy(metaclass=ABCMeta):
+    """Decides where to shoot next from a BoardView of the enemy board. One
+    instance plays one game.
+    """
+
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+
+    @abstractmethod
+    def pick(self, view):
+        """Returns the (col, row) coord to shoot at next.
+        """
+        pass
+
+    def pick_many(self, view, shots):
+        """Returns a list of shots distinct coords for a salvo. By default
+        pick() is asked again with the coords already chosen left out.
+        """
+        chosen = []
+        for shot in range(min(shots, len(view.unknown()))):
+            chosen.append(self.pick(view.excluding(chosen)))
+        return chosen
+
+    def observe(self, coord, result):
+        """Called with the result ('miss', 'hit', 'sunk', ...) of each shot;
+        override for strategies that keep incremental state.
+        """
+        pass
+
+
+class PlacementStrategy(metaclass=ABCMeta):
+    """Decides where to hide a fleet of ships, no closer to each other
+    than the adjacency rule allows, see config.ADJACENCY.
+    """
+    adjacency = 'touch'
+
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+
+    @abstractmethod
+    def place(self, rows, cols, ships):
+        """Takes the board size and a list of Ships, returns a dict of each
+        ship's sign to its list of coords.
+        """
+        pass
+
+
+def register(kind, name):
+    """Class decorator adding a strategy to the registry under name, kind is
+    either 'targeting' or 'placement'.
+    """
+    def decorator(cls):
+        REGISTRY[kind][name] = cls
+        cls.name = name
+        return cls
+    return decorator
+
+
+def _discover(kind):
+    """Loads the strategies other packages advertise through entry points,
+    once per kind.
+    """
+    if kind in _discovered:
+        return
+    _discovered.add(kind)
+
+    try:  # slow to import, so only done once a strategy is missing
+        from importlib.metadata import entry_points
+    except ImportError:  # python < 3.8 has no importlib.metadata
+        return
+
+    eps = entry_points()
+    if hasattr(eps, 'select'):
+        group = eps.select(group=GROUPS[kind])
+    else:
+        group = eps.get(GROUPS[kind], [])
+
+    for ep in group:
+        if ep.name not in REGISTRY[kind]:
+            register(kind, ep.name)(ep.load())
+
+
+def available(kind):
+    """Returns the sorted names of the registered strategies of a kind.
+    """
+    _discover(kind)
+    return sorted(set(REGISTRY[kind]) | set(BUILTIN[kind]))
+
+
+def lookup(kind, name):
+    """Returns the strategy class registered under name.
+    """
+    if name not in REGISTRY[kind] and name in BUILTIN[kind]:
+        import_module(BUILTIN[kind][name])  # registers itself on import
+    if name not in REGISTRY[kind]:
+        _discover(kind)
+    try:
+        return REGISTRY[kind][name]
+    except KeyError:
+        raise ValueError(f'unknown {kind} strategy {name!r}, choose from: '
+                         f'{", ".join(available(kind))}')
+
+
+def make_targeting(name, **kwargs):
+    """Returns a new targeting strategy instance, name can also be an
+    instance which is returned as is.
+    """
+    if isinstance(name, TargetingStrategy):
+        return name
+    return lookup('targeting', name)(**kwargs)
+
+
+def make_placement(name, **kwargs):
+    """Returns a new placement strategy instance, name can also be an instance
+    which is returned as is.
+    """
+    if isinstance(name, PlacementStrategy):
+        return name
+    return lookup('placement', name)(**kwargs)
+
+
+def obeys(layout, rows, cols, adjacency):
+    """Checks that no two ships of a layout, a dict of sign to coords,
+    overlap or are closer than the adjacency rule allows.
+    """
+    geo = geometry(rows, cols)
+    near = 0
+    for pos in layout.values():
+        mask = geo.mask(pos)
+        if mask & near:
+            return False
+        near |= mask | geo.halo(mask, adjacency)
+    return True
+
+
+@register('targeting', 'random')
+class RandomTargeting(TargetingStrategy):
+    """Shoots at a random coord that has not been shot yet.
+    """
+
+    def pick(self, view):
+        return self.rng.choice(view.unknown())
+
+    def pick_many(self, view, shots):
+        unknown = view.unknown()
+        return self.rng.sample(unknown, min(shots, len(unknown)))
+
+
+@register('targeting', 'density')
+class DensityTargeting(TargetingStrategy):
+    """Counts, for every unknown coord, how many positions of the ships still
+    afloat could cover it without crossing a miss or a sunk ship, and shoots
+    the most likely coord. Positions through unsunk hits count hit_weight
+    times more per hit they cover, so hits are followed up.
+    """
+    hit_weight = 50
+
+    def pick(self, view):
+        scores = self.scores(view)
+        best = max(scores)
+        geo = geometry(view.rows, view.cols)
+        return geo.coord(self.rng.choice(
+            [index for index, score in enumerate(scores) if score == best]))
+
+    def pick_many(self, view, shots):
+        """A salvo takes the best scored coords of a single scoring pass.
+        """
+        scores = self.scores(view)
+        geo = geometry(view.rows, view.cols)
+        ranked = sorted((index for index, score in enumerate(scores) if score),
+                        key=lambda index: (-scores[index], self.rng.random()))
+        return [geo.coord(index) for index in ranked[:shots]]
+
+    def scores(self, view):
+        """Returns the list of weights per cell index, zero for cells already
+        shot.
+        """
+        geo = geometry(view.rows, view.cols)
+        unknown = geo.mask(view.unknown())
+        hits = geo.mask(view.hits())
+        blocked = geo.full & ~(unknown | hits)
+        scores = [0] * geo.cells
+
+        for size in view.remaining().values():
+            # a hit next to a position is another ship touching it
+            halos = geo.halos(size, view.adjacency)
+            for (mask, idx), halo in zip(geo.placements(size), halos):
+                if mask & blocked or not mask & unknown or halo & hits:
+                    continue
+                weight = self.hit_weight ** popcount(mask & hits)
+                for index in idx:
+                    scores[index] += weight
+
+        for index in range(geo.cells):
+            if not unknown >> index & 1:
+                scores[index] = 0
+
+        if not any(scores):  # nothing fits, any unknown coord will do
+            scores = [unknown >> index & 1 for index in range(geo.cells)]
+
+        return scores
+
+
+@register('placement', 'random')
+class RandomPlacement(PlacementStrategy):
+    """Hides each ship in a random position that does not overlap the ships
+    already hidden, nor their halo under the adjacency rule.
+    """
+
+    def place(self, rows, cols, ships):
+        ships = list(ships)
+        geo = geometry(rows, cols)
+
+        for attempt in range(100):
+            self.rng.shuffle(ships)
+            near = 0  # the ships hidden so far and their halos
+            layout = {}
+
+            for ship in ships:
+                positions = geo.placements(ship.size)
+                halos = geo.halos(ship.size, self.adjacency)
+                free = [n for n in range(len(positions)) if
+                        not positions[n][0] & near]
+                if not free:  # painted into a corner, start again
+                    break
+                n = self.rng.choice(free)
+                near |= positions[n][0] | halos[n]
+                layout[ship.sign] = [geo.coord(index) for index in
+                                     positions[n][1]]
+            else:
+                return layout
+
+        raise ValueError(f'cannot fit the fleet on a {rows}x{cols} board')
@@ -0,0 +1,313 @@
+"""A compact wire protocol keeping a remote copy of Boards in sync.
+
+Instead of the text of both boards each turn, as ui.show_game() prints them,
+an Encoder sends one snapshot of each board and then, as the Boards tell
+their watchers, only the cells that changed and the ships sunk. Every frame
+has a sequence number one up from the last; a Mirror on the other end
+applies them in order, and on a gap stops applying until it is resynced by
+the Encoder's since(), the frames it missed while they are still kept or a
+new snapshot otherwise. A shot is an 11 byte frame whatever the size of the
+board.
+
+    encoder = Encoder([engine.home.brd, engine.opponent.brd], hide=(1,))
+    encoder.listen(send)  # every new frame
+    send(encoder.snapshot())  # to a client joining
+    ...
+    mirror = Mirror()
+    if not mirror.feed(received):
+        ...  # tell the server mirror.seq, it sends encoder.since(mirror.seq)
+
+Frames are a HEADER, its count saying how long the rest is:
+
+    snapshot  S seq board cells, then cols and a point per cell, row by row
+    delta     D seq board n, then n (cell index, point)
+    sink      K seq board n, then the ship sign and its n cell indexes
+
+Boards whose ships are hidden, the enemy's, show them as open cells until
+they are hit; a hidden ship being placed sends nothing.
+
+    python -m battleship.wire  # bytes a game takes, against the board text
+"""
+import argparse
+import random
+import struct
+import threading
+from collections import deque
+from battleship.board import Board
+from battleship.config import POINT
+from battleship.strategies import BoardView, make_placement, make_targeting
+
+HEADER = struct.Struct('<cIBH')  # kind, seq, board, count
+CELL = struct.Struct('<Hc')  # cell index, point
+INDEX = struct.Struct('<H')
+SNAPSHOT, DELTA, SINK = b'S', b'D', b'K'
+
+
+class Encoder(object):
+
+    def __init__(self, boards, hide=(), keep=256):
+        """Watches the list of boards, numbered by their place in it; hide
+        are the numbers of those whose ships are not shown. The last keep
+        frames are kept for resyncing a Mirror that missed some.
+        """
+        self.boards = list(boards)
+        self.hide = set(hide)
+        self.seq = 0
+        self.frames = deque(maxlen=keep)  # (seq, frame)
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.shown = [self._points(number) for number in
+                      range(len(self.boards))]
+        self.restored = [brd.restored for brd in self.boards]
+        self.sunk = [{sign for sign, ship in brd.fleet.items() if ship.pos and
+                      ship.hits == ship.size} for brd in self.boards]
+        for number, brd in enumerate(self.boards):
+            brd.watch(lambda brd, coords, number=number:
+                      self._changed(number, coords))
+
+    def listen(self, listener):
+        """Calls listener(frame) with the bytes of each new frame.
+        """
+        self.listeners.append(listener)
+
+    def snapshot(self):
+        """Returns a snapshot frame of every board, at the current seq.
+        """
+        with self.lock:
+            return b''.join(self._snapshot(number) for number in
+                            range(len(self.boards)))
+
+    def since(self, seq):
+        """Returns what a Mirror at seq needs to catch up: the frames after
+        it if they are all still kept, a snapshot otherwise.
+        """
+        with self.lock:
+            if seq == self.seq:
+                return b''
+            if self.frames and self.frames[0][0] <= seq + 1 and \
+                    seq < self.seq:
+                return b''.join(frame for number, frame in self.frames if
+                                number > seq)
+            return b''.join(self._snapshot(number) for number in
+                            range(len(self.boards)))
+
+    def _changed(self, number, coords):
+        brd = self.boards[number]
+        with self.lock:
+            if brd.restored != self.restored[number]:
+                # its points were replaced behind the watchers' back
+                self.seq += 1
+                self.shown[number] = self._points(number)
+                frames = [self._snapshot(number)]
+            else:
+                frames = self._deltas(number, coords)
+            self.restored[number] = brd.restored
+            for frame in frames:
+                self.frames.append((HEADER.unpack_from(frame)[1], frame))
+        for frame in frames:
+            for listener in self.listeners:
+                listener(frame)
+
+    def _deltas(self, number, coords):
+        """Returns the delta frame, and a sink frame per ship just sunk, of
+        the change at coords. The lock must be held.
+        """
+        brd = self.boards[number]
+        shown = self.shown[number]
+        cells = []
+        sunk = []
+        for coord in dict.fromkeys(coords):
+            index = coord[0] + coord[1] * brd.cols
+            point = self._point(number, brd.board[coord])
+            if point == shown[index]:
+                continue
+            shown[index] = point
+            cells.append(CELL.pack(index, point.encode()))
+            sign = point.upper()
+            if point.islower() and sign in brd.fleet and \
+                    sign not in self.sunk[number]:
+                self.sunk[number].add(sign)
+                sunk.append(brd.fleet[sign])
+
+        frames = []
+        if cells:
+            self.seq += 1
+            frames.append(HEADER.pack(DELTA, self.seq, number, len(cells)) +
+                          b''.join(cells))
+        for ship in sunk:
+            self.seq += 1
+            frames.append(HEADER.pack(SINK, self.seq, number, len(ship.pos)) +
+                          ship.sign.encode() +
+                          b''.join(INDEX.pack(col + row * brd.cols) for
+                                   col, row in ship.pos))
+        return frames
+
+    def _snapshot(self, number):
+        brd = self.boards[number]
+        return HEADER.pack(SNAPSHOT, self.seq, number, brd.rows * brd.cols) + \
+            bytes([brd.cols]) + ''.join(self.shown[number]).encode()
+
+    def _points(self, number):
+        brd = self.boards[number]
+        return [self._point(number, brd.board[(col, row)]) for row in
+                range(brd.rows) for col in range(brd.cols)]
+
+    def _point(self, number, point):
+        if number in self.hide and point in self.boards[number].fleet:
+            return POINT['open']
+        return point
+
+
+class Mirror(object):
+    """The remote copy of an Encoder's boards. boards maps a board's number
+    to a Board holding its points, and no fleet; watch it to redraw just
+    the cells that change. sunk maps it to the ships sunk, sign to coords.
+    """
+
+    def __init__(self):
+        self.seq = None  # of the last frame applied, None before a snapshot
+        self.synced = False
+        self.boards = {}
+        self.sunk = {}
+        self.buffer = b''
+
+    def feed(self, data):
+        """Applies the frames in data, a frame cut short being kept for the
+        next call. Returns False once a frame is missing: frames are then
+        ignored until the one after self.seq, as the Encoder's
+        since(self.seq) sends, or a snapshot brings the Mirror back in sync.
+        """
+        self.buffer += data
+        at = 0
+        while at + HEADER.size <= len(self.buffer):
+            kind, seq, number, count = HEADER.unpack_from(self.buffer, at)
+            length = HEADER.size + _length(kind, count)
+            if at + length > len(self.buffer):
+                break
+            self._apply(kind, seq, number, count,
+                        self.buffer[at + HEADER.size:at + length])
+            at += length
+        self.buffer = self.buffer[at:]
+        return self.synced
+
+    def _apply(self, kind, seq, number, count, payload):
+        if kind == SNAPSHOT:
+            cols = payload[0]
+            brd = self.boards.get(number)
+            if brd is None or (brd.rows, brd.cols) != (count // cols, cols):
+                brd = self.boards[number] = Board(count // cols, cols, ())
+            sunk = self.sunk[number] = {}
+            for index, point in enumerate(payload[1:].decode()):
+                coord = (index % cols, index // cols)
+                brd.board[coord] = point
+                if point.islower():
+                    sunk.setdefault(point.upper(), []).append(coord)
+            self.seq = seq
+            self.synced = True
+            brd._changed(list(brd.board))
+            return
+        if self.seq is None or seq <= self.seq:
+            return  # no snapshot yet, or already applied
+        if seq != self.seq + 1:
+            self.synced = False
+            return
+
+        self.seq = seq
+        self.synced = True
+        brd = self.boards[number]
+        if kind == DELTA:
+            changed = []
+            for at in range(0, len(payload), CELL.size):
+                index, point = CELL.unpack_from(payload, at)
+                coord = (index % brd.cols, index // brd.cols)
+                brd.board[coord] = point.decode()
+                changed.append(coord)
+            brd._changed(changed)
+        elif kind == SINK:
+            self.sunk[number][payload[:1].decode()] = [
+                (index % brd.cols, index // brd.cols) for index, in
+                INDEX.iter_unpack(payload[1:])]
+
+
+def _length(kind, count):
+    """Bytes of a frame after its header.
+    """
+    if kind == SNAPSHOT:
+        return 1 + count
+    if kind == DELTA:
+        return CELL.size * count
+    if kind == SINK:
+        return 1 + INDEX.size * count
+    raise ValueError(f'unknown frame {kind!r}')
+
+
+def measure(targeting='density', placement='random', rng=None, salvo=False):
+    """Plays a game of targeting against a fleet hidden by placement, kept
+    in sync through an Encoder and a Mirror, a shot a turn or with salvo a
+    volley of one per ship afloat. Returns the turns, the bytes sent and the
+    bytes the text of both boards would have taken each turn.
+    """
+    rng = rng or random.Random()
+    brd = Board()
+    layout = make_placement(placement, rng=rng).place(
+        brd.rows, brd.cols, list(brd.fleet.values()))
+    for sign in layout:
+        brd.place_ship(brd.fleet[sign], layout[sign])
+    home = Board()
+
+    encoder = Encoder([home, brd], hide=(1,))
+    mirror = Mirror()
+    sent = [0]
+
+    def send(frame):
+        sent[0] += len(frame)
+        mirror.feed(frame)
+
+    encoder.listen(send)
+    send(encoder.snapshot())
+
+    shooter = make_targeting(targeting, rng=rng)
+    view = BoardView(brd)
+    turns = 0
+    while brd.afloat():
+        if salvo:
+            coords = shooter.pick_many(view, len(brd.afloat()))
+            for coord, result, ship in brd.volley(coords):
+                shooter.observe(coord, result)
+        else:
+            coord = shooter.pick(view)
+            shooter.observe(coord, brd.shoot(coord)[0])
+        turns += 1
+    if mirror.boards[1].board != {coord: encoder._point(1, point) for
+                                  coord, point in brd.board.items()}:
+        raise RuntimeError('the mirror is out of sync')
+
+    text = len(str(home).encode()) + len(brd.__str__(hide=True).encode())
+    return turns, sent[0], text * turns
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m battleship.wire',
+        description='Bytes it takes to keep a remote copy of the boards in '
+                    'sync, against sending their text every shot.')
+    parser.add_argument('--targeting', default='density')
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--salvo', action='store_true',
+                        help='a volley of one shot per ship afloat a turn')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    turns = sent = text = 0
+    for game in range(args.games):
+        played, frames, boards = measure(args.targeting, rng=rng,
+                                         salvo=args.salvo)
+        turns, sent, text = turns + played, sent + frames, text + boards
+    print(f'{args.games} games, {turns} turns: '
+          f'{sent / turns:.1f} bytes a turn in frames, '
+          f'{text / turns:.0f} as board text')
+
+
+if __name__ == "__main__":
+    main()
@@ -20,15 +20,15 @@ setup(
     classifiers=[
         "License :: OSI Approved :: MIT License",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
+        "Programming Language :: Python :: 3.7",
         ],
     packages=['battleship'],
     include_package_data=True,
     install_requires=[],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
     entry_points={
         "console_scripts": [
-            "bship=battleship.__main__:run",
+            "bship=battleship.__main__:main",
             ]
         },
 )
@@ -0,0 +1,42 @@
+import random
+import battleship.adversarial as adversarial
+from battleship.adversarial import *
+from battleship.board import Board
+from battleship.strategies import make_placement
+
+ships = list(Board(6, 6).fleet.values())
+
+
+def test_lookup():
+
+    assert isinstance(make_placement('adversarial'), AdversarialPlacement)
+
+
+def test_mutate():
+
+    layout = make_placement('random', rng=random.Random(2)).place(6, 6, ships)
+    sizes = {ship.sign: ship.size for ship in ships}
+
+    moved = mutate(layout, 6, 6, sizes, random.Random(1))
+    coords = [coord for pos in moved.values() for coord in pos]
+
+    assert len(coords) == len(set(coords)) == 17
+
+
+def test_tune_and_cache(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(adversarial, 'CACHE_DIR', str(tmp_path))
+    hider = AdversarialPlacement(rng=random.Random(1))
+
+    # nothing tuned yet: falls back to random placement
+    assert load_distribution('density', 6, 6, ships) is None
+    assert len(hider.place(6, 6, ships)) == 5
+
+    pool, scores = tune('density', 6, 6, ships, pool_size=3, iterations=2,
+                        games=2, processes=1, seed=4)
+    assert len(pool) == len(scores) == 3
+    save_distribution('density', 6, 6, ships, pool, scores)
+
+    layout = hider.place(6, 6, ships)
+    assert layout in [{sign: [tuple(c) for c in pos] for sign, pos in
+                       tuned.items()} for tuned in pool]
@@ -0,0 +1,88 @@
+import io
+import random
+from battleship.batch import *
+
+every = [col + str(row) for row in range(10) for col in 'ABCDEFGHIJ']
+
+
+def test_place():
+
+    batch = Batch('random', 'random', random.Random(1))
+
+    assert batch.handle('K A0 A4') == [
+        {'placed': 'K', 'pos': ['A0', 'A1', 'A2', 'A3', 'A4']}]
+    assert 'error' in batch.handle('T A0 D0')[0]  # overlaps K
+    assert 'error' in batch.handle('T A0 A9')[0]  # wrong length
+    assert 'error' in batch.handle('B3')[0]  # fleet not hidden yet
+    assert batch.handle('auto')[-1] == {'ready': True}
+
+
+def test_bad_move_keeps_ship():
+
+    batch = Batch('random', 'random', random.Random(1))
+    batch.handle('K A0 A4')
+    batch.handle('S C0 C2')
+
+    assert 'error' in batch.handle('K B0 B2')[0]  # wrong length
+    assert 'error' in batch.handle('K C0 C4')[0]  # overlaps S
+    assert 'error' in batch.handle('K Z0 Z4')[0]
+    assert batch.home.fleet['K'].pos == [(0, 0), (0, 1), (0, 2), (0, 3),
+                                         (0, 4)]
+    assert batch.home.board[(0, 2)] == 'K'
+    assert batch.handle('K B0 B4') == [
+        {'placed': 'K', 'pos': ['B0', 'B1', 'B2', 'B3', 'B4']}]
+    assert batch.home.board[(0, 2)] == '.'
+
+
+def test_shoot():
+
+    batch = Batch('random', 'random', random.Random(1))
+    batch.handle('{"auto": true}', json_lines=True)
+
+    answers = batch.handle('{"shoot": "B3"}', json_lines=True)
+    assert answers[0]['shot'] == 'B3'
+    assert answers[1]['reply'] in every
+    assert 'error' in batch.handle('Z9')[0]
+
+
+def test_run_whole_game():
+
+    out = io.StringIO()
+    run(['auto'] + every + ['new', 'auto', 'A0'], out, targeting='random',
+        placement='random', rng=random.Random(3))
+    lines = out.getvalue().split('\n')
+
+    assert lines[5] == 'ready'
+    assert any(line.startswith('over ') for line in lines)
+    assert 'new 2' in lines
+    assert lines[-3].startswith('shot A0')
+
+
+def test_format_answer():
+
+    assert format_answer({'shot': 'B3', 'result': 'hit', 'ship': 'S'}) == \
+        'shot B3 hit S'
+    assert format_answer({'reply': 'B3', 'result': 'miss'}) == 'reply B3 miss'
+    assert format_answer({'over': 'won', 'shots': 40}) == 'over won 40'
+    assert format_answer({'ready': True}, True) == '{"ready":true}'
+
+
+def test_salvo():
+
+    batch = Batch('density', 'random', random.Random(1), rules='salvo')
+    batch.handle('auto')
+
+    assert 'error' in batch.handle('B3')[0]
+    answers = batch.handle('salvo A0 A1 A2 A3 A4')
+    assert [answer.get('shot') for answer in answers[:5]] == \
+        ['A0', 'A1', 'A2', 'A3', 'A4']
+    assert len([answer for answer in answers if 'reply' in answer]) == 5
+
+
+def test_every_game_has_its_own_key():
+
+    batch = Batch()
+    first = batch.key
+    batch.new_game()
+    assert batch.key != first
+    assert Batch().key not in (first, batch.key)
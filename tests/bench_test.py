@@ -0,0 +1,40 @@
+from battleship.bench import *
+
+
+def test_play_solo():
+
+    shots, latencies = play_solo('random', rng=random.Random(3))
+
+    assert 17 <= shots <= 100
+    assert len(latencies) == shots
+
+
+def test_benchmark():
+
+    result = benchmark('random', games=5, seed=1)
+
+    assert result['games'] == 5
+    assert result['shots'] == benchmark('random', games=5, seed=1)['shots']
+    assert result['shots']['min'] >= 17
+    assert result['latency_ms']['p50'] <= result['latency_ms']['max']
+    print(report(result))
+
+
+def test_importtime():
+
+    modules = importtime(['--help'])
+
+    assert 'battleship' in modules
+    assert 'battleship.engine' not in modules
+    assert 'battleship.players' not in modules
+
+
+def test_duel():
+
+    outcome = duel(('random', 'density'), seed=4)
+    winner = outcome['sides'][outcome['winner']]
+
+    assert outcome == duel(('random', 'density'), seed=4)
+    assert sorted(winner['sunk_at']) == sorted(winner['layout'])
+    assert max(winner['sunk_at'].values()) == winner['shots']
+    assert len(winner['hits']) == 17
@@ -52,3 +52,41 @@ def test_board__str__():
     #print('ABCDEFGHIJKLMNOPQRST'[:check.rows])
     print('\n')
     print(check)
+
+def test_volley():
+
+    brd = Board()
+    brd.place_ship(brd.fleet['P'], [(0, 0), (1, 0)])
+    told = []
+    brd.watch(lambda board, coords: told.append(list(coords)))
+
+    results = brd.volley([(0, 0), (5, 5), (1, 0), (5, 5)])
+
+    assert [result for coord, result, ship in results] == \
+        ['hit', 'miss', 'sunk', 'already_shot']
+    assert len(told) == 1
+    assert brd.board[(0, 0)] == 'p'
+    assert brd.fleet['P'] not in brd.afloat()
+
+def test_custom_fleet():
+
+    brd = Board(6, 8, (('Tanker', 'N', 4),))
+
+    assert list(brd.fleet) == ['N']
+    assert len(brd.board) == 48
+
+
+def test_sunk_clears_halo():
+
+    brd = Board(adjacency='no-diagonal-touch')
+    brd.place_ship(brd.fleet['P'], [(0, 0), (1, 0)])
+    brd.shoot((2, 1))
+    told = []
+    brd.watch(lambda board, coords: told.append(list(coords)))
+
+    brd.shoot((0, 0))
+    brd.shoot((1, 0))
+
+    assert sorted(told[-1]) == [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0)]
+    assert brd.board[(2, 1)] == 'x'  # a miss stays a miss
+    assert brd.shoot((0, 1)) == ('already_shot', None)
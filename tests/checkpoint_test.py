@@ -0,0 +1,113 @@
+import pytest
+import random
+from battleship.engine import Engine
+from battleship.players import Computer
+from battleship.strategies import TargetingStrategy
+from battleship.checkpoint import *
+
+
+class Sweep(TargetingStrategy):
+    """Stands in for the Human, deterministic without a generator.
+    """
+
+    def pick(self, view):
+        return sorted(view.unknown())[0]
+
+
+class Crash(Exception):
+    pass
+
+
+def engine(seed, adjacency='touch'):
+    game = Engine()
+    game.home = Computer(Sweep(), 'random')
+    game.opponent = Computer('density', 'random')
+    game.home.brd.adjacency = game.opponent.brd.adjacency = adjacency
+    game.opponent.targeting.rng.seed(seed)
+    game.home.placement.rng.seed(seed)
+    game.opponent.placement.rng.seed(seed + 1)
+    game.players = game.opponent, game.home
+    game.opponent.aim(game.home.brd)
+    game.home.aim(game.opponent.brd)
+    return game
+
+
+def boards(game):
+    return dict(game.home.brd.board), dict(game.opponent.brd.board)
+
+
+@pytest.mark.parametrize('seed, adjacency', [
+    (seed, 'touch') for seed in range(6)] + [
+    (0, 'no-touch'), (1, 'no-touch'), (2, 'no-diagonal-touch')])
+def test_restore(tmpdir, monkeypatch, seed, adjacency):
+
+    monkeypatch.setattr('builtins.input', lambda prompt='': '')
+    path = str(tmpdir.join('match.bsj'))
+
+    random.seed(seed)  # who goes first
+    whole = engine(2, adjacency)
+    whole.set()
+    Journal(path, whole, every=7)
+    whole.play()
+    final = boards(whole)
+
+    random.seed(seed)
+    crashed = engine(2, adjacency)
+    crashed.set()
+    Journal(path, crashed, every=7)
+
+    def crash(event):
+        if event['type'] == 'turn_over' and crashed.turn == 20:
+            raise Crash()
+    crashed.watch(crash)
+    try:
+        crashed.play()
+    except Crash:
+        pass
+    assert len(read(path)) < 2 * 7 + 1  # compacted along the way
+
+    restored = restore(path, engine(99))
+    for player in restored.players:
+        assert player.brd.adjacency == adjacency
+    assert boards(restored) == boards(crashed)
+    assert restored.turn == 20
+    assert restored.home.sunk == crashed.home.sunk
+    Journal(path, restored, every=7)
+    restored.play()
+    assert boards(restored) == final
+
+
+def test_torn_record(tmpdir, monkeypatch):
+
+    monkeypatch.setattr('builtins.input', lambda prompt='': '')
+    path = str(tmpdir.join('match.bsj'))
+    game = engine(3)
+    game.set()
+    journal = Journal(path, game)
+    game.current_player, game.next_player = game.opponent, game.home
+    journal.coords = [(4, 5)]
+    journal.record()
+    journal.close()
+    with open(path, 'ab') as f:
+        f.write(b'T\x30\x00\x01')  # a record cut short
+
+    assert [kind for kind, payload in read(path)] == [SNAPSHOT, TURN]
+    restored = restore(path, engine(4))
+    assert restored.home.brd.board[(4, 5)] != '.'
+    assert restored.current_player is restored.home
+
+
+def test_global_random_untouched(tmpdir, monkeypatch):
+
+    monkeypatch.setattr('builtins.input', lambda prompt='': '')
+    path = str(tmpdir.join('match.bsj'))
+    game = engine(5)
+    game.set()
+    Journal(path, game).close()
+
+    random.seed(7)
+    state = random.getstate()
+    restored = restore(path, engine(6))
+    assert random.getstate() == state
+    assert restored.opponent.targeting.rng.getstate() == \
+        game.opponent.targeting.rng.getstate()
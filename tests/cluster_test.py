@@ -0,0 +1,99 @@
+import json
+import socket
+import threading
+from battleship.cluster import *
+
+
+def test_play():
+
+    job = make_jobs(['random', 'density:random'], 1, seed=1)[0]
+
+    assert play(job) == play(job)
+    assert play(job)[0] == 0
+
+
+def test_workers():
+
+    jobs = make_jobs(['random', 'density'], 40, seed=2)
+    seen = []
+    coordinator = Coordinator(jobs, port=0, on_result=seen.append)
+    workers = start_workers(coordinator.address, 3, batch=5)
+    results = coordinator.serve()
+    for worker in workers:
+        worker.join(5)
+
+    assert [result[0] for result in results] == list(range(40))
+    assert len(seen) == 40
+    assert results[7] == play(jobs[7])
+    print(report(results))
+
+
+def test_dead_worker():
+
+    jobs = make_jobs(['random', 'density'], 10, seed=3)
+    coordinator = Coordinator(jobs, port=0)
+    serving = threading.Thread(target=coordinator.serve)
+    serving.start()
+
+    # takes half the jobs and dies without a word
+    with socket.create_connection(coordinator.address) as conn:
+        conn.sendall(b'{"results": [], "want": 5}\n')
+        reply = json.loads(conn.makefile('rb').readline())
+        assert len(reply['jobs']) == 5
+
+    assert work(coordinator.address, batch=3) == 10
+    serving.join(5)
+    assert sorted(coordinator.results) == list(range(10))
+
+
+def test_nonsense_worker(monkeypatch):
+
+    errors = []
+    monkeypatch.setattr(threading, 'excepthook', errors.append)
+    jobs = make_jobs(['random', 'density'], 10, seed=5)
+    coordinator = Coordinator(jobs, port=0)
+    serving = threading.Thread(target=coordinator.serve)
+    serving.start()
+
+    for nonsense in (b'[1]\n', b'5\n', b'{"results": [7]}\n'):
+        with socket.create_connection(coordinator.address) as conn:
+            stream = conn.makefile('rwb')
+            stream.write(b'{"results": [], "want": 3}\n')
+            stream.flush()
+            assert len(json.loads(stream.readline())['jobs']) == 3
+            stream.write(nonsense)
+            stream.flush()
+            assert stream.readline() == b''  # hung up on
+
+    assert work(coordinator.address, batch=3) == 10
+    serving.join(5)
+    assert sorted(coordinator.results) == list(range(10))
+    assert errors == []
+
+
+def test_heartbeat_and_reconnect(monkeypatch):
+
+    connections = []
+    connect = socket.create_connection
+
+    def counted(address):
+        connections.append(address)
+        return connect(address)
+
+    monkeypatch.setattr(socket, 'create_connection', counted)
+    for heartbeat in (0.05, None):
+        del connections[:]
+        # a batch takes longer than the coordinator waits for a line
+        jobs = make_jobs(['montecarlo'] * 2, 3, seed=4)
+        coordinator = Coordinator(jobs, port=0, timeout=0.3)
+        serving = threading.Thread(target=coordinator.serve)
+        serving.start()
+
+        assert work(coordinator.address, batch=3, retry=1,
+                    heartbeat=heartbeat) >= 3
+        serving.join(5)
+        assert sorted(coordinator.results) == [0, 1, 2]
+        if heartbeat:
+            assert len(connections) == 1
+        else:  # dropped for going quiet, and made again
+            assert len(connections) > 1
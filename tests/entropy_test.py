@@ -0,0 +1,72 @@
+import random
+from math import log
+from battleship.bench import play_solo
+from battleship.board import Board
+from battleship.entropy import *
+from battleship.strategies import BoardView, make_targeting
+
+
+def test_lookup():
+
+    assert isinstance(make_targeting('entropy'), EntropyTargeting)
+
+
+def test_scores_match_layouts():
+
+    brd = Board()
+    brd.place_ship(brd.fleet['P'], [(0, 0), (1, 0)])
+    brd.place_ship(brd.fleet['K'], [(5, 2), (5, 3), (5, 4), (5, 5), (5, 6)])
+    view = BoardView(brd)
+    shooter = EntropyTargeting(random.Random(1), budget=0.05, greed=0)
+    for coord in [(0, 0), (5, 3), (4, 3), (9, 9)]:
+        shooter.observe(coord, brd.shoot(coord)[0])
+    scores = shooter.scores(view)
+
+    layouts = len(shooter.pool)
+    assert layouts
+    for index, (entropy, hits) in scores.items():
+        counts = {'miss': 0, 'hit': 0, 'sunk': 0}
+        for layout in shooter.pool:
+            result = 'miss'
+            for mask in layout.values():
+                if mask >> index & 1:
+                    left = mask & ~shooter.hits
+                    result = 'sunk' if left == 1 << index else 'hit'
+            counts[result] += 1
+        assert hits == counts['hit'] + counts['sunk']
+        expected = -sum(count / layouts * log(count / layouts) for count in
+                        counts.values() if count)
+        assert abs(entropy - expected) < 1e-6
+    assert shooter.geo.index(shooter.pick(view)) in scores
+
+
+def test_budget():
+
+    brd = Board()
+    shooter = EntropyTargeting(random.Random(1), budget=0)
+    assert shooter.pick(BoardView(brd)) in brd.board  # density fallback
+
+
+def test_play_solo():
+
+    shots, moves = play_solo('entropy', rng=random.Random(3))
+    assert 17 <= shots <= 100
+    shots, moves = play_solo('entropy', rows=6, cols=7, rng=random.Random(2),
+                             ships=(('Tanker', 'N', 4), ('Dinghy', 'D', 1)),
+                             adjacency='no-touch')
+    assert 5 <= shots <= 42
+
+
+def test_skips_cells_that_tell_nothing():
+
+    brd = Board(1, 4, (('Patrol Boat', 'P', 2),))
+    brd.place_ship(brd.fleet['P'], [(1, 0), (2, 0)])
+    view = BoardView(brd)
+    shooter = EntropyTargeting(random.Random(1), budget=0.05)
+    shooter.observe((1, 0), brd.shoot((1, 0))[0])
+
+    scores = shooter.scores(view)
+    assert scores[3] == (0.0, 0)  # a miss whichever way the ship lies
+    assert shooter.pick(view) in [(0, 0), (2, 0)]
+    shooter.greed = 0
+    assert shooter.pick(view) in [(0, 0), (2, 0)]
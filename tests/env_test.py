@@ -0,0 +1,82 @@
+from battleship.env import *
+
+
+def test_reset():
+
+    env = BattleshipEnv(seed=1)
+    obs = env.reset()
+
+    assert len(obs) == 300
+    assert not any(obs)
+    assert env.shape == (3, 10, 10)
+    assert len(env.legal()) == 100
+
+
+def test_episode():
+
+    env = BattleshipEnv(seed=2)
+    env.reset()
+    results = []
+    done = False
+
+    for action in range(100):
+        obs, reward, done, info = env.step(action)
+        results.append(info['result'])
+        if done:
+            break
+
+    assert done and info['episode']['won']
+    assert results.count('sunk') == 5
+    assert results.count('hit') + results.count('sunk') == 17
+    assert sum(obs[200:]) == 17  # every ship cell is on the sunk plane
+    assert sum(obs[:100]) == 0
+    assert sum(obs[100:200]) == results.count('miss')
+
+    obs, reward, done, info = env.step((0, 0))
+    assert info['result'] == 'already_shot'
+    assert reward == REWARDS['already_shot']
+
+
+def test_vector_autoreset():
+
+    vector = VectorEnv(3, rows=5, cols=5, ships=(('Sloop', 'L', 2),), seed=3)
+    obs = vector.reset()
+    assert len(obs) == 3 * 3 * 25
+
+    finished = 0
+    for action in range(25):
+        obs, rewards, dones, infos = vector.step([action] * 3)
+        for env in range(3):
+            if dones[env]:
+                finished += 1
+                assert 'final_observation' in infos[env]
+                assert obs[env * 75:(env + 1) * 75] == bytes(75)
+
+    assert finished >= 3
+
+
+def test_actions_outside_the_board():
+
+    vector = VectorEnv(2, seed=1)
+    obs = bytes(vector.reset())
+    for actions in ([150, 0], [0, -1], [(10, 0), 0], [0, (0, -1)], [0],
+                    [0, 1, 2], ()):
+        try:
+            vector.step(actions)
+            assert False, f'{actions} are not all cells'
+        except ValueError:
+            pass
+    assert bytes(vector.obs) == obs  # neither environment was touched
+
+
+def test_placement_strategy():
+
+    vector = VectorEnv(2, placement='random', seed=4)
+    vector.reset()
+
+    assert sum(1 for cell in vector.ship_at if cell) == 34
+
+
+def test_throughput():
+
+    assert throughput(envs=4, seconds=0.1, seed=5) > 0
@@ -0,0 +1,72 @@
+import asyncio
+from battleship.board import Board
+from battleship.executor import *
+from battleship.executor import _strategies
+from battleship.strategies import BoardView
+
+
+def board():
+    brd = Board()
+    brd.place_ship(brd.fleet['P'], [(0, 0), (1, 0)])
+    brd.place_ship(brd.fleet['K'], [(5, 2), (5, 3), (5, 4), (5, 5), (5, 6)])
+    for coord in [(0, 0), (1, 0), (5, 3), (9, 9)]:
+        brd.shoot(coord)
+    return brd
+
+
+def test_describe():
+
+    view = BoardView(board())
+    copy = rebuild(*describe(view))
+
+    assert sorted(copy.unknown()) == sorted(view.unknown())
+    assert copy.hits() == view.hits() == [(5, 3)]
+    assert copy.misses() == view.misses()
+    assert copy.sunk() == view.sunk()
+    assert copy.remaining() == view.remaining()
+
+
+def test_moves():
+
+    view = BoardView(board())
+    executor = MoveExecutor(1, deadline=30)
+    try:
+        coord = executor.submit('density', view, key=1).result()
+        salvo = executor.submit('random', view, 3, key=2, seed=1).result()
+
+        async def many():
+            return await asyncio.gather(*[
+                executor.move('density', view, key=n) for n in range(5)])
+        coords = asyncio.run(many())
+    finally:
+        executor.close()
+
+    assert coord in view.unknown()
+    assert len(set(salvo)) == 3 and set(salvo) <= set(view.unknown())
+    assert all(coord in view.unknown() for coord in coords)
+    assert executor.moves == 7 and executor.missed == 0
+
+
+def test_deadline():
+
+    view = BoardView(board())
+    executor = MoveExecutor(1, deadline=0)
+    try:
+        coord = executor.submit('density', view).result(5)
+    finally:
+        executor.close()
+
+    assert coord in view.unknown()  # played by the fallback
+    assert executor.missed == 1
+
+
+def test_games_are_kept_apart():
+
+    description = describe(BoardView(board()))
+    play_moves([(('game', 1), 'montecarlo', 1, None, description)])
+    kept = _strategies[('game', 1)][1]
+    play_moves([(('game', 2), 'montecarlo', 2, None, description)])
+    assert _strategies[('game', 2)][1] is not kept
+
+    play_moves([], forget=[('game', 1), ('game', 2)])
+    assert ('game', 1) not in _strategies and ('game', 2) not in _strategies
@@ -0,0 +1,57 @@
+import pytest
+from battleship.ffa import *
+
+
+def test_play():
+
+    game = FreeForAll(5, seed=2)
+    events = []
+    game.watch(events.append)
+    winner = game.play()
+
+    assert game.standings()[0] == winner
+    assert sorted(game.standings()) == sorted(seat.name for seat in
+                                              game.seats)
+    assert [event['target'] for event in events if
+            event['type'] == 'out'] == game.out
+    assert events[-1] == {'type': 'game_over', 'player': winner,
+                          'winner': winner, 'turn': game.turn}
+    for seat in game.seats:
+        assert not seat.brd.afloat() or seat.name == winner
+
+
+def test_tally():
+
+    game = FreeForAll(3, placement='random', seed=1)
+    seat = game.seats[0]
+    seat.set_up()
+    tally = game.tallies[seat.name]
+    ship = seat.brd.fleet['P']
+
+    seat.brd.shoot(ship.pos[0])
+    assert tally.open_hits == {ship.pos[0]}
+    assert tally.left == 16
+    seat.brd.shoot(ship.pos[1])
+    assert tally.open_hits == set()
+    assert tally.left == 15
+
+
+def test_choose():
+
+    game = FreeForAll([('random', 'random'), ('density', 'random'),
+                       ('density', 'random')], seed=1)
+    for seat in game.seats:
+        seat.set_up()
+    first, second, third = game.seats
+    ship = third.brd.fleet['K']
+    third.brd.shoot(ship.pos[0])
+
+    assert first.choose([second, third], game.tallies) is third
+
+
+def test_players():
+
+    with pytest.raises(ValueError):
+        FreeForAll(2)
+    with pytest.raises(ValueError):
+        FreeForAll(17)
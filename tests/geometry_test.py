@@ -0,0 +1,60 @@
+from battleship.geometry import *
+
+geo = geometry(10, 10)
+
+
+def test_index():
+
+    assert geo.index((3, 2)) == 23
+    assert geo.coord(23) == (3, 2)
+    assert geometry(10, 10) is geo
+
+
+def test_mask():
+
+    mask = geo.mask([(0, 0), (9, 9), (3, 2)])
+
+    assert popcount(mask) == 3
+    assert geo.coords(mask) == [(0, 0), (3, 2), (9, 9)]
+    assert list(bits(0b1010)) == [1, 3]
+    assert geo.mask([]) == 0
+
+
+def test_placements():
+
+    assert len(geo.placements(5)) == 120
+    assert len(geometry(3, 4).placements(1)) == 12
+    assert (geometry(2, 2).mask([(0, 0), (0, 1)]), (0, 2)) in \
+        geometry(2, 2).placements(2)
+
+    for mask, idx in geometry(4, 6).placements(3):
+        assert popcount(mask) == 3
+        assert list(bits(mask)) == sorted(idx)
+
+
+def test_covering():
+
+    cover = geometry(4, 4).covering(2)
+
+    assert len(cover) == 16
+    assert len(cover[0]) == 2  # corner: one across, one down
+    assert len(cover[5]) == 4
+
+
+def test_halo():
+
+    small = geometry(4, 5)
+    mask = small.mask([(0, 0), (0, 1)])
+
+    assert small.halo(mask, 'touch') == 0
+    assert small.coords(small.halo(mask, 'no-touch')) == \
+        [(1, 0), (1, 1), (0, 2)]
+    assert small.coords(small.halo(mask, 'no-diagonal-touch')) == \
+        [(1, 0), (1, 1), (0, 2), (1, 2)]
+    assert small.coords(small.halo(small.mask([(4, 3)]),
+                                   'no-diagonal-touch')) == \
+        [(3, 2), (4, 2), (3, 3)]  # no wrapping round the edges
+
+    halos = small.halos(2, 'no-touch')
+    assert len(halos) == len(small.placements(2))
+    assert small.halos(2, 'no-touch') is halos
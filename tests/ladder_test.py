@@ -0,0 +1,42 @@
+import random
+from battleship.ladder import *
+
+
+def test_record():
+
+    ladder = Ladder(['a', 'b'])
+    ladder.record('a', 'b')
+    (mu_a, sigma_a), (mu_b, sigma_b) = ladder.ratings['a'], ladder.ratings['b']
+
+    assert mu_a > MU > mu_b
+    assert sigma_a < SIGMA and sigma_b < SIGMA
+    assert ladder.games == 1
+    assert [row[0] for row in ladder.standings()] == ['a', 'b']
+
+
+def test_pick():
+
+    ladder = Ladder(['a', 'b', 'c'])
+    for game in range(30):
+        ladder.record('a', 'c')
+        ladder.record('b', 'c')
+    rng = random.Random(1)
+    picks = [frozenset(ladder.pick(rng)) for n in range(200)]
+
+    assert ladder.quality('a', 'b') > ladder.quality('a', 'c')
+    assert picks.count(frozenset('ab')) > 150
+
+
+def test_climb(tmpdir):
+
+    path = str(tmpdir.join('ladder.json'))
+    ladder = climb(Ladder(['random', 'density']), 20, workers=1, seed=2,
+                   save=path)
+    saved = Ladder.load(path)
+
+    assert saved.ratings == ladder.ratings
+    assert saved.games == 20
+    assert ladder.standings()[0][0] == 'density'
+    climb(saved, 5, workers=2, seed=3)
+    assert saved.games == 25
+    print(report(saved))
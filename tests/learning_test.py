@@ -0,0 +1,89 @@
+import os
+from battleship.board import Board
+from battleship.players import Computer
+from battleship.strategies import BoardView
+from battleship.learning import *
+
+CORNER = {'K': [(0, row) for row in range(5)],
+          'T': [(1, row) for row in range(4)],
+          'Y': [(2, row) for row in range(3)],
+          'S': [(3, row) for row in range(3)],
+          'P': [(4, 0), (4, 1)]}
+
+
+def test_prior():
+
+    prior = PlacementPrior(decay=0.5)
+    assert prior.weights() == [0.0] * 100
+
+    prior.add(CORNER)
+    moved = {sign: [(col + 5, row + 5) for col, row in pos]
+             for sign, pos in CORNER.items() if sign != 'K'}
+    moved['K'] = [(9, row) for row in range(5)]
+    prior.add(moved)
+    weights = prior.weights()
+
+    assert prior.games == 2
+    assert weights[9] == 1.0  # the latest game counts twice the first
+    assert weights[0] == 0.5
+    assert weights[56] == 1.0
+    share, coords = prior.likeliest('K', 1)[0]
+    assert coords == moved['K'] and abs(share - 2 / 3) < 1e-9
+
+
+def test_save_load(tmpdir):
+
+    path = str(tmpdir.join('prior.bin'))
+    prior = PlacementPrior()
+    prior.add(CORNER)
+    prior.save(path)
+    loaded = PlacementPrior.load(path)
+
+    assert loaded.games == 1
+    assert list(loaded.cells) == list(prior.cells)
+    assert loaded.placements == prior.placements
+    assert PlacementPrior.load(str(tmpdir.join('none'))).games == 0
+    assert os.path.getsize(path) < 8 * 1000
+
+
+def test_learning_targeting(tmpdir):
+
+    path = str(tmpdir.join('prior.bin'))
+    comp = Computer(targeting=LearningTargeting(path=path), placement='random')
+    comp.aim(Board())
+    comp.where2bomb()
+    for game in range(3):
+        comp.learn(_board(CORNER))
+
+    learner = LearningTargeting(path=path)
+    scores = learner.scores(BoardView(Board()))
+    assert scores[0] > scores[99]
+    assert learner.prior.games == 3
+
+
+def test_learning_other_fleet(tmpdir):
+
+    path = str(tmpdir.join('prior.bin'))
+    prior = PlacementPrior()
+    prior.add(CORNER)
+    prior.save(path)  # of the standard fleet
+    ships = (('Tanker', 'N', 4), ('Dinghy', 'D', 1))
+    brd = Board(6, 7, ships)
+    brd.place_ship(brd.fleet['N'], [(0, row) for row in range(4)])
+    brd.place_ship(brd.fleet['D'], [(6, 5)])
+
+    learner = LearningTargeting(path=path)
+    learner.pick(BoardView(brd))
+    assert learner.prior.games == 0  # not the prior of another fleet
+    learner.learn({'N': brd.fleet['N'].pos, 'D': brd.fleet['D'].pos})
+
+    loaded = PlacementPrior.load(path, 6, 7, learner.prior.ships)
+    assert loaded.games == 1
+    assert loaded.weights()[0] == 1.0
+
+
+def _board(layout):
+    brd = Board()
+    for sign, pos in layout.items():
+        brd.place_ship(brd.fleet[sign], pos)
+    return brd
@@ -0,0 +1,29 @@
+import asyncio
+from battleship.load import *
+from battleship.server import start
+
+
+def test_ramp():
+
+    async def run():
+        server = await start(port=0, placement='random', seed=1)
+        address = server.sockets[0].getsockname()[:2]
+        results = await ramp(address, [1, 4], 0.5, 'density', seed=2)
+        server.close()
+        await server.wait_closed()
+        return results
+
+    results = asyncio.run(run())
+
+    assert [result['clients'] for result in results] == [1, 4]
+    for result in results:
+        assert result['moves'] > 0
+        assert result['errors'] == 0
+        assert result['latency'].count == result['moves']
+        assert 'moves/s' in format_step(result)
+
+
+def test_memory():
+
+    assert memory(os.getpid()) is None or memory(os.getpid()) > 0
+    assert memory(2 ** 30) is None
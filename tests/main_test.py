@@ -0,0 +1,48 @@
+import subprocess
+import sys
+from battleship.__main__ import *
+
+
+def test_help(capsys):
+
+    assert main(['--help']) == 0
+    assert 'bship' in capsys.readouterr().out
+
+
+def test_unknown(capsys):
+
+    assert main(['--nope']) == 2
+    err = capsys.readouterr().err
+    assert 'unrecognized' in err
+    assert '[COMMAND ...]' in err  # the whole usage, not its first line
+    assert max(len(line) for line in err.splitlines()[:2]) <= 79
+
+
+def test_one_adjacency(capsys):
+
+    assert main(['--no-touch', '--no-diagonal-touch']) == 2
+    assert 'not allowed with' in capsys.readouterr().err
+
+
+def test_help_imports_nothing_else():
+
+    code = ("import sys; from battleship.__main__ import main; "
+            "main(['--help']); "
+            "print(sorted(m for m in sys.modules if m.startswith('battle')))")
+    out = subprocess.run([sys.executable, '-c', code], check=True,
+                         stdout=subprocess.PIPE, universal_newlines=True)
+
+    assert out.stdout.strip().split('\n')[-1] == \
+        "['battleship', 'battleship.__main__']"
+
+
+def test_board_does_not_need_players():
+
+    code = ("import sys; from battleship.board import Board; Board(); "
+            "import battleship.config as config; "
+            "print('battleship.players' in sys.modules, "
+            "'FLEET' in vars(config))")
+    out = subprocess.run([sys.executable, '-c', code], check=True,
+                         stdout=subprocess.PIPE, universal_newlines=True)
+
+    assert out.stdout.strip() == 'False False'
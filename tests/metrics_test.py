@@ -0,0 +1,102 @@
+import threading
+from urllib.request import urlopen
+from battleship.batch import Batch
+from battleship.metrics import *
+
+
+def test_counter_sums_threads():
+    registry = Registry()
+    counter = registry.counter('hits_total', 'Hits.')
+
+    def add():
+        for n in range(1000):
+            counter.inc()
+
+    threads = [threading.Thread(target=add) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc(5)
+    assert counter.value() == 4005
+    assert len(counter.cells) == 5
+
+
+def test_gauge():
+    registry = Registry()
+    gauge = registry.gauge('playing', 'Playing.')
+    gauge.inc(3)
+    gauge.dec()
+    assert gauge.value() == 2
+    assert registry.gauge('rss', 'Memory.', function=lambda: 42).value() == 42
+
+
+def test_histogram_buckets():
+    registry = Registry()
+    histogram = registry.histogram('seconds', 'Seconds.', buckets=(1, 2, 5))
+    for value in (0.5, 1, 1.5, 3, 10):
+        histogram.observe(value)
+    counts, total = histogram.counts()
+    assert counts == [2, 1, 1, 1]
+    assert total == 16
+
+    text = registry.render()
+    assert '# TYPE seconds histogram' in text
+    assert 'seconds_bucket{le="1"} 2\n' in text
+    assert 'seconds_bucket{le="5"} 4\n' in text
+    assert 'seconds_bucket{le="+Inf"} 5\n' in text
+    assert 'seconds_count 5\n' in text
+
+
+def test_labels():
+    registry = Registry()
+    moves = registry.counter('moves_total', 'Moves.', ('strategy',))
+    moves.child('density').inc()
+    moves.child('random').inc(2)
+    assert moves.child('density') is moves.child('density')
+    text = registry.render()
+    assert 'moves_total{strategy="density"} 1\n' in text
+    assert 'moves_total{strategy="random"} 2\n' in text
+    try:
+        moves.child()
+        assert False, 'the strategy label is needed'
+    except ValueError:
+        pass
+    try:
+        registry.counter('moves_total', 'Moves.')
+        assert False, 'moves_total is labelled'
+    except ValueError:
+        pass
+
+
+def test_batch_is_counted():
+    playing = PLAYING.value()
+    moves = MOVES.child('random').value()
+    count = sum(MOVE_SECONDS.child('random').counts()[0])
+
+    batch = Batch('random', 'random')
+    assert PLAYING.value() == playing + 1
+    batch.auto()
+    batch.shoot(['A0'])
+    assert MOVES.child('random').value() == moves + 1
+    assert sum(MOVE_SECONDS.child('random').counts()[0]) == count + 1
+    batch.new_game()
+    assert PLAYING.value() == playing + 1
+    batch.close()
+    assert PLAYING.value() == playing
+
+
+def test_scrape():
+    registry = Registry()
+    registry.counter('games_total', 'Games.').inc(7)
+    server = serve(0, registry)
+    try:
+        host, port = server.server_address[:2]
+        with urlopen(f'http://{host}:{port}/metrics') as response:
+            assert response.headers['Content-Type'].startswith('text/plain')
+            text = response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'games_total 7\n' in text
+    assert '# HELP games_total Games.' in text
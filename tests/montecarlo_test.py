@@ -0,0 +1,82 @@
+import random
+from battleship.bench import play_solo
+from battleship.board import Board
+from battleship.montecarlo import *
+from battleship.strategies import BoardView, make_targeting
+
+
+def test_lookup():
+
+    assert isinstance(make_targeting('montecarlo'), MonteCarloTargeting)
+
+
+def test_particles_fit_observations():
+
+    brd = Board()
+    brd.place_ship(brd.fleet['P'], [(0, 0), (1, 0)])
+    brd.place_ship(brd.fleet['K'], [(5, 2), (5, 3), (5, 4), (5, 5), (5, 6)])
+    view = BoardView(brd)
+    shooter = MonteCarloTargeting(random.Random(1), budget=0.05)
+
+    for coord in [(0, 0), (1, 0), (5, 3), (4, 3), (9, 9)]:
+        shooter.observe(coord, brd.shoot(coord)[0])
+        shooter.pick(view)
+
+    assert shooter.pool
+    for layout in shooter.pool:
+        assert layout['P'] == shooter.geo.mask([(0, 0), (1, 0)])
+        covered = 0
+        for mask in layout.values():
+            assert not mask & shooter.misses
+            assert not mask & covered
+            covered |= mask
+        assert covered & shooter.hits == shooter.hits
+
+
+def test_budget():
+
+    brd = Board()
+    shooter = MonteCarloTargeting(random.Random(1), budget=0)
+
+    assert shooter.pick(BoardView(brd)) in brd.board  # density fallback
+    assert shooter.pool == []
+
+
+def test_moves_keep_to_budget():
+
+    rng = random.Random(3)
+    moves = []
+    for game in range(3):
+        moves += play_solo('montecarlo', rng=rng)[1]  # sync, refill, count
+    moves.sort()
+
+    assert moves[len(moves) // 2] <= MonteCarloTargeting.budget
+    assert moves[len(moves) * 9 // 10] <= MonteCarloTargeting.budget * 1.25
+
+
+def test_play_solo_custom_fleet():
+
+    ships = (('Tanker', 'N', 4), ('Dinghy', 'D', 1))
+    shots, moves = play_solo('montecarlo', rows=6, cols=7,
+                             rng=random.Random(2), ships=ships)
+
+    assert 5 <= shots <= 42
+
+
+def test_particles_keep_apart():
+
+    brd = Board(adjacency='no-diagonal-touch')
+    brd.place_ship(brd.fleet['P'], [(0, 0), (1, 0)])
+    view = BoardView(brd)
+    shooter = MonteCarloTargeting(random.Random(1), budget=0.05)
+
+    for coord in [(0, 0), (1, 0)]:
+        shooter.observe(coord, brd.shoot(coord)[0])
+    shooter.pick(view)
+
+    assert shooter.pool
+    for layout in shooter.pool:
+        near = 0
+        for mask in layout.values():
+            assert not mask & near
+            near |= mask | shooter.geo.halo(mask, 'no-diagonal-touch')
@@ -0,0 +1,87 @@
+from battleship.board import Board
+from battleship.strategies import BoardView
+from battleship.perfect import *
+
+SHIPS = [('Destroyer', 'D', 2), ('Cruiser', 'C', 3)]
+
+
+def play_all(analyzer, table):
+    """Returns the mean shots the policy takes over every layout, and how
+    many games left it.
+    """
+    shots = lost = 0
+    for layout in analyzer.layouts:
+        brd = Board(analyzer.rows, analyzer.cols, SHIPS)
+        for (name, sign, size), mask in zip(SHIPS, layout):
+            brd.place_ship(brd.fleet[sign], analyzer.geo.coords(mask))
+        targeting = PerfectTargeting(table=table)
+        view = BoardView(brd)
+        while brd.afloat():
+            brd.shoot(targeting.pick(view))
+            shots += 1
+        lost += targeting.lost
+    return shots / len(analyzer.layouts), lost
+
+
+def test_symmetries():
+
+    assert len(symmetries(3, 3)) == 8
+    assert len(symmetries(3, 4)) == 4
+    assert symmetries(3, 4)[0] == tuple(range(12))
+    for perm in symmetries(4, 4):
+        assert sorted(perm) == list(range(16))
+
+
+def test_policy():
+
+    for rows, cols in ((3, 3), (3, 4)):
+        analyzer = Analyzer(rows, cols, SHIPS)
+        table = analyzer.export()
+        shots, lost = play_all(analyzer, table)
+
+        assert abs(shots - table['value']) < 1e-9
+        assert lost == 0
+        # a shot at each cell is always enough
+        assert 5 <= table['value'] < rows * cols
+
+
+def test_resume(tmpdir):
+
+    memo = str(tmpdir.join('memo'))
+    first = Analyzer(3, 3, SHIPS, memo)
+    value = first.value()
+    first.close()
+
+    again = Analyzer(3, 3, SHIPS, memo)
+    assert again.value() == value
+    assert again.solved == 0
+    again.close()
+
+
+def test_no_table():
+
+    brd = Board(3, 3, SHIPS)
+    targeting = PerfectTargeting(table=None)
+    targeting.pick(BoardView(brd))
+
+    assert targeting.lost
+
+
+def test_no_touch_falls_back():
+
+    analyzer = Analyzer(3, 3, SHIPS)
+    table = analyzer.export()
+    brd = Board(3, 3, SHIPS, 'no-touch')
+    brd.place_ship(brd.fleet['C'], [(0, 0), (1, 0), (2, 0)])
+    brd.place_ship(brd.fleet['D'], [(0, 2), (1, 2)])
+    targeting = PerfectTargeting(table=table)
+    view = BoardView(brd)
+
+    shots = 0
+    while brd.afloat():
+        coord = targeting.pick(view)
+        assert view[coord] == '.'
+        brd.shoot(coord)
+        shots += 1
+    assert targeting.lost  # solved for ships that may touch
+    assert shots <= 9
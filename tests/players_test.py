@@ -175,3 +175,35 @@ def test_receive_shot():
     assert check.brd.board[(3,3)] == "x"
     check.receive_shot((4,4)) 
     assert check.brd.board[(4,4)] == "@"
+
+def test_receive_volley():
+
+    target = Computer()
+    target.brd.place_ship(target.brd.fleet['P'], [(0, 0), (1, 0)])
+
+    results = target.receive_volley([(0, 0), (1, 0), (3, 3)])
+
+    assert results == [((0, 0), 'hit'), ((1, 0), 'sunk'), ((3, 3), 'miss')]
+    assert target.sunk == 1
+
+def test_auto_hide_fleet():
+
+    ships = (('Tanker', 'N', 3), ('Dinghy', 'D', 2), ('Raft', 'R', 1))
+    target = Computer()
+    target.brd = Board(3, 3, ships, 'no-diagonal-touch')
+    target.brd.place_ship(target.brd.fleet['R'], [(1, 1)])
+
+    # the raft in the middle leaves the tanker no room
+    with pytest.raises(ValueError):
+        target.auto_hide_ships(target.brd.fleet['N'])
+
+    target.brd = Board(4, 4, ships, 'no-diagonal-touch')
+    fleet = list(target.brd.fleet.values())
+    for game in range(20):  # many layouts are dead ends, none hangs
+        target.auto_hide_fleet(fleet, 2)
+        for ship in fleet:
+            others = set(coord for other in fleet if other is not ship
+                         for coord in other.pos)
+            assert ship.pos and others.isdisjoint(
+                ship.pos + target.brd.halo(ship))
+        target.brd.remove_fleet()
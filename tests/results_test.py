@@ -0,0 +1,48 @@
+import pytest
+from battleship.bench import duel
+from battleship.results import *
+
+
+def test_insert(tmpdir):
+
+    db = connect(str(tmpdir.join('results.db')))
+    outcomes = []
+    for seed in range(4):
+        outcome = duel(('random', 'density'), seed=seed)
+        outcome.update(rows=10, cols=10, seed=seed)
+        outcomes.append(outcome)
+    insert(db, outcomes)
+
+    assert db.execute('SELECT COUNT(*) FROM games').fetchone() == (4,)
+    assert db.execute('SELECT COUNT(*) FROM placements').fetchone() == (40,)
+    rates = {(row[0], row[1]): row[2:] for row in win_rates(db)}
+    wins = sum(outcome['winner'] == 1 for outcome in outcomes)
+    assert rates['density:random', 'random:random'][:2] == (4, wins)
+    assert sum(shots_distribution(db, 'density:random').values()) == wins
+    assert db.execute('PRAGMA journal_mode').fetchone() == ('wal',)
+
+
+def test_tournament(tmpdir):
+
+    path = str(tmpdir.join('results.db'))
+    tournament(path, ['random', 'density'], 12, workers=2, seed=1)
+    tournament(path, ['random', 'density'], 3, workers=1, seed=2)
+    db = connect(path)
+
+    assert db.execute('SELECT COUNT(*) FROM games').fetchone() == (15,)
+    assert db.execute('SELECT SUM(games) FROM player_rates').fetchone() == \
+        (30,)
+    print(report(db))
+
+
+def test_writer_dies(tmpdir):
+
+    path = str(tmpdir.join('none', 'results.db'))  # cannot be opened
+    writer = Writer(path, batch=1, wait=0.1)
+    with pytest.raises(RuntimeError, match='unable to open'):
+        for game in range(1000):  # more than the queue holds
+            writer.put({})
+    with pytest.raises(RuntimeError, match='unable to open'):
+        writer.close()
+    with pytest.raises(RuntimeError, match='unable to open'):
+        tournament(path, ['random', 'density'], 200, workers=2, seed=1)
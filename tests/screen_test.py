@@ -0,0 +1,101 @@
+import random
+from battleship.screen import *
+
+
+class FakeScreen(object):
+    """Stands in for a curses window: plays back keys and records what is
+    written.
+    """
+
+    def __init__(self, keys):
+        self.keys = [ord(k) if isinstance(k, str) else k for k in keys]
+        self.written = []
+
+    def getch(self):
+        return self.keys.pop(0) if self.keys else ord('q')
+
+    def addstr(self, y, x, text):
+        self.written.append((y, x, text))
+
+    def erase(self):
+        pass
+
+    def clrtoeol(self):
+        pass
+
+    def refresh(self):
+        pass
+
+    def nodelay(self, flag):
+        pass
+
+    def keypad(self, flag):
+        pass
+
+
+def test_draw():
+
+    scr = FakeScreen([])
+    game = Screen(scr, 'random', 'random', random.Random(1), idle=0)
+    game.new_game()
+    game.draw()
+
+    assert (ATTACK[0], ATTACK[1], '+  A  B  C  D  E  F  G  H  I  J') in \
+        scr.written
+
+
+def test_shot_repaints_one_cell():
+
+    scr = FakeScreen([])
+    game = Screen(scr, 'random', 'random', random.Random(1), idle=0)
+    game.new_game()
+    game.draw()
+    scr.written = []
+
+    empty = [coord for coord in game.enemy.board if
+             game.enemy.board[coord] == POINT['open']][0]
+    game.enemy.shoot(empty)
+
+    assert scr.written == [(ATTACK[0] + 1 + empty[1],
+                            ATTACK[1] + 3 + 3 * empty[0], POINT['miss'])]
+
+
+def test_read_coord():
+
+    scr = FakeScreen([-1, 'x', BACKSPACE[0], 'c', '7', ENTER[0]])
+    game = Screen(scr, 'random', 'random', random.Random(1), idle=0)
+    game.new_game()
+
+    assert game.read_coord() == (2, 7)
+    assert game.read_coord() is None  # q
+
+
+def test_run_whole_game():
+
+    shots = [chr(65 + col) + str(row) for row in range(10)
+             for col in range(10)]
+    keys = ['r', ENTER[0]]
+    for shot in shots:
+        keys.extend([shot[0], shot[1], ENTER[0]])
+
+    scr = FakeScreen(keys + ['q'])
+    game = Screen(scr, 'random', 'random', random.Random(5), idle=0)
+    game.run()
+
+    said = [text for y, x, text in scr.written]
+    assert PROMPT['one_wins'].strip() in said or \
+        PROMPT['comp_wins'].strip() in said
+
+
+def test_lookahead_closed_when_computer_wins():
+
+    keys = ['r', ENTER[0]] + ['A', '0', ENTER[0]] * 300  # never aims
+    scr = FakeScreen(keys)
+    game = Screen(scr, 'random', 'random', random.Random(5), idle=0)
+    game.new_game()
+    game.set_up()
+
+    assert game.play()
+    assert PROMPT['comp_wins'].strip() in [text for y, x, text in
+                                           scr.written]
+    assert game.lookahead.executor is None
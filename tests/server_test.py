@@ -0,0 +1,55 @@
+import asyncio
+import json
+from battleship.server import *
+
+
+def test_session():
+
+    async def talk():
+        server = await start(port=0, placement='random', seed=1)
+        host, port = server.sockets[0].getsockname()[:2]
+        reader, writer = await asyncio.open_connection(host, port)
+
+        async def send(msg, count):
+            writer.write((json.dumps(msg) + '\n').encode())
+            return [json.loads(await reader.readline()) for n in range(count)]
+
+        placed = await send({'auto': True}, 6)
+        answers = await send({'shoot': 'A0'}, 2)
+        bad = await send({'shoot': 'Z9'}, 1)
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return placed, answers, bad
+
+    placed, answers, bad = asyncio.run(talk())
+
+    assert placed[-1] == {'ready': True}
+    assert answers[0]['shot'] == 'A0' and 'reply' in answers[1]
+    assert 'error' in bad[0]
+
+
+def test_session_on_workers():
+
+    from battleship.executor import MoveExecutor
+
+    async def talk():
+        server = await start(port=0, placement='random', seed=1,
+                             executor=executor)
+        host, port = server.sockets[0].getsockname()[:2]
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b'{"auto": true}\n{"shoot": "A0"}\n')
+        answers = [json.loads(await reader.readline()) for n in range(8)]
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return answers
+
+    executor = MoveExecutor(1, deadline=30)
+    try:
+        answers = asyncio.run(talk())
+    finally:
+        executor.close()
+
+    assert answers[6]['shot'] == 'A0' and 'reply' in answers[7]
+    assert executor.moves == 1
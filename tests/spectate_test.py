@@ -0,0 +1,110 @@
+import json
+from battleship.engine import Engine
+from battleship.players import Computer
+from battleship.spectate import *
+
+
+def decode(lines):
+    return [json.loads(line) for line in lines]
+
+
+class Named(Computer):
+    """A Computer under a name of its own, the Hub keeping a board per name.
+    """
+
+    def __init__(self, name):
+        super().__init__('density', 'random')
+        self._name = name
+
+    def name(self):
+        return self._name
+
+
+def shot(coord, result, player='A'):
+    return [{'type': 'shot', 'player': player, 'turn': 1, 'coord': coord},
+            {'type': 'result', 'player': player, 'turn': 1, 'coord': coord,
+             'result': result}]
+
+
+def test_fan_out():
+
+    hub = Hub()
+    first, second = hub.subscribe(), hub.subscribe()
+    for event in shot((1, 2), 'hit'):
+        hub(event)
+
+    snapshot, = decode(first.get())
+    assert snapshot['seq'] == 2
+    assert snapshot['boards']['A']['hits'] == [[1, 2]]
+    assert second.get(timeout=0)[0] is hub.snapshot()
+    assert first.get(timeout=0) == []
+
+    for event in shot((3, 4), 'miss'):
+        hub(event)
+    lines = first.get()
+    # encoded once, the same bytes go to everyone
+    assert all(mine is theirs for mine, theirs in zip(lines, second.get()))
+    assert [event['seq'] for event in decode(lines)] == [3, 4]
+
+
+def test_coalescing():
+
+    hub = Hub(backlog=4)
+    fast, slow = hub.subscribe(), hub.subscribe()
+    fast.get(), slow.get()
+
+    for n in range(5):
+        player = 'AB'[n % 2]
+        for event in shot((n, 0), 'miss', player):
+            hub(event)
+        events = decode(fast.get())
+        assert [event['player'] for event in events] == [player, player]
+
+    assert len(slow.pending) == 0
+    snapshot, = decode(slow.get())
+    assert snapshot['type'] == 'snapshot'
+    assert snapshot['seq'] == 10
+    assert snapshot['boards']['A']['misses'] == [[0, 0], [2, 0], [4, 0]]
+    assert snapshot['boards']['B']['misses'] == [[1, 0], [3, 0]]
+
+    slow.close()
+    assert slow.get() == []
+    assert hub.subscribers == [fast]
+
+
+def test_engine_events(monkeypatch):
+
+    monkeypatch.setattr('builtins.input', lambda prompt='': '')
+    engine = Engine()
+    engine.home = Named('Home')  # stands in for the Human
+    engine.opponent = Named('Away')
+    engine.players = engine.opponent, engine.home
+    engine.opponent.aim(engine.home.brd)
+    engine.home.aim(engine.opponent.brd)
+
+    hub = Hub(backlog=1000)
+    spectator = hub.subscribe()
+    spectator.get()
+    engine.watch(hub)
+    engine.set()
+    engine.play()
+
+    events = decode(spectator.get())
+    kinds = [event['type'] for event in events]
+    assert kinds.count('shot') == kinds.count('result')
+    assert kinds.count('sink') >= 5
+    assert events[-1]['type'] == 'game_over'
+    snapshot = json.loads(hub.snapshot())
+    assert len(snapshot['boards'][snapshot['winner']]['sunk']) == 5
+
+    # each player's shots land on the board they aim at, and only there
+    for player, target in [(engine.home, engine.opponent.brd),
+                           (engine.opponent, engine.home.brd)]:
+        board = snapshot['boards'][player.name()]
+        mine = [event for event in events if
+                event['player'] == player.name()]
+        assert board['misses'] == [list(event['coord']) for event in mine if
+                                   event['type'] == 'result' and
+                                   event['result'] == 'miss']
+        for sign, coords in board['sunk'].items():
+            assert coords == [list(coord) for coord in target.fleet[sign].pos]
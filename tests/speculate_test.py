@@ -0,0 +1,52 @@
+import time
+from battleship.players import Computer
+from battleship.speculate import *
+from battleship.strategies import TargetingStrategy
+
+
+def slow(shots):
+    time.sleep(0.05)
+    return ['move', shots]
+
+
+def test_take():
+
+    ahead = Lookahead(slow)
+    ahead.start(1, [5, 4])
+
+    assert ahead.take(1, 4) == ['move', 4]
+    assert ahead.pending == {}
+    ahead.close()
+
+
+def test_stale():
+
+    ahead = Lookahead(slow)
+    ahead.start(1, [None])
+
+    assert ahead.take(2, None) is None  # the board changed since
+    assert ahead.take(2, None) is None  # nothing left
+    ahead.close()
+
+
+class Slow(TargetingStrategy):
+
+    def pick(self, view):
+        time.sleep(0.1)
+        return view.unknown()[0]
+
+
+def test_computer_thinks_ahead():
+
+    comp = Computer(targeting=Slow())
+    comp.aim(Computer().brd)
+
+    comp.speculate()
+    time.sleep(0.15)  # the Human typing
+    start = time.perf_counter()
+    bomb = comp.where2bomb()
+
+    assert time.perf_counter() - start < 0.05
+    assert bomb == (0, 0)
+    assert bomb in comp.bombed
+    comp.lookahead.close()
@@ -0,0 +1,99 @@
+import random
+import pytest
+from battleship import stats as stats_module
+from battleship.bench import duel
+from battleship.stats import *
+
+
+def test_moments_merge():
+
+    rng = random.Random(1)
+    numbers = [rng.gauss(50, 10) for n in range(1000)]
+    whole, left, right = Moments(), Moments(), Moments()
+    for x in numbers:
+        whole.add(x)
+    for x in numbers[:300]:
+        left.add(x)
+    for x in numbers[300:]:
+        right.add(x)
+    left.merge(right)
+
+    assert left.count == whole.count == 1000
+    assert abs(left.mean - whole.mean) < 1e-9
+    assert abs(left.variance - whole.variance) < 1e-6
+    assert (left.min, left.max) == (min(numbers), max(numbers))
+
+
+def test_sketch_quantiles():
+
+    rng = random.Random(2)
+    numbers = sorted(rng.uniform(1, 100) for n in range(5000))
+    left, right = Sketch(), Sketch()
+    for n, x in enumerate(numbers):
+        (left if n % 2 else right).add(x)
+    left.merge(right)
+
+    for q in (0.1, 0.5, 0.9, 0.99):
+        exact = numbers[int(q * (len(numbers) - 1))]
+        assert abs(left.quantile(q) - exact) <= 0.02 * exact
+    assert Sketch().quantile(0.5) is None
+
+
+def test_game_stats():
+
+    outcomes = [duel(seed=seed) for seed in range(6)]
+    whole, left, right = GameStats(), GameStats(), GameStats()
+    for n, outcome in enumerate(outcomes):
+        whole.add(outcome)
+        (left if n < 2 else right).add(outcome)
+    left.merge(GameStats.from_dict(right.to_dict()))
+
+    assert left.to_dict()['sink'].keys() == whole.to_dict()['sink'].keys()
+    assert left.shots.sketch.to_dict() == whole.shots.sketch.to_dict()
+    assert abs(left.shots.moments.mean - whole.shots.moments.mean) < 1e-9
+    assert left.cell_hits == whole.cell_hits
+    assert whole.games == 6
+    assert whole.wins == {'density': 6}
+    assert sum(whole.shots_histogram.counts.values()) == 6
+    assert sum(whole.cell_hits) == sum(len(side['hits']) for outcome in
+                                       outcomes for side in outcome['sides'])
+
+
+def test_checkpoint(tmpdir, monkeypatch):
+
+    path = str(tmpdir.join('stats.json'))
+    stats = simulate(10, workers=1, chunk=4, seed=3, checkpoint=path)
+    again = simulate(10, workers=1, chunk=4, seed=3,
+                     stats=GameStats.load(path))
+
+    assert GameStats.load(path).summary() == stats.summary()
+    assert again.games == 10  # nothing left to play
+    assert again.summary() == stats.summary()
+
+    # stopped after the first chunk, then resumed
+    part = str(tmpdir.join('part.json'))
+    chunks = []
+
+    def stop(job):
+        if chunks:
+            raise KeyboardInterrupt
+        chunks.append(job)
+        return play_chunk(job)
+
+    play_chunk = stats_module._play_chunk
+    monkeypatch.setattr(stats_module, '_play_chunk', stop)
+    with pytest.raises(KeyboardInterrupt):
+        simulate(10, workers=1, chunk=4, seed=3, checkpoint=part)
+    monkeypatch.undo()
+    assert GameStats.load(part).games == 4
+    resumed = simulate(10, workers=1, chunk=4, checkpoint=part,
+                       stats=GameStats.load(part))
+    assert resumed.games == 10
+    assert resumed.summary() == stats.summary()
+
+    # not the run that was checkpointed
+    for games, seed, targeting in [(12, 3, 'density'), (10, 4, 'density'),
+                                   (10, 3, 'random')]:
+        with pytest.raises(ValueError):
+            simulate(games, (targeting, 'density'), workers=1, chunk=4,
+                     seed=seed, stats=GameStats.load(part))
@@ -0,0 +1,138 @@
+import random
+import pytest
+from battleship.board import Board
+from battleship.strategies import *
+
+brd = Board()
+view = BoardView(brd)
+
+
+def test_view_hides_ships():
+
+    brd.place_ship(brd.fleet['P'], [(0, 0), (1, 0)])
+
+    assert view[(0, 0)] == POINT['open']
+    assert (0, 0) in view.unknown()
+    assert len(view.unknown()) == 100
+
+    brd.shoot((0, 0))
+    brd.shoot((5, 5))
+    assert view[(0, 0)] == POINT['hit']
+    assert view.hits() == [(0, 0)]
+    assert view.misses() == [(5, 5)]
+
+    brd.shoot((1, 0))
+    assert view.sunk() == {'P': [(0, 0), (1, 0)]}
+    assert 'P' not in view.remaining()
+    assert view.ships()['P'] == 2
+    assert len(view.unknown()) == 97
+
+
+def test_registry():
+
+    assert 'random' in available('targeting')
+    assert 'random' in available('placement')
+    assert isinstance(make_targeting('random'), RandomTargeting)
+
+    with pytest.raises(ValueError):
+        make_targeting('nope')
+
+
+def test_register_plugin():
+
+    @register('targeting', 'first')
+    class First(TargetingStrategy):
+        def pick(self, view):
+            return sorted(view.unknown())[0]
+
+    assert make_targeting('first').pick(view) == (0, 1)
+    del REGISTRY['targeting']['first']
+
+
+class EntryPoint(object):
+
+    def __init__(self, name, cls):
+        self.name = name
+        self.cls = cls
+
+    def load(self):
+        return self.cls
+
+
+def test_entry_point_plugin(monkeypatch):
+
+    class Last(TargetingStrategy):
+        def pick(self, view):
+            return sorted(view.unknown())[-1]
+
+    class EntryPoints(object):
+        def select(self, group):
+            return [EntryPoint('last', Last)] if group == \
+                GROUPS['targeting'] else []
+
+    monkeypatch.setattr('importlib.metadata.entry_points', EntryPoints)
+    monkeypatch.setattr('battleship.strategies._discovered', set())
+    monkeypatch.setitem(REGISTRY, 'targeting', dict(REGISTRY['targeting']))
+
+    assert make_targeting('last').pick(view) == (9, 9)
+    assert Last.name == 'last'
+
+
+def test_random_placement():
+
+    check = Board()
+    layout = RandomPlacement(random.Random(1)).place(
+        10, 10, list(check.fleet.values()))
+
+    coords = [coord for pos in layout.values() for coord in pos]
+    assert len(coords) == len(set(coords)) == 17
+    assert sorted(layout) == sorted(check.fleet)
+
+    with pytest.raises(ValueError):
+        RandomPlacement().place(2, 2, list(check.fleet.values()))
+
+
+def test_pick_many():
+
+    check = Board()
+    look = BoardView(check)
+    check.shoot((4, 4))
+
+    for name in ('random', 'density'):
+        salvo = make_targeting(name, rng=random.Random(1)).pick_many(look, 5)
+        assert len(set(salvo)) == 5
+        assert (4, 4) not in salvo
+
+    assert (2, 2) not in look.excluding([(2, 2)]).unknown()
+
+
+@pytest.mark.parametrize('adjacency', ['no-touch', 'no-diagonal-touch'])
+def test_placement_keeps_apart(adjacency):
+
+    check = Board()
+    hider = RandomPlacement(random.Random(2))
+    hider.adjacency = adjacency
+
+    for n in range(20):
+        layout = hider.place(10, 10, list(check.fleet.values()))
+        assert obeys(layout, 10, 10, adjacency)
+
+    assert not obeys({'P': [(0, 0), (1, 0)], 'Y': [(0, 1), (1, 1), (2, 1)]},
+                     10, 10, 'no-touch')
+    assert not obeys({'P': [(0, 0), (1, 0)], 'Y': [(2, 1), (3, 1), (4, 1)]},
+                     10, 10, 'no-diagonal-touch')
+    assert obeys({'P': [(0, 0), (1, 0)], 'Y': [(2, 1), (3, 1), (4, 1)]},
+                 10, 10, 'no-touch')
+
+
+def test_density_keeps_apart():
+
+    check = Board(adjacency='no-diagonal-touch')
+    look = BoardView(check)
+    check.place_ship(check.fleet['P'], [(4, 4), (5, 4)])
+    check.shoot((4, 4))
+
+    # a ship on the corner of the hit would touch the one hit
+    assert DensityTargeting().scores(look)[3 + 3 * 10] == 0
+    check.adjacency = 'touch'
+    assert DensityTargeting().scores(look)[3 + 3 * 10] > 0
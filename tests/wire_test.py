@@ -0,0 +1,112 @@
+import random
+from battleship.board import Board
+from battleship.wire import *
+
+
+def fleet_board():
+    brd = Board(adjacency='no-touch')
+    brd.place_ship(brd.fleet['P'], [(0, 0), (1, 0)])
+    brd.place_ship(brd.fleet['K'], [(0, 9), (1, 9), (2, 9), (3, 9), (4, 9)])
+    return brd
+
+
+def test_deltas():
+    brd = fleet_board()
+    encoder = Encoder([brd], hide=(0,))
+    frames = []
+    encoder.listen(frames.append)
+    mirror = Mirror()
+    assert mirror.feed(encoder.snapshot())
+    assert mirror.boards[0].board[(0, 0)] == '.'  # hidden
+
+    brd.shoot((5, 5))
+    brd.shoot((0, 0))
+    assert [len(frame) for frame in frames] == [11, 11]
+    brd.shoot((1, 0))  # sinks P, clearing the cells around it
+    kind, seq, number, count = HEADER.unpack_from(frames[-1])
+    assert (kind, seq, count) == (SINK, 4, 2)
+
+    assert mirror.feed(b''.join(frames))
+    assert mirror.seq == 4
+    assert mirror.boards[0].board[(5, 5)] == 'x'
+    assert mirror.boards[0].board[(0, 0)] == 'p'
+    assert mirror.boards[0].board[(2, 0)] == '~'
+    assert mirror.sunk[0] == {'P': [(0, 0), (1, 0)]}
+
+
+def test_frames_cut_short():
+    brd = fleet_board()
+    encoder = Encoder([brd])
+    data = encoder.snapshot()
+    mirror = Mirror()
+    assert not mirror.feed(data[:20])
+    assert mirror.feed(data[20:])
+    assert mirror.boards[0].board[(0, 9)] == 'K'
+
+
+def test_resync_on_gap():
+    brd = fleet_board()
+    encoder = Encoder([brd], keep=2)
+    frames = []
+    encoder.listen(frames.append)
+    mirror = Mirror()
+    mirror.feed(encoder.snapshot())
+
+    for coord in ((5, 5), (6, 6), (7, 7)):
+        brd.shoot(coord)
+    assert not mirror.feed(frames[1])  # the first went missing
+    assert mirror.seq == 0
+    assert not mirror.feed(frames[2])
+
+    assert mirror.feed(encoder.since(mirror.seq))  # one too many to replay
+    assert mirror.seq == 3
+    assert mirror.boards[0].board[(5, 5)] == 'x'
+
+    brd.shoot((8, 8))
+    brd.shoot((9, 9))
+    assert encoder.since(3) == b''.join(frames[3:])
+    assert mirror.feed(encoder.since(mirror.seq))
+    assert mirror.boards[0].board[(9, 9)] == 'x'
+    assert encoder.since(mirror.seq) == b''
+
+
+def test_changed_unwatched():
+    brd = fleet_board()
+    encoder = Encoder([brd])
+    frames = []
+    encoder.listen(frames.append)
+    brd.board[(3, 3)] = 'x'  # eg. restored from a checkpoint
+    brd.version += 1
+    brd.restored += 1
+    brd.shoot((4, 4))
+    assert HEADER.unpack_from(frames[0])[0] == SNAPSHOT
+    mirror = Mirror()
+    assert mirror.feed(frames[0])
+    assert mirror.boards[0].board[(3, 3)] == 'x'
+    assert mirror.boards[0].board[(4, 4)] == 'x'
+
+
+def test_volley():
+    brd = fleet_board()
+    encoder = Encoder([brd], hide=(0,))
+    frames = []
+    encoder.listen(frames.append)
+
+    brd.volley([(0, 0), (6, 6)])
+    assert [len(frame) for frame in frames] == [HEADER.size + 2 * CELL.size]
+    brd.volley([(1, 0), (0, 9)])  # sinks P and hits K
+    assert [HEADER.unpack_from(frame)[0] for frame in frames[1:]] == [DELTA,
+                                                                     SINK]
+
+
+def test_measure():
+    shots, sent, text = measure('density', rng=random.Random(1))
+    assert sent < 30 * shots + 250
+    assert sent * 20 < text
+
+
+def test_measure_salvo():
+    turns, sent, text = measure('density', rng=random.Random(1), salvo=True)
+    # a snapshot each turn would be over a hundred bytes a turn
+    assert sent < 60 * turns + 250
+    assert sent * 10 < text